@@ -4,11 +4,20 @@ Main automation script
 
 import sys
 import time
-import schedule
-from datetime import datetime
+import queue
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, time as dt_time
 from blog_generator import BlogPostGenerator
 from wordpress_publisher import WordPressPublisher
-from config import POSTS_PER_DAY, POST_TIME
+from post_spool import PostSpool
+from http_client import close_async_session
+from tracing import tracer, traced
+from config import (
+    POSTS_PER_DAY, POST_TIME, GENERATION_WORKERS, PUBLISH_WORKERS, PIPELINE_QUEUE_SIZE,
+    SCHEDULE_LEAD_HOURS, SCHEDULE_BUFFER_SIZE, SCHEDULE_GENERATE_HOURS, SCHEDULE_FUTURE_STATUS, SCHEDULE_CHECK_INTERVAL
+)
 
 
 class AutoPublisher:
@@ -32,7 +41,14 @@ class AutoPublisher:
         except Exception as e:
             print(f"✗ Failed to initialize WordPress publisher: {e}")
             sys.exit(1)
+        
+        # Generated posts are checkpointed until they are published, so a
+        # WordPress outage or a crash never costs a regeneration
+        self.spool = PostSpool()
+        if len(self.spool):
+            print(f"✓ {self.spool.summary()} - they are published before new posts")
     
+    @traced("post")
     def generate_and_publish(self, topic=None):
         """Generate a blog post and publish it"""
         print("\n" + "=" * 60)
@@ -40,20 +56,14 @@ class AutoPublisher:
         print("=" * 60)
         
         try:
+            # Finish posts an earlier attempt or run generated but could not publish
+            self.publish_spooled()
+            
             # Generate post
-            post_data = self.generator.generate_full_post(topic)
+            post_data, thumbnail = self._generate_post(topic)
             
             # Publish to WordPress
-            result = self.publisher.publish_post(post_data)
-            
-            if result.get('success'):
-                print("\n✓ Blog post published successfully!")
-                print(f"  Title: {post_data['title']}")
-                print(f"  URL: {result.get('url', 'N/A')}")
-                return True
-            else:
-                print(f"\n✗ Failed to publish blog post: {result.get('error', 'Unknown error')}")
-                return False
+            return self._publish(self.spool.add(post_data), thumbnail)
                 
         except Exception as e:
             print(f"\n✗ Error during generation/publishing: {e}")
@@ -61,37 +71,358 @@ class AutoPublisher:
             traceback.print_exc()
             return False
     
-    def run_scheduled(self):
-        """Run the scheduler"""
+    def _generate_post(self, topic=None):
+        """
+        Generate a post while its thumbnail is searched and downloaded in the
+        background, from the moment the title is known. Returns (post_data,
+        thumbnail Future or None).
+        """
+        prepared = {}
+        
+        def on_title(title, category, resolved_topic):
+            prepared["thumbnail"] = self.publisher.prefetch_thumbnail(title, resolved_topic, category)
+        
+        try:
+            return self.generator.generate_full_post(topic, on_title=on_title), prepared.get("thumbnail")
+        except BaseException:
+            if "thumbnail" in prepared:
+                prepared["thumbnail"].cancel()
+            raise
+    
+    def _publish(self, entry, thumbnail=None):
+        """Publish a spooled post from its last completed step and report the outcome"""
+        try:
+            result = self.publisher.publish_post(entry.post_data, checkpoint=entry, thumbnail=thumbnail)
+        except Exception as e:
+            self.spool.release(entry, e)
+            raise
+        return self._settle(entry, result)
+    
+    def publish_spooled(self):
+        """Publish every spooled post that is due for a retry. Returns how many were published."""
+        published = 0
+        while True:
+            entry = self.spool.take_due()
+            if entry is None:
+                return published
+            if self._went_live(entry):
+                continue
+            if entry.get('publish_at') and not entry.get('attempts'):
+                print(f"\nPublishing scheduled post '{entry.post_data.get('title')}'")
+            else:
+                print(f"\nResuming spooled post '{entry.post_data.get('title')}' after step '{entry.state}'")
+            try:
+                published += self._publish(entry)
+            except Exception as e:
+                print(f"\n✗ Error publishing spooled post: {e}")
+    
+    def _went_live(self, entry):
+        """
+        Finish an entry whose post is already on WordPress and tracked - a
+        post pushed as a scheduled one whose slot came (WordPress publishes
+        it on its own), or one whose run stopped before it left the spool.
+        Nothing is sent. Returns whether entry was such a post.
+        """
+        if not entry.reached("tracked"):
+            return False
+        self.generator.forget_cached(entry.post_data)
+        self.spool.finish(entry)
+        if entry.get('publish_at'):
+            print(f"\n✓ Scheduled post went live: {entry.post_data.get('title')}")
+        else:
+            print(f"\n✓ Spooled post was already published: {entry.post_data.get('title')}")
+        return True
+    
+    def _settle(self, entry, result):
+        """Drop a published (or unpublishable) post from the spool, keep a failed one for a retry"""
+        if result.get('success') or not result.get('retryable', True):
+            self.spool.finish(entry)
+        else:
+            self.spool.release(entry, result.get('error'))
+        return self._report_published(entry.post_data, result)
+    
+    def _report_published(self, post_data, result):
+        if result.get('success'):
+            self.generator.forget_cached(post_data)
+            print("\n✓ Blog post published successfully!")
+            print(f"  Title: {post_data['title']}")
+            print(f"  URL: {result.get('url', 'N/A')}")
+            return True
+        else:
+            print(f"\n✗ Failed to publish blog post: {result.get('error', 'Unknown error')}")
+            return False
+    
+    def _print_generation_stats(self):
+        print(self.generator.telemetry.summary())
+        print(self.generator.prompt_cache.summary())
+        if self.generator.cache:
+            print(self.generator.cache.summary())
+        if len(self.generator.router) > 1:
+            print(self.generator.router.summary())
+        if len(self.spool):
+            print(self.spool.summary())
+        print(tracer.summary())
+    
+    @traced("post")
+    async def generate_and_publish_async(self, topic=None):
+        """
+        Async counterpart of generate_and_publish
+        
+        Category lookup and thumbnail search start as soon as the title is
+        known and tag resolution as soon as the tags are, all while the body
+        is still generating.
+        """
+        print("\n" + "=" * 60)
+        print(f"Starting blog post generation - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 60)
+        
+        prepared = {}
+        
+        def on_title(title, category, resolved_topic):
+            prepared["category_name"] = category
+            prepared["category_id"] = asyncio.ensure_future(self.publisher.get_category_id_async(category))
+            prepared["thumbnail"] = asyncio.ensure_future(self.publisher.prepare_thumbnail_async(title, resolved_topic, category))
+        
+        def on_tags(tags):
+            prepared["tag_ids"] = asyncio.ensure_future(self.publisher.resolve_tags_async(tags))
+        
+        def cancel_prepared():
+            for task in prepared.values():
+                if isinstance(task, asyncio.Future):
+                    task.cancel()
+        
+        try:
+            post_data = await self.generator.generate_full_post_async(topic, on_title=on_title, on_tags=on_tags)
+            
+            if prepared.get("category_name") != post_data['category']:
+                # The finished content moved the post to another category
+                prepared.pop("category_id").cancel()
+            
+            return await self._publish_async(
+                self.spool.add(post_data),
+                tag_ids=prepared.get("tag_ids"),
+                category_id=prepared.get("category_id"),
+                thumbnail=prepared.get("thumbnail")
+            )
+            
+        except Exception as e:
+            cancel_prepared()
+            print(f"\n✗ Error during generation/publishing: {e!r}")
+            import traceback
+            traceback.print_exc()
+            return False
+        except BaseException:
+            # Cancelled (Ctrl+C, shutdown) - stop the WordPress-side work started for the post
+            cancel_prepared()
+            raise
+    
+    async def _publish_async(self, entry, **prepared):
+        """Async counterpart of _publish; prepared holds the tasks publish_post_async accepts"""
+        try:
+            result = await self.publisher.publish_post_async(entry.post_data, checkpoint=entry, **prepared)
+        except Exception as e:
+            self.spool.release(entry, e)
+            raise
+        return self._settle(entry, result)
+    
+    async def publish_spooled_async(self):
+        """Async counterpart of publish_spooled"""
+        published = 0
+        while True:
+            entry = self.spool.take_due()
+            if entry is None:
+                return published
+            if self._went_live(entry):
+                continue
+            if entry.get('publish_at') and not entry.get('attempts'):
+                print(f"\nPublishing scheduled post '{entry.post_data.get('title')}'")
+            else:
+                print(f"\nResuming spooled post '{entry.post_data.get('title')}' after step '{entry.state}'")
+            try:
+                published += await self._publish_async(entry)
+            except Exception as e:
+                print(f"\n✗ Error publishing spooled post: {e!r}")
+    
+    def run_async(self, topic=None, concurrency=GENERATION_WORKERS, max_posts=None):
+        """
+        Run continuous production on a single event loop
+        
+        Up to concurrency posts are generated and published at the same time
+        as asyncio tasks, so in-flight posts don't each need their own thread.
+        Stops after max_posts attempts if given.
+        """
+        print(f"\nStarting async production mode")
+        print(f"Posts in flight: {concurrency}")
+        print("Press Ctrl+C to stop\n")
+        
+        stats = {"started": 0, "published": 0, "failed": 0}
+        
+        async def worker():
+            while not max_posts or stats["started"] < max_posts:
+                stats["published"] += await self.publish_spooled_async()
+                if max_posts and stats["started"] >= max_posts:
+                    break
+                stats["started"] += 1
+                success = await self.generate_and_publish_async(topic)
+                stats["published" if success else "failed"] += 1
+        
+        async def main():
+            try:
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+            finally:
+                await close_async_session()
+        
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            print(f"\n\nProduction stopped by user")
+        
+        print(f"Total posts published: {stats['published']} ({stats['failed']} failed)")
+        self._print_generation_stats()
+    
+    def run_once_async(self, topic=None):
+        """Generate and publish a single post on the async path"""
+        async def main():
+            try:
+                await self.publish_spooled_async()
+                return await self.generate_and_publish_async(topic)
+            finally:
+                await close_async_session()
+        
+        return asyncio.run(main())
+    
+    def run_scheduled(self, lead_hours=SCHEDULE_LEAD_HOURS, buffer_size=SCHEDULE_BUFFER_SIZE, use_future=SCHEDULE_FUTURE_STATUS):
+        """
+        Run the scheduler
+        
+        Posts are generated ahead into the spool - at most buffer_size of them,
+        at most lead_hours before their slot and within SCHEDULE_GENERATE_HOURS
+        if set - so at each slot only the publish step is left. A background
+        thread publishes posts as they fall due. With use_future every post is
+        pushed to WordPress right after generation with status "future" and
+        its slot as date, and WordPress publishes it on time itself. A slot
+        that comes up with no post ready is generated and published right away.
+        """
         print(f"\nScheduling {POSTS_PER_DAY} post(s) per day at {POST_TIME}")
+        print(f"Generating up to {buffer_size} post(s) ahead, at most {lead_hours:g}h before their slot"
+              + (", pushed to WordPress as scheduled posts" if use_future else ""))
+        
+        started = datetime.now()
+        # Posts per slot time; ones generated ahead in an earlier run are still in the spool
+        filled = Counter(self.spool.scheduled())
+        stop = threading.Event()
+        
+        def publish_due():
+            while not stop.wait(SCHEDULE_CHECK_INTERVAL):
+                try:
+                    self.publish_spooled()
+                except Exception as e:
+                    print(f"\n✗ Error publishing scheduled posts: {e}")
         
-        # Schedule posts
-        for i in range(POSTS_PER_DAY):
-            schedule.every().day.at(POST_TIME).do(self.generate_and_publish)
+        threading.Thread(target=publish_due, name="schedule-publisher", daemon=True).start()
         
         print("\nScheduler started. Waiting for scheduled times...")
         print("Press Ctrl+C to stop")
         
         try:
             while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                now = datetime.now()
+                slot = self._next_open_slot(filled, started, now + timedelta(hours=lead_hours))
+                if slot is None or (slot > now and not self._may_generate_ahead(now, buffer_size)):
+                    time.sleep(SCHEDULE_CHECK_INTERVAL)
+                    continue
+                if self._generate_for_slot(slot, use_future):
+                    filled[slot.timestamp()] += 1
+                else:
+                    time.sleep(SCHEDULE_CHECK_INTERVAL)
         except KeyboardInterrupt:
             print("\n\nScheduler stopped by user")
+        finally:
+            stop.set()
+        print(self.spool.summary())
+    
+    def _next_open_slot(self, filled, start, until):
+        """The earliest slot between start and until that still needs a post, or None"""
+        hour, minute = (int(part) for part in POST_TIME.split(':'))
+        day = start.date()
+        while True:
+            slot = datetime.combine(day, dt_time(hour, minute))
+            if slot > until:
+                return None
+            if slot >= start and filled[slot.timestamp()] < POSTS_PER_DAY:
+                return slot
+            day += timedelta(days=1)
+    
+    def _may_generate_ahead(self, now, buffer_size):
+        """Whether the buffer has room and the hour is inside SCHEDULE_GENERATE_HOURS"""
+        waiting = sum(count for publish_at, count in self.spool.scheduled().items() if publish_at > now.timestamp())
+        if waiting >= buffer_size:
+            return False
+        if not SCHEDULE_GENERATE_HOURS:
+            return True
+        first, last = (int(hour) for hour in SCHEDULE_GENERATE_HOURS.split('-'))
+        if first <= last:
+            return first <= now.hour < last
+        return now.hour >= first or now.hour < last  # Window over midnight, e.g. "22-6"
+    
+    @traced("post")
+    def _generate_for_slot(self, slot, use_future):
+        """
+        Generate a post for slot and spool it until then. A late post is
+        published right away, with use_future it is pushed as a scheduled
+        post. Returns whether the slot got its post.
+        """
+        late = slot <= datetime.now()
+        print("\n" + "=" * 60)
+        print(f"Generating post for {slot.strftime('%Y-%m-%d %H:%M')}" + (" (due now)" if late else ""))
+        print("=" * 60)
+        
+        try:
+            post_data = self.generator.generate_full_post()
+        except Exception as e:
+            print(f"\n✗ Error during generation: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+        
+        if use_future and not late:
+            post_data['date'] = slot.isoformat(timespec='seconds')
+        entry = self.spool.add(post_data, publish_at=slot.timestamp())
+        try:
+            if late:
+                self._publish(entry)
+            elif use_future:
+                result = self.publisher.publish_post(entry.post_data, checkpoint=entry)
+                if result.get('success'):
+                    self.generator.forget_cached(entry.post_data)
+                    # Kept in the spool until its slot, so a restart doesn't fill the slot again
+                    self.spool.hold(entry)
+                    print(f"\n✓ Scheduled on WordPress for {slot.strftime('%Y-%m-%d %H:%M')}: {post_data['title']}")
+                elif result.get('retryable', True):
+                    self.spool.release(entry, result.get('error'))
+                else:
+                    self.spool.finish(entry)
+                    return False
+            else:
+                self.spool.hold(entry)
+                print(f"\n✓ Ready for {slot.strftime('%Y-%m-%d %H:%M')}: {post_data['title']}")
+        except Exception as e:
+            print(f"\n✗ Error publishing post: {e}")
+        return True
     
     def run_once(self, topic=None):
         """Generate and publish a single post immediately"""
         return self.generate_and_publish(topic)
     
-    def run_loop(self, topic=None):
-        """Run in continuous loop, generating posts immediately one after another"""
+    def run_loop(self, topic=None, max_posts=None):
+        """Run in continuous loop, generating posts immediately one after another (max_posts attempts if given)"""
         print(f"\nStarting continuous production mode")
         print(f"Will generate and publish posts continuously with no delay")
         print("Press Ctrl+C to stop\n")
         
         post_count = 0
         try:
-            while True:
+            while not max_posts or post_count < max_posts:
                 post_count += 1
                 print(f"\n{'='*60}")
                 print(f"Post #{post_count}")
@@ -103,13 +434,106 @@ class AutoPublisher:
                     print(f"\n✓ Post #{post_count} published successfully!")
                     print("Starting next post immediately...\n")
                 else:
-                    print(f"\n✗ Post #{post_count} failed. Retrying immediately...\n")
+                    print(f"\n✗ Post #{post_count} failed. Starting next post immediately...\n")
                 
                 # No delay - start next post immediately
                 
         except KeyboardInterrupt:
             print(f"\n\nProduction stopped by user")
-            print(f"Total posts generated: {post_count}")
+        
+        print(f"Total posts generated: {post_count}")
+        self._print_generation_stats()
+    
+    def run_pipeline(self, topic=None, workers=GENERATION_WORKERS, publish_workers=PUBLISH_WORKERS, queue_size=PIPELINE_QUEUE_SIZE, max_posts=None):
+        """
+        Run continuous production with separate generation and publishing stages
+        
+        Generation workers keep Ollama busy while publish workers push finished
+        posts to WordPress. The stages are connected by a bounded queue, so
+        generation pauses when publishing falls behind. Ctrl+C stops new
+        generations and lets every in-flight post finish publishing. Stops
+        after max_posts generation attempts if given.
+        """
+        print(f"\nStarting concurrent production mode")
+        print(f"Generation workers: {workers}, publish workers: {publish_workers}, queue size: {queue_size}")
+        print("Press Ctrl+C to stop (twice to force quit)\n")
+        
+        posts = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        generation_done = threading.Event()
+        stats = {"started": 0, "generated": 0, "generation_failed": 0, "published": 0, "publish_failed": 0}
+        stats_lock = threading.Lock()
+        
+        def count(key):
+            with stats_lock:
+                stats[key] += 1
+        
+        def claim():
+            with stats_lock:
+                if max_posts and stats["started"] >= max_posts:
+                    return False
+                stats["started"] += 1
+                return True
+        
+        def generation_worker():
+            while not stop.is_set():
+                # Spooled posts that are due for a retry go to the publishers without any generation
+                entry, thumbnail = self.spool.take_due(), None
+                if entry is None:
+                    if not claim():
+                        return
+                    try:
+                        post_data, thumbnail = self._generate_post(topic)
+                    except Exception as e:
+                        count("generation_failed")
+                        print(f"\n✗ Generation failed: {e}. Retrying immediately...\n")
+                        continue
+                    count("generated")
+                    entry = self.spool.add(post_data)
+                # Blocks while publishing is behind; publishers keep draining during shutdown
+                posts.put((entry, thumbnail))
+        
+        def publish_worker():
+            while True:
+                try:
+                    entry, thumbnail = posts.get(timeout=1)
+                except queue.Empty:
+                    if generation_done.is_set():
+                        return
+                    continue
+                try:
+                    count("published" if self._publish(entry, thumbnail) else "publish_failed")
+                except Exception as e:
+                    count("publish_failed")
+                    print(f"\n✗ Error publishing post: {e}")
+                finally:
+                    posts.task_done()
+        
+        generators = [threading.Thread(target=generation_worker, name=f"generate-{i + 1}", daemon=True) for i in range(workers)]
+        publishers = [threading.Thread(target=publish_worker, name=f"publish-{i + 1}", daemon=True) for i in range(publish_workers)]
+        for thread in generators + publishers:
+            thread.start()
+        
+        def wait_for(threads):
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        
+        try:
+            try:
+                wait_for(generators)
+            except KeyboardInterrupt:
+                print(f"\n\nProduction stopped by user - finishing in-flight posts...")
+                stop.set()
+                wait_for(generators)
+            generation_done.set()
+            wait_for(publishers)
+        except KeyboardInterrupt:
+            print(f"\n\nForced stop - {posts.qsize()} queued post(s) stay in the spool for the next run")
+        
+        print(f"Total posts generated: {stats['generated']} ({stats['generation_failed']} failed)")
+        print(f"Total posts published: {stats['published']} ({stats['publish_failed']} failed)")
+        self._print_generation_stats()
 
 
 def main():
@@ -129,6 +553,30 @@ def main():
         default=None,
         help='Specific topic for the blog post (optional)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Loop mode: run generation and publishing as concurrent stages with N generation workers'
+    )
+    parser.add_argument(
+        '--publish-workers',
+        type=int,
+        default=PUBLISH_WORKERS,
+        help='Loop mode with --workers: number of concurrent publish workers'
+    )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Run on the asyncio pipeline (in loop mode --workers sets the number of posts in flight)'
+    )
+    parser.add_argument(
+        '--max-posts',
+        type=int,
+        default=None,
+        help='Loop mode: stop after N posts'
+    )
     
     args = parser.parse_args()
     
@@ -137,14 +585,23 @@ def main():
     
     if args.mode == 'once':
         # Generate and publish once
-        success = publisher.run_once(args.topic)
+        if args.use_async:
+            success = publisher.run_once_async(args.topic)
+        else:
+            success = publisher.run_once(args.topic)
         sys.exit(0 if success else 1)
     elif args.mode == 'schedule':
         # Run scheduled
         publisher.run_scheduled()
+    elif args.use_async:
+        # Run every in-flight post as a task on one event loop
+        publisher.run_async(topic=args.topic, concurrency=args.workers or GENERATION_WORKERS, max_posts=args.max_posts)
+    elif args.workers:
+        # Run generation and publishing as concurrent stages
+        publisher.run_pipeline(topic=args.topic, workers=args.workers, publish_workers=args.publish_workers, max_posts=args.max_posts)
     else:
         # Run in continuous loop (no delay)
-        publisher.run_loop(topic=args.topic)
+        publisher.run_loop(topic=args.topic, max_posts=args.max_posts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,579 @@
+"""
+Benchmark - Measures the pipeline against local stand-ins for Ollama, WordPress and Pexels
+Reports posts/sec, per-stage latency percentiles and requests per post
+
+Usage:
+    python benchmark.py --mode loop --posts 5
+    python benchmark.py --mode pipeline --posts 20 --workers 2 --token-rate 300
+    python benchmark.py --mode async --posts 20 --workers 8 --error-rate 0.02 --json after.json
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+TERMS = ["looksmaxxing", "mewing", "mogging", "chad", "softmaxxing", "hardmaxxing", "jawline", "hunter eyes", "canthal tilt", "facial harmony"]
+FILLER = ("the protocol compounds over weeks when you track progress and stay consistent with every "
+          "daily habit that moves your baseline toward a sharper and leaner look").split()
+CATEGORIES = ["Facial Aesthetics", "Body Aesthetics", "Lifestyle", "Grooming", "Surgery"]
+TINY_JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 2048 + b"\xff\xd9"
+
+
+class RequestLog:
+    """Thread-safe request counters shared by the stand-in servers"""
+    
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def add(self, service, method, path):
+        # Collapse IDs so /posts/12 and /posts/13 count as the same route
+        route = re.sub(r'/\d+', '/:id', urlparse(path).path)
+        with self._lock:
+            self.counts[f"{service} {method} {route}"] += 1
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class FakeContent:
+    """Deterministic looksmaxing-flavoured HTML that passes the generator's checks"""
+    
+    def __init__(self, seed=1):
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def sentence(self):
+        with self._lock:
+            words = self.rng.choices(FILLER, k=14)
+            words[self.rng.randrange(len(words))] = self.rng.choice(TERMS)
+        return " ".join(words).capitalize() + "."
+    
+    def paragraph(self, words=70):
+        return "<p>" + " ".join(self.sentence() for _ in range(max(1, words // 14))) + "</p>"
+    
+    def section(self, heading, words, index=0, keyword=None):
+        parts = [f"<h2>{heading}</h2>"]
+        for h3 in range(2):
+            parts.append(f"<h3>{heading} Step {h3 + 1}</h3>")
+            parts.append(self.paragraph(words // 3))
+        if keyword:
+            parts.append(f"<p>This is where {keyword} pays off.</p>")
+        tag = "ol" if index % 2 else "ul"
+        parts.append(f"<{tag}>" + "".join(f"<li><strong>{term}</strong>: {self.sentence()}</li>" for term in TERMS[:4]) + f"</{tag}>")
+        if index % 3 == 1:
+            parts.append("<table><thead><tr><th>Method</th><th>Results</th></tr></thead><tbody>"
+                         + "".join(f"<tr><td>{term}</td><td>4-8 weeks</td></tr>" for term in TERMS[:3])
+                         + "</tbody></table>")
+        parts.append(self.paragraph(words // 3))
+        return "\n".join(parts)
+    
+    def article(self, words, keyword=None):
+        sections = 7
+        body = [self.paragraph(150)]
+        body += [self.section(f"Looksmaxxing Mewing Section {i + 1}", (words - 150) // sections, i, keyword) for i in range(sections)]
+        return "\n".join(body)
+    
+    def respond(self, prompt, article_words):
+        """Pick a plausible answer for the prompt the generator sent"""
+        keyword = re.search(r"Primary keyword: (.+)", prompt)
+        keyword = keyword.group(1).strip() if keyword else None
+        if "blog post title" in prompt:
+            topic = re.search(r"blog post title about: (.+)", prompt)
+            return f"{topic.group(1).strip().title()}: The Chad Looksmaxxing Protocol" if topic else "Mewing For Jawline Gains: The Chad Looksmaxxing Protocol"
+        if "Plan a looksmaxing blog post about:" in prompt:
+            topic = re.search(r"blog post about: (.+)", prompt).group(1).strip().title()
+            return json.dumps({
+                "title": f"{topic}: The Chad Looksmaxxing Protocol",
+                "alternative_titles": [f"{topic} For Chads", f"{topic}: Mewing And Jawline Gains"],
+                "tags": ["looksmaxxing", "mewing", "jawline", "softmaxxing", "chad", "canthal tilt", "hunter eyes", "mogging"],
+                "category": "Facial Aesthetics",
+                "excerpt": f"{topic}: the looksmaxxing protocol for a sharper jawline, hunter eyes and a chad baseline, step by step and without surgery.",
+                "outline": [{"h2": f"Looksmaxxing Mewing Section {i + 1}", "h3": ["Step 1", "Step 2"]} for i in range(7)]
+            })
+        if "Create the outline" in prompt:
+            return "\n".join(f"H2: Looksmaxxing Mewing Section {i + 1}\nH3: Step 1\nH3: Step 2" for i in range(7))
+        if "Write ONLY the introduction" in prompt:
+            return "\n".join(self.paragraph(70) for _ in range(3))
+        match = re.search(r"Write ONLY section (\d+)", prompt)
+        if match:
+            heading = re.search(r"Start with exactly: <h2>(.*?)</h2>", prompt)
+            index = int(match.group(1)) - 1
+            return self.section(heading.group(1) if heading else f"Section {index + 1}", article_words // 7, index, keyword)
+        if "SEO tags" in prompt:
+            return "mewing, looksmaxxing, jawline, hunter eyes, canthal tilt, chad, mogging, softmaxxing"
+        return self.article(article_words, keyword)
+
+
+class QuietServer(ThreadingHTTPServer):
+    """Clients dropping keep-alive connections is normal here, not worth a traceback"""
+    
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandInServers:
+    """Local stand-ins for Ollama, WordPress and Pexels with configurable latency and errors"""
+    
+    def __init__(self, args, log):
+        self.args = args
+        self.log = log
+        self.content = FakeContent()
+        self.ids = iter(range(1000, 10 ** 9))
+        self.ids_lock = threading.Lock()
+        self.tags = {}
+        self.tags_lock = threading.Lock()
+        self.categories = {name.lower(): {"id": i + 1, "name": name} for i, name in enumerate(["Uncategorized"] + CATEGORIES)}
+        for i in range(args.site_tags):
+            self.tags[f"site tag {i}"] = {"id": self.next_id(), "name": f"Site Tag {i}"}
+        self.posts = {}
+        self.media = set()
+        for i in range(args.site_posts):
+            media_id = self.next_id()
+            self.media.add(media_id)
+            self.posts[self.next_id()] = {"title": f"Site Post {i}", "featured_media": media_id}
+        self.servers = []
+    
+    def next_id(self):
+        with self.ids_lock:
+            return next(self.ids)
+    
+    def start(self):
+        """Start all servers on free local ports, returns (ollama urls, wordpress url, pexels url)"""
+        ollama = [self._serve(self._ollama_handler()) for _ in range(self.args.ollama_endpoints)]
+        wordpress = self._serve(self._wordpress_handler())
+        return ollama, wordpress, f"{wordpress}/pexels/v1"
+    
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+    
+    def _serve(self, handler):
+        server = QuietServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+    
+    def _failing(self):
+        return self.args.error_rate and random.random() < self.args.error_rate
+    
+    def _base_handler(self, service):
+        servers = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+            
+            def send_json(self, obj, status=200, headers=None):
+                body = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def handle_method(self, method):
+                servers.log.add(service, method, self.path)
+                body = self.read_body()
+                if servers._failing():
+                    return self.send_json({"error": "injected failure"}, status=503)
+                self.route(method, body)
+            
+            def do_GET(self):
+                self.handle_method("GET")
+            
+            def do_POST(self):
+                self.handle_method("POST")
+            
+            def do_DELETE(self):
+                self.handle_method("DELETE")
+            
+            def do_OPTIONS(self):
+                self.handle_method("OPTIONS")
+        
+        return Handler
+    
+    def _ollama_handler(self):
+        servers = self
+        args = self.args
+        slots = threading.Semaphore(args.ollama_parallel)  # Each endpoint is its own GPU
+        loaded = set()  # Models this endpoint has in memory
+        loaded_lock = threading.Lock()
+        
+        class OllamaHandler(self._base_handler("ollama")):
+            def route(self, method, body):
+                if method == "GET":
+                    models = [os.environ["OLLAMA_MODEL"]] + ([args.small_model] if args.small_model else [])
+                    return self.send_json({"models": [{"name": name} for name in models]})
+                request = json.loads(body or b"{}")
+                # The small model answers the same, only faster
+                speedup = args.small_model_speedup if args.small_model and request.get("model") == args.small_model else 1
+                with slots:
+                    with loaded_lock:
+                        cold = request.get("model") not in loaded
+                        loaded.add(request.get("model"))
+                    load = args.model_load if cold else 0.0
+                    time.sleep(load + args.latency / speedup)
+                    text = servers.content.respond(request.get("prompt", ""), args.article_words)
+                    limit = request.get("options", {}).get("num_predict")
+                    words = text.split(" ")
+                    if limit and len(words) > limit:
+                        text = " ".join(words[:limit])
+                    prompt_tokens = len((request.get("system", "") + request.get("prompt", "")).split())
+                    eval_seconds = len(words) / (args.token_rate * speedup) if args.token_rate else 0.0
+                    final = {"done": True, "context": [1, 2, 3], "prompt_eval_count": prompt_tokens,
+                             "prompt_eval_duration": prompt_tokens * 10 ** 5, "eval_count": len(words),
+                             "eval_duration": int(eval_seconds * 1e9), "load_duration": int(load * 1e9),
+                             "total_duration": int((load + args.latency / speedup + eval_seconds) * 1e9)}
+                    if request.get("stream"):
+                        self.stream(text, final, speedup)
+                    else:
+                        if args.token_rate:
+                            time.sleep(len(words) / (args.token_rate * speedup))
+                        self.send_json(dict(final, response=text))
+            
+            def stream(self, text, final, speedup=1):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = text.split(" ")
+                try:
+                    for i in range(0, len(words), 8):
+                        chunk = " ".join(words[i:i + 8]) + (" " if i + 8 < len(words) else "")
+                        if args.token_rate:
+                            time.sleep(8 / (args.token_rate * speedup))
+                        self.write_chunk({"response": chunk, "done": False})
+                    self.write_chunk(dict(final, response=""))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading - same as Ollama, stop generating
+                    self.close_connection = True
+            
+            def write_chunk(self, obj):
+                line = (json.dumps(obj) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        
+        return OllamaHandler
+    
+    def _wordpress_handler(self):
+        servers = self
+        args = self.args
+        
+        class WordPressHandler(self._base_handler("wordpress")):
+            def route(self, method, body):
+                path = urlparse(self.path)
+                
+                if path.path.startswith("/pexels/"):
+                    time.sleep(args.pexels_latency)
+                    port = self.server.server_port
+                    return self.send_json({"photos": [{"src": {"original": f"http://127.0.0.1:{port}/images/photo.jpg"}}]})
+                if path.path.startswith("/images/"):
+                    time.sleep(args.pexels_latency)
+                    self.send_response(200)
+                    self.send_header("Content-Type", "image/jpeg")
+                    self.send_header("Content-Length", str(len(TINY_JPEG)))
+                    self.end_headers()
+                    return self.wfile.write(TINY_JPEG)
+                
+                time.sleep(args.wp_latency)
+                data = json.loads(body) if body and self.headers.get("Content-Type", "").startswith("application/json") else {}
+                if path.path == "/wp-json/batch/v1":
+                    if args.no_batch:
+                        return self.send_json({"code": "rest_no_route"}, status=404)
+                    if method == "OPTIONS":
+                        return self.send_json({"endpoints": [{"methods": ["POST"], "args": {"requests": {"maxItems": 25}}}]})
+                    return self.send_json({"responses": [servers.batch_item(item) for item in data.get("requests", [])]}, status=207)
+                route = path.path.split("/wp-json/wp/v2", 1)[-1].strip("/")
+                self.send_json(*servers.wp_api(method, route, parse_qs(path.query), data))
+        
+        return WordPressHandler
+    
+    def batch_item(self, item):
+        """Run one sub-request of a /batch/v1 call"""
+        path = urlparse(item.get("path", ""))
+        if not path.path.startswith("/wp/v2/"):
+            return {"status": 400, "body": {"code": "rest_batch_not_allowed"}, "headers": {}}
+        self.log.add("wordpress", f"{item.get('method', 'POST')} (batched)", "/wp-json" + path.path)
+        obj, status, headers = self.wp_api(item.get("method", "POST"), path.path[len("/wp/v2/"):], parse_qs(path.query), item.get("body") or {})
+        return {"status": status, "body": obj, "headers": headers or {}}
+    
+    def wp_api(self, method, route, query, data):
+        """The wp/v2 routes: (response body, status, headers)"""
+        if route == "":
+            return {"namespace": "wp/v2"}, 200, None
+        if route == "users/me":
+            return {"id": 1, "name": "benchmark"}, 200, None
+        if route in ("categories", "tags"):
+            terms = self.categories if route == "categories" else self.tags
+            if method == "POST":
+                return self._create_term(terms, data.get("name", ""))
+            search = query.get("search", [""])[0].lower()
+            with self.tags_lock:
+                found = sorted((term for key, term in terms.items() if search in key),
+                               key=lambda term: term["id"], reverse=query.get("order", ["asc"])[0] == "desc")
+            return self._page(found, query)
+        if route == "media":
+            media_id = self.next_id()
+            self.media.add(media_id)
+            return {"id": media_id}, 201, None
+        match = re.fullmatch(r"media/(\d+)", route)
+        if match:
+            media_id = int(match.group(1))
+            if method != "DELETE" or media_id not in self.media:
+                return {"code": "rest_post_invalid_id", "data": {"status": 404}}, 404, None
+            self.media.discard(media_id)
+            return {"deleted": True, "previous": {"id": media_id}}, 200, None
+        if route == "posts":
+            if method == "POST":
+                post_id = self.next_id()
+                self.posts[post_id] = data
+                return {"id": post_id, "link": f"http://benchmark.local/?p={post_id}", "status": data.get("status", "publish")}, 201, None
+            search = query.get("search", [""])[0].lower()
+            ids = sorted(post_id for post_id, post in list(self.posts.items()) if search in post.get("title", "").lower())
+            items, status, headers = self._page(ids, query)
+            return [{"id": post_id, "title": {"raw": self.posts[post_id].get("title", "")},
+                     "featured_media": self.posts[post_id].get("featured_media", 0)} for post_id in items], status, headers
+        match = re.fullmatch(r"posts/(\d+)", route)
+        if match:
+            post_id = int(match.group(1))
+            if post_id not in self.posts:
+                return {"code": "rest_post_invalid_id", "data": {"status": 404}}, 404, None
+            if method == "DELETE":
+                self.posts.pop(post_id, None)
+                return {"deleted": True, "previous": {"id": post_id}}, 200, None
+            if method == "POST":
+                self.posts[post_id] = dict(self.posts[post_id], **data)
+            return {"id": post_id}, 200, None
+        return {"code": "rest_no_route"}, 404, None
+    
+    def _create_term(self, terms, name):
+        """Create a tag or category, answering term_exists like WordPress for a known name"""
+        with self.tags_lock:
+            existing = terms.get(name.lower())
+            if existing is None:
+                terms[name.lower()] = term = {"id": self.next_id(), "name": name}
+        if existing is not None:
+            return {"code": "term_exists", "message": "A term with the name provided already exists.",
+                    "data": {"status": 400, "term_id": existing["id"]}}, 400, None
+        return term, 201, None
+    
+    def _page(self, items, query):
+        """One page of a collection with the X-WP-Total(Pages) headers"""
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["10"])[0])
+        total_pages = max(1, -(-len(items) // per_page))
+        return items[(page - 1) * per_page:page * per_page], 200, {"X-WP-Total": str(len(items)), "X-WP-TotalPages": str(total_pages)}
+
+
+def configure_environment(args, ollama_urls, wordpress_url):
+    """Point the app's config at the stand-ins - must run before the app modules are imported"""
+    os.environ.update({
+        "OLLAMA_BASE_URL": ",".join(ollama_urls),
+        "WORDPRESS_URL": wordpress_url,
+        "WORDPRESS_USERNAME": "benchmark",
+        "WORDPRESS_APP_PASSWORD": "benchmark",
+        "PEXELS_API_KEY": "benchmark",
+        "CONTENT_ENGINE": args.engine,
+        "OLLAMA_STREAM": "true" if args.stream else "false",
+        "TRACE_DIR": "traces",
+        "LLM_CACHE_ENABLED": "true" if args.llm_cache else "false",
+        "METADATA_ENGINE": args.metadata,
+        "OLLAMA_SMALL_MODEL": args.small_model or "",
+    })
+    os.environ.setdefault("OLLAMA_MODEL", "benchmark-model")
+
+
+def run_benchmark(args):
+    log = RequestLog()
+    servers = StandInServers(args, log)
+    ollama_urls, wordpress_url, pexels_url = servers.start()
+    configure_environment(args, ollama_urls, wordpress_url)
+    
+    # Keep published_posts.json and the LLM cache of the benchmark out of the working tree
+    workdir = tempfile.mkdtemp(prefix="blog-benchmark-")
+    os.chdir(workdir)
+    
+    from auto_publisher import AutoPublisher
+    from tracing import tracer
+    
+    output = sys.stdout if args.verbose else open(os.devnull, "w")
+    with contextlib.redirect_stdout(output):
+        auto_publisher = AutoPublisher()
+        auto_publisher.publisher.image_finder.pexels_api_url = pexels_url
+        results = []
+        
+        # Count only the benchmarked posts, not the startup probes
+        log.counts.clear()
+        start = time.perf_counter()
+        if args.mode == "loop":
+            auto_publisher.run_loop(topic=args.topic, max_posts=args.posts)
+        elif args.mode == "pipeline":
+            auto_publisher.run_pipeline(topic=args.topic, workers=args.workers, publish_workers=args.publish_workers, max_posts=args.posts)
+        else:
+            auto_publisher.run_async(topic=args.topic, concurrency=args.workers, max_posts=args.posts)
+        elapsed = time.perf_counter() - start
+        published = len(servers.posts) - args.site_posts
+        counts = dict(log.counts)
+        
+        cleanup = None
+        if args.cleanup:
+            log.counts.clear()
+            cleanup_start = time.perf_counter()
+            deleted = auto_publisher.publisher.delete_all_posts(delete_media=args.cleanup_media)
+            cleanup = {"deleted": deleted, "elapsed": time.perf_counter() - cleanup_start, "requests": dict(log.counts),
+                       "posts_left": len(servers.posts), "media_left": len(servers.media)}
+    
+    servers.stop()
+    return {
+        "mode": args.mode,
+        "engine": args.engine,
+        "metadata": args.metadata,
+        "small_model": args.small_model,
+        "stream": args.stream,
+        "posts": args.posts,
+        "workers": args.workers,
+        "published": published,
+        "elapsed": elapsed,
+        "posts_per_sec": published / elapsed if elapsed else 0.0,
+        "stages": {
+            stage: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for stage, values in tracer.durations.items()
+        },
+        "trace": os.path.abspath(tracer.path),
+        "requests_per_post": {
+            route: count / max(1, published) for route, count in sorted(counts.items())
+        },
+        "quality": metadata_quality(servers.posts.values()),
+        "ollama": auto_publisher.generator.telemetry.snapshot(),
+        "cleanup": cleanup,
+    }
+
+
+def metadata_quality(posts):
+    """Share of published posts whose title and excerpt meet the SEO rules, and their average tag count"""
+    posts = list(posts)
+    if not posts:
+        return {}
+    return {
+        "title 60-70 chars": sum(60 <= len(post.get("title", "")) <= 70 for post in posts) / len(posts),
+        "excerpt 70-160 chars": sum(70 <= len(post.get("excerpt", "")) <= 160 for post in posts) / len(posts),
+        "tags per post": sum(len(post.get("tags", [])) for post in posts) / len(posts),
+    }
+
+
+def print_report(report):
+    print("=" * 60)
+    print(f"Benchmark: mode={report['mode']} engine={report['engine']} metadata={report['metadata']} "
+          f"small_model={report['small_model'] or '-'} stream={report['stream']} workers={report['workers']}")
+    print("=" * 60)
+    print(f"Published {report['published']}/{report['posts']} posts in {report['elapsed']:.2f}s - "
+          f"{report['posts_per_sec']:.3f} posts/sec ({report['posts_per_sec'] * 3600:.0f} posts/hour)")
+    
+    print(f"\n{'Stage':<24}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, stats in sorted(report['stages'].items()):
+        print(f"{stage:<24}{stats['count']:>7}{stats['p50']:>9.3f}s{stats['p95']:>9.3f}s{stats['p99']:>9.3f}s")
+    
+    print(f"\nRequests per published post:")
+    for route, count in report['requests_per_post'].items():
+        print(f"  {route:<45}{count:>7.2f}")
+    
+    ollama = report['ollama']
+    print(f"\nOllama (per model):")
+    for model, stats in sorted(ollama['models'].items()):
+        prefill = f"{stats['prefill_tokens_per_sec']:.0f}" if stats['prefill_tokens_per_sec'] else "-"
+        decode = f"{stats['decode_tokens_per_sec']:.0f}" if stats['decode_tokens_per_sec'] else "-"
+        print(f"  {model:<28}{stats['calls']:>5} calls  prompt avg {stats['avg_prompt_tokens']:>5.0f}  "
+              f"prefill {prefill:>6} tok/s  decode {decode:>6} tok/s  cold loads {stats['cold_loads']}")
+    
+    if report['quality']:
+        print(f"\nMetadata quality:")
+        for metric, value in report['quality'].items():
+            print(f"  {metric:<45}{value:>7.2f}")
+    if report['cleanup']:
+        cleanup = report['cleanup']
+        print(f"\nCleanup: deleted {cleanup['deleted']} posts in {cleanup['elapsed']:.2f}s "
+              f"({cleanup['posts_left']} posts and {cleanup['media_left']} images left)")
+        for route, count in sorted(cleanup['requests'].items()):
+            print(f"  {route:<45}{count:>7}")
+    print(f"\nTrace: {report['trace']}")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the blog pipeline against local stand-in servers')
+    parser.add_argument('--mode', choices=['loop', 'pipeline', 'async'], default='loop',
+                        help='Path to drive: sequential generate_and_publish, the threaded pipeline or the asyncio pipeline')
+    parser.add_argument('--posts', type=int, default=5, help='Number of posts to produce')
+    parser.add_argument('--workers', type=int, default=2, help='Generation workers (pipeline) or posts in flight (async)')
+    parser.add_argument('--publish-workers', type=int, default=2, help='Publish workers (pipeline)')
+    parser.add_argument('--topic', type=str, default=None, help='Fixed topic (default: auto-selected)')
+    parser.add_argument('--engine', choices=['single', 'sections'], default='single', help='CONTENT_ENGINE to benchmark')
+    parser.add_argument('--stream', action='store_true', help='Stream generations (OLLAMA_STREAM)')
+    parser.add_argument('--metadata', choices=['llm', 'local', 'json'], default='llm', help='METADATA_ENGINE to benchmark')
+    parser.add_argument('--small-model', type=str, default=None, help='OLLAMA_SMALL_MODEL for title, tags, outline and metadata')
+    parser.add_argument('--small-model-speedup', type=float, default=4.0, help='How much faster the stand-in answers with the small model')
+    parser.add_argument('--llm-cache', action='store_true', help='Enable the on-disk LLM response cache')
+    parser.add_argument('--latency', type=float, default=0.05, help='Ollama time to first token in seconds')
+    parser.add_argument('--token-rate', type=float, default=2000, help='Ollama tokens/sec per request (0 = instant)')
+    parser.add_argument('--model-load', type=float, default=0.0, help='Seconds the first request for each model on an endpoint spends loading it')
+    parser.add_argument('--ollama-parallel', type=int, default=4, help='Requests one stand-in Ollama serves at once')
+    parser.add_argument('--ollama-endpoints', type=int, default=1, help='Number of Ollama endpoints to configure')
+    parser.add_argument('--wp-latency', type=float, default=0.02, help='WordPress latency per request in seconds')
+    parser.add_argument('--pexels-latency', type=float, default=0.05, help='Pexels/image latency per request in seconds')
+    parser.add_argument('--site-tags', type=int, default=250, help='Tags the stand-in WordPress site already has')
+    parser.add_argument('--cleanup', action='store_true', help='Delete the published posts afterwards and report what it took')
+    parser.add_argument('--cleanup-media', action='store_true', help='With --cleanup: also delete the featured images')
+    parser.add_argument('--site-posts', type=int, default=0, help='Posts (with featured images) the stand-in WordPress site already has')
+    parser.add_argument('--no-batch', action='store_true', help='Stand-in WordPress without the /batch/v1 endpoint')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503')
+    parser.add_argument('--article-words', type=int, default=2750, help='Length of generated articles')
+    parser.add_argument('--json', type=str, default=None, help='Also write the report to this file (for before/after comparisons)')
+    parser.add_argument('--verbose', action='store_true', help='Show the pipeline output')
+    
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)  # The benchmark runs in a temporary directory
+    report = run_benchmark(args)
+    print_report(report)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,58 +4,556 @@ Focus: SEO optimization + Authentic looksmaxing tone
 """
 
 import re
+import json
+import asyncio
+import threading
+import contextvars
+import aiohttp
 import requests
+from urllib.parse import urlparse
 from looksmaxing_research import LooksmaxingResearch
 from post_tracker import PostTracker
-from config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from similarity_index import SimilarityIndex
+from section_engine import SectionedContentEngine, strip_code_fences
+from content_repair import ContentRepairer
+from metadata_extractor import MetadataExtractor
+from metadata_planner import MetadataPlanner
+from llm_cache import ResponseCache
+from ollama_router import OllamaRouter
+from ollama_telemetry import OllamaTelemetry, CallTotals
+from tracing import traced, annotate
+from html_processor import HTMLPostProcessor
+from http_client import get_session, get_async_session
+from config import (
+    OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_STREAM, MAX_WORD_COUNT, STREAM_CHECK_WORDS, MIN_KEYWORD_USES,
+    CONTENT_ENGINE, OLLAMA_SECTION_URLS, OLLAMA_KEEP_ALIVE, OLLAMA_HEALTH_INTERVAL,
+    LLM_CACHE_ENABLED, LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_HOURS, WORDPRESS_URL,
+    DUPLICATE_THRESHOLD, DUPLICATE_MAX_REDRAWS, METADATA_ENGINE, OLLAMA_SMALL_MODEL, OLLAMA_TASK_MODELS
+)
+
+
+# Cache keys used by the post being generated in the current thread or asyncio task
+_post_cache_keys = contextvars.ContextVar("post_cache_keys", default=None)
+
+# (topic, title) reserved in the similarity index by the post being generated
+_post_reservations = contextvars.ContextVar("post_reservations", default=None)
+
+# Links to this host must point at a post we know exists
+INTERNAL_HOST = re.sub(r'^www\.', '', urlparse(WORDPRESS_URL).hostname or "lookizm.com")
+
+# How much of a streamed article the async pipeline waits for before generating tags from it
+PREVIEW_CHARS = 500
+
+
+class GenerationAborted(Exception):
+    """Raised when a streamed generation is cut off because its output is unusable"""
+    
+    def __init__(self, reason, partial_text=""):
+        super().__init__(reason)
+        self.reason = reason
+        self.partial_text = partial_text
+
+
+class StreamMonitor:
+    """
+    Keeps running word and tag counts over a streamed generation and decides
+    when to stop it: once the word limit is reached (at the next closed block,
+    so the HTML stays well-formed) or when the opening words fail the checks
+    that generate_content would otherwise only run at the end.
+    """
+    
+    REFUSAL_MARKERS = ["i'm sorry", "i am sorry", "i cannot", "i can't", "as an ai", "i am unable", "i'm unable"]
+    BLOCK_TAGS = ("p", "ul", "ol", "table", "h2", "h3")
+    
+    def __init__(self, max_words=MAX_WORD_COUNT, check_words=STREAM_CHECK_WORDS):
+        self.max_words = max_words
+        self.check_words = check_words
+        self.word_count = 0
+        self.tag_counts = {}
+        self.limit_reached = False
+        self._in_tag = False
+        self._after_lt = False  # "<" seen, its next character decides whether a tag starts
+        self._in_word = False
+        self._tag_buffer = []
+        self._nesting = 0  # open ul/ol/table elements
+        self._checked = False
+        self._text = []
+    
+    @property
+    def text(self):
+        return "".join(self._text)
+    
+    def feed(self, chunk):
+        """Consume a chunk of generated text. Returns True when generation should stop."""
+        for index, char in enumerate(chunk):
+            if self._after_lt:
+                self._after_lt = False
+                # Same rule as HTMLPostProcessor's tag names - "fat < 10%" is text, not a tag
+                if char.isalpha() or char in '/!':
+                    self._in_tag = True
+                    self._tag_buffer = [char]
+                    continue
+                if not self._in_word:
+                    self._in_word = True
+                    self.word_count += 1
+            if self._in_tag:
+                if char == '>':
+                    self._in_tag = False
+                    if self._close_tag("".join(self._tag_buffer)):
+                        # Drop whatever follows the closed block
+                        self._text.append(chunk[:index + 1])
+                        return True
+                else:
+                    self._tag_buffer.append(char)
+            elif char == '<':
+                self._after_lt = True
+            elif char.isspace():
+                self._in_word = False
+            elif not self._in_word:
+                self._in_word = True
+                self.word_count += 1
+        self._text.append(chunk)
+        
+        if not self._checked and self.word_count >= self.check_words:
+            self._checked = True
+            self._check_opening()
+        
+        if self.word_count >= self.max_words:
+            self.limit_reached = True
+        return False
+    
+    def _close_tag(self, tag):
+        """Record a complete tag. Returns True if the word limit was reached and a block just closed."""
+        closing = tag.startswith('/')
+        name = tag.lstrip('/').split(None, 1)[0].rstrip('/').lower() if tag.strip('/ ') else ''
+        if name in ('ul', 'ol', 'table'):
+            self._nesting += -1 if closing else 1
+        if not closing and name[:1].isalpha():  # Comments and doctypes are skipped, not counted
+            self.tag_counts[name] = self.tag_counts.get(name, 0) + 1
+        return self.limit_reached and closing and name in self.BLOCK_TAGS and self._nesting <= 0
+    
+    def _check_opening(self):
+        """Abort if the opening of the article is already unusable"""
+        text = self.text
+        text_lower = text.lower()
+        opening = text_lower[:300]
+        
+        if any(marker in opening for marker in self.REFUSAL_MARKERS):
+            raise GenerationAborted("model refused or broke character", text)
+        
+        html_tags = sum(self.tag_counts.values())
+        markdown_marks = len(re.findall(r'^#{1,6}\s|\*\*[^*]+\*\*', text, re.MULTILINE))
+        if html_tags == 0:
+            raise GenerationAborted(f"no HTML tags in the first {self.word_count} words", text)
+        if markdown_marks > html_tags:
+            raise GenerationAborted(f"output is Markdown, not HTML ({markdown_marks} Markdown marks vs {html_tags} tags)", text)
+        
+        found = LooksmaxingResearch.term_scanner().found(text_lower)
+        if not any(term in found for term in LooksmaxingResearch.REQUIRED_TERMS):
+            raise GenerationAborted(f"no looksmaxing terminology in the first {self.word_count} words", text)
+
+
+def _parse_keep_alive(value):
+    """Ollama takes keep_alive as a duration string ("30m") or seconds (-1 keeps the model loaded forever)"""
+    value = str(value).strip()
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+MODEL_TASKS = ("title", "tags", "outline", "metadata", "content", "repair")
+SMALL_MODEL_TASKS = ("title", "tags", "outline", "metadata")
+
+
+def _parse_task_models(small_model, overrides):
+    """{task: model} from OLLAMA_SMALL_MODEL and "task=model,..." overrides (unknown tasks are reported and skipped)"""
+    models = {task: small_model.strip() for task in SMALL_MODEL_TASKS if small_model.strip()}
+    for item in overrides.split(','):
+        task, _, model = item.partition('=')
+        task, model = task.strip().lower(), model.strip()
+        if not task:
+            continue
+        if task not in MODEL_TASKS or not model:
+            print(f"⚠ Warning: ignoring OLLAMA_TASK_MODELS entry '{item.strip()}' (tasks: {', '.join(MODEL_TASKS)})")
+            continue
+        models[task] = model
+    return models
+
+
+class PromptCacheStats:
+    """
+    Estimates how much prompt evaluation Ollama skipped thanks to its prompt cache
+    
+    Ollama only counts the prompt tokens it actually evaluated, so a call that
+    reuses a cached prefix reports fewer tokens than its prompt holds. The full
+    size is estimated from the characters-per-token ratio and prefill speed
+    observed on cold calls for the same model.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chars_per_token = {}
+        self._seconds_per_token = {}
+        self.calls = 0
+        self.evaluated_tokens = 0
+        self.saved_tokens = 0
+        self.saved_seconds = 0.0
+    
+    def record(self, model, system_prompt, user_prompt, result):
+        """Record one /api/generate result, returns the estimated seconds saved"""
+        evaluated = result.get('prompt_eval_count')
+        duration = result.get('prompt_eval_duration')
+        if not evaluated or not duration:
+            return 0.0
+        
+        chars = len(system_prompt or '') + len(user_prompt or '')
+        with self._lock:
+            self.calls += 1
+            self.evaluated_tokens += evaluated
+            ratio = chars / evaluated
+            # The smallest ratio seen is the call where the least was cached - the best estimate of a cold call
+            if ratio < self._chars_per_token.get(model, float('inf')):
+                self._chars_per_token[model] = ratio
+                self._seconds_per_token[model] = duration / 1e9 / evaluated
+                return 0.0
+            
+            expected = chars / self._chars_per_token[model]
+            saved = max(0, int(expected - evaluated))
+            seconds = saved * self._seconds_per_token[model]
+            self.saved_tokens += saved
+            self.saved_seconds += seconds
+            return seconds
+    
+    def summary(self):
+        """One-line summary of the prompt-eval savings so far"""
+        return (f"Prompt cache: ~{self.saved_tokens} prompt tokens reused over {self.calls} calls "
+                f"(~{self.saved_seconds:.1f}s prompt eval saved)")
 
 
 class BlogPostGenerator:
     """Generates high-quality blog posts with SEO and authentic tone"""
     
     def __init__(self):
-        self.base_url = OLLAMA_BASE_URL.rstrip('/')
+        urls = [url.strip().rstrip('/') for url in OLLAMA_BASE_URL.split(',') if url.strip()]
+        self.base_url = urls[0]
         self.model_name = OLLAMA_MODEL
+        self.session = get_session()
+        self.router = OllamaRouter(urls, self.model_name, OLLAMA_HEALTH_INTERVAL, self.session)
+        self.keep_alive = _parse_keep_alive(OLLAMA_KEEP_ALIVE)
         self.research = LooksmaxingResearch()
         self.post_tracker = PostTracker()
+        self.prompt_cache = PromptCacheStats()
+        self.telemetry = OllamaTelemetry()
+        self.task_models = _parse_task_models(OLLAMA_SMALL_MODEL, OLLAMA_TASK_MODELS)
+        
+        # Titles and topics of published posts, so a near-duplicate is caught before its article is generated
+        self.similarity = SimilarityIndex(threshold=DUPLICATE_THRESHOLD)
+        for post in self.post_tracker.get_all_posts():
+            self.similarity.add(post.get('title'))
+            if post.get('topic') != "auto-selected":
+                self.similarity.add(post.get('topic'))
+        
+        # Optional on-disk response cache
+        self.cache = ResponseCache(LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_HOURS * 3600) if LLM_CACHE_ENABLED else None
+        
+        # Static prompt parts are built once so every call sends a byte-identical
+        # prefix that Ollama can serve from its prompt cache
+        self._content_system_prompt = self._build_content_system_prompt()
+        self._content_guidelines = self._build_content_guidelines()
+        
+        # Sections are routed like every other call unless pinned to specific endpoints
+        section_urls = [url.strip().rstrip('/') for url in OLLAMA_SECTION_URLS.split(',') if url.strip()]
+        self.section_engine = SectionedContentEngine(self, endpoints=section_urls or None)
+        self.repairer = ContentRepairer(self)
+        
+        # Tags and excerpt picked from the article itself instead of a model call
+        self.metadata_extractor = MetadataExtractor(self.research, self.post_tracker) if METADATA_ENGINE == "local" else None
+        # Or planned with the outline in one structured call
+        self.metadata_planner = MetadataPlanner(self) if METADATA_ENGINE == "json" else None
         
         # Test connection
-        try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            raise ValueError(f"Failed to connect to Ollama at {self.base_url}. Make sure Ollama is running: {e}")
+        healthy = self.router.start()
+        if not healthy:
+            errors = "; ".join(f"{endpoint.url}: {endpoint.last_error}" for endpoint in self.router.endpoints)
+            raise ValueError(f"Failed to connect to Ollama at {OLLAMA_BASE_URL}. Make sure Ollama is running: {errors}")
+        if len(self.router) > 1:
+            print(f"✓ Ollama endpoints: {healthy}/{len(self.router)} healthy")
+        for endpoint in self.router.endpoints:
+            if endpoint.healthy and not endpoint.serves(self.model_name):
+                print(f"⚠ Warning: {endpoint.url} does not list {self.model_name} in /api/tags")
+        self._check_task_models()
     
-    def _generate_text(self, system_prompt, user_prompt, temperature=0.7, max_tokens=4000):
-        """Generate text using Ollama API"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": user_prompt,
-                    "system": system_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                        "top_p": 0.95,
-                        "top_k": 40
-                    }
-                },
+    def model_for(self, task):
+        """The model for a task (title, tags, outline, metadata, content, repair) - OLLAMA_MODEL unless tiered"""
+        return self.task_models.get(task, self.model_name)
+    
+    def _check_task_models(self):
+        """Drop task models no healthy endpoint serves, so those tasks fall back to OLLAMA_MODEL"""
+        for task, model in list(self.task_models.items()):
+            if model == self.model_name:
+                continue
+            if not any(endpoint.healthy and endpoint.serves(model) for endpoint in self.router.endpoints):
+                print(f"⚠ Warning: no Ollama endpoint lists {model} in /api/tags, using {self.model_name} for {task}")
+                del self.task_models[task]
+        tiered = {task: model for task, model in self.task_models.items() if model != self.model_name}
+        if tiered:
+            print("✓ Task models: " + ", ".join(f"{task}={model}" for task, model in sorted(tiered.items())))
+    
+    def _generate_text(self, system_prompt, user_prompt, temperature=0.7, max_tokens=4000, monitor=None, base_url=None, context=None, fresh=False, json_schema=None, model=None):
+        """
+        Generate text using Ollama API
+        
+        If a StreamMonitor is given, the response is streamed and handed to the
+        monitor chunk by chunk so the generation can be cut off early.
+        base_url pins the call to one Ollama endpoint instead of routing it.
+        fresh=True skips the response cache lookup (the new result is still
+        stored). json_schema constrains the answer to JSON matching it
+        (Ollama's format option). model overrides OLLAMA_MODEL, see model_for.
+        """
+        return self._generate_response(system_prompt, user_prompt, temperature, max_tokens, monitor, base_url, context, fresh, json_schema, model)['text']
+    
+    @traced("ollama.generate")
+    def _generate_response(self, system_prompt, user_prompt, temperature=0.7, max_tokens=4000, monitor=None, base_url=None, context=None, fresh=False, json_schema=None, model=None):
+        """
+        Same as _generate_text, but returns the whole Ollama result
+        
+        The generated text is under 'text'; 'context' and the timing fields are
+        passed through so callers can continue a conversation. A previous
+        'context' can be given to continue from it.
+        """
+        payload = self._build_payload(system_prompt, user_prompt, temperature, max_tokens, monitor is not None, context, json_schema, model)
+        cache_key, cached = self._lookup_cache(payload, fresh)
+        annotate(model=payload["model"], stream=payload["stream"], cached=cached is not None)
+        if cached is not None:
+            return cached
+        
+        def request(base_url):
+            if monitor is not None:
+                return self._generate_text_stream(base_url, payload, monitor)
+            response = self.session.post(
+                f"{base_url}/api/generate",
+                json=payload,
                 timeout=300
             )
             response.raise_for_status()
             
             result = response.json()
-            if 'response' in result:
-                return result['response'].strip()
-            else:
+            if 'response' not in result:
+                raise ValueError("Empty response from model")
+            result['text'] = result['response'].strip()
+            return result
+        
+        tried = set()
+        while True:
+            url = base_url or self.router.acquire(exclude=tried, model=payload["model"])
+            annotate(endpoint=url, failovers=len(tried))
+            try:
+                result = request(url)
+            except requests.exceptions.RequestException as e:
+                if not self._fail_over(url, base_url, tried, monitor, e):
+                    print(f"Error generating text: {e}")
+                    raise
+                continue
+            except BaseException:
+                if not base_url:
+                    self.router.release(url)
+                raise
+            if not base_url:
+                self.router.release(url)
+            return self._record_result(payload, result, cache_key, url)
+    
+    async def _generate_text_async(self, system_prompt, user_prompt, temperature=0.7, max_tokens=4000, monitor=None, base_url=None, context=None, fresh=False, preview=None, json_schema=None, model=None):
+        """Async counterpart of _generate_text"""
+        result = await self._generate_response_async(system_prompt, user_prompt, temperature, max_tokens, monitor, base_url, context, fresh, preview, json_schema, model)
+        return result['text']
+    
+    @traced("ollama.generate")
+    async def _generate_response_async(self, system_prompt, user_prompt, temperature=0.7, max_tokens=4000, monitor=None, base_url=None, context=None, fresh=False, preview=None, json_schema=None, model=None):
+        """
+        Async counterpart of _generate_response
+        
+        When streaming, preview (an asyncio.Future) is resolved with the first
+        PREVIEW_CHARS characters as soon as they arrive.
+        """
+        payload = self._build_payload(system_prompt, user_prompt, temperature, max_tokens, monitor is not None, context, json_schema, model)
+        cache_key, cached = self._lookup_cache(payload, fresh)
+        annotate(model=payload["model"], stream=payload["stream"], cached=cached is not None)
+        if cached is not None:
+            return cached
+        
+        session = get_async_session()
+        
+        async def request(base_url):
+            if monitor is not None:
+                return await self._generate_text_stream_async(session, base_url, payload, monitor, preview)
+            async with session.post(f"{base_url}/api/generate", json=payload, timeout=aiohttp.ClientTimeout(total=300)) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+            if 'response' not in result:
                 raise ValueError("Empty response from model")
+            result['text'] = result['response'].strip()
+            return result
+        
+        tried = set()
+        while True:
+            url = base_url or self.router.acquire(exclude=tried, model=payload["model"])
+            annotate(endpoint=url, failovers=len(tried))
+            try:
+                result = await request(url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not self._fail_over(url, base_url, tried, monitor, e):
+                    print(f"Error generating text: {e!r}")
+                    raise
+                continue
+            except BaseException:
+                if not base_url:
+                    self.router.release(url)
+                raise
+            if not base_url:
+                self.router.release(url)
+            return self._record_result(payload, result, cache_key, url)
+    
+    def _fail_over(self, url, base_url, tried, monitor, error):
+        """
+        Take a failed endpoint out of rotation; returns True if the call should
+        be retried on another one. Pinned calls and streams that already
+        produced output are not retried.
+        """
+        if base_url:
+            return False
+        self.router.release(url, error=error)
+        tried.add(url)
+        if (monitor is not None and monitor.text) or not self.router.has_untried(tried):
+            return False
+        print(f"  ⚠ Ollama endpoint {url} failed ({error}), failing over...")
+        return True
+    
+    def _build_payload(self, system_prompt, user_prompt, temperature, max_tokens, stream, context, json_schema=None, model=None):
+        """Build the /api/generate request body"""
+        payload = {
+            "model": model or self.model_name,
+            "prompt": user_prompt,
+            "system": system_prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                "top_p": 0.95,
+                "top_k": 40
+            }
+        }
+        if context:
+            payload["context"] = context
+        if json_schema:
+            payload["format"] = json_schema
+        return payload
+    
+    def _lookup_cache(self, payload, fresh):
+        """Returns (cache key, cached result or None); the key is None when caching is off"""
+        if not self.cache:
+            return None, None
+        options = dict(payload["options"], context=payload.get("context"))
+        if "format" in payload:
+            options["format"] = payload["format"]
+        cache_key = self.cache.make_key(payload["model"], payload["system"], payload["prompt"], options)
+        self._track_cache_key(cache_key)
+        if fresh:
+            return cache_key, None
+        return cache_key, self.cache.get(cache_key)
+    
+    def _record_result(self, payload, result, cache_key, endpoint):
+        """Account for a finished generation and store it in the response cache"""
+        call = self.telemetry.record(payload["model"], endpoint, result)
+        annotate(prompt_tokens=result.get('prompt_eval_count'), tokens=result.get('eval_count'), chars=len(result['text']),
+                 load_seconds=round(call['load_seconds'], 3))
+        self.prompt_cache.record(payload["model"], payload["system"], payload["prompt"], result)
+        if cache_key:
+            self.cache.put(cache_key, result)
+        return result
+    
+    def _track_cache_key(self, key):
+        """Remember a cache entry used by the post currently being generated"""
+        keys = _post_cache_keys.get()
+        if keys is not None:
+            keys.append(key)
+    
+    def collect_cache_keys(self, keys):
+        """Make the current thread or task record the cache entries it uses into keys"""
+        _post_cache_keys.set(keys)
+    
+    def forget_cached(self, post_data):
+        """
+        Drop the cached responses a post was generated from
+        
+        Called once the post is published, so the next post with the same topic
+        is new work while reruns of a failed post are still served from cache.
+        """
+        if self.cache:
+            self.cache.discard(post_data.get('cache_keys', []))
+    
+    def _generate_text_stream(self, base_url, payload, monitor):
+        """Read NDJSON chunks from Ollama as they arrive, stopping when the monitor says so"""
+        next_report = 500
+        result = {}
+        # Leaving the with-block closes the connection, which makes Ollama stop generating
+        with self.session.post(f"{base_url}/api/generate", json=payload, stream=True, timeout=300) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise ValueError(f"Model error: {chunk['error']}")
                 
-        except requests.exceptions.RequestException as e:
-            print(f"Error generating text: {e}")
-            raise
+                if monitor.feed(chunk.get('response', '')):
+                    print(f"  ✂ Stopped generation at {monitor.word_count} words (limit {monitor.max_words})")
+                    break
+                if monitor.word_count >= next_report:
+                    print(f"  … {monitor.word_count} words generated", flush=True)
+                    next_report += 500
+                if chunk.get('done'):
+                    # The final chunk carries the context and timing fields
+                    result = chunk
+                    break
+        
+        text = monitor.text.strip()
+        if not text:
+            raise ValueError("Empty response from model")
+        result['text'] = text
+        return result
+    
+    async def _generate_text_stream_async(self, session, base_url, payload, monitor, preview=None):
+        """Async counterpart of _generate_text_stream"""
+        next_report = 500
+        received = 0
+        result = {}
+        async with session.post(f"{base_url}/api/generate", json=payload, timeout=aiohttp.ClientTimeout(total=None, sock_read=300)) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise ValueError(f"Model error: {chunk['error']}")
+                
+                text = chunk.get('response', '')
+                received += len(text)
+                if monitor.feed(text):
+                    print(f"  ✂ Stopped generation at {monitor.word_count} words (limit {monitor.max_words})")
+                    break
+                if preview is not None and not preview.done() and received >= PREVIEW_CHARS:
+                    preview.set_result(monitor.text[:PREVIEW_CHARS])
+                if monitor.word_count >= next_report:
+                    print(f"  … {monitor.word_count} words generated", flush=True)
+                    next_report += 500
+                if chunk.get('done'):
+                    result = chunk
+                    break
+        
+        text = monitor.text.strip()
+        if not text:
+            raise ValueError("Empty response from model")
+        result['text'] = text
+        return result
     
     def _get_research_data(self):
         """Get all research data for prompts"""
@@ -71,12 +569,40 @@ class BlogPostGenerator:
             "language_guidelines": language_guidelines
         }
     
-    def generate_title(self, topic=None):
-        """Generate an SEO-optimized title"""
+    @traced("generate.title")
+    def generate_title(self, topic=None, avoid=()):
+        """Generate an SEO-optimized title (clearly different from the titles in avoid)"""
         if not topic:
             topic = self.research.get_topic_suggestion()
         
+        system_prompt, title_prompt = self._build_title_prompt(topic, avoid)
+        
+        try:
+            title = self._generate_text(system_prompt, title_prompt, temperature=0.8, max_tokens=100, model=self.model_for("title"))
+            return self._clean_title(title, topic)
+        except Exception as e:
+            print(f"Error generating title: {e}")
+            return f"Complete Guide to {topic}"
+    
+    @traced("generate.title")
+    async def generate_title_async(self, topic=None, avoid=()):
+        """Async counterpart of generate_title"""
+        if not topic:
+            topic = self.research.get_topic_suggestion()
+        
+        system_prompt, title_prompt = self._build_title_prompt(topic, avoid)
+        
+        try:
+            title = await self._generate_text_async(system_prompt, title_prompt, temperature=0.8, max_tokens=100, model=self.model_for("title"))
+            return self._clean_title(title, topic)
+        except Exception as e:
+            print(f"Error generating title: {e!r}")
+            return f"Complete Guide to {topic}"
+    
+    def _build_title_prompt(self, topic, avoid=()):
+        """Returns (system prompt, user prompt) for title generation"""
         system_prompt = "You are an expert SEO content creator specializing in looksmaxing and male self-improvement."
+        avoid_rule = f"\n- Clearly different from these existing titles: {'; '.join(avoid)}" if avoid else ""
         
         title_prompt = f"""Generate ONLY a blog post title about: {topic}
 
@@ -87,93 +613,263 @@ Requirements:
 - Include primary keyword naturally
 - Engaging and click-worthy
 - Uses looksmaxing terminology
-- Title case
+- Title case{avoid_rule}
 
 Title:"""
+        return system_prompt, title_prompt
+    
+    def _generate_unique_title(self, topic=None):
+        """
+        Pick the topic (drawing one if none is given) and generate its title,
+        skipping near-duplicates of published posts. Returns (topic, title).
         
-        try:
-            title = self._generate_text(system_prompt, title_prompt, temperature=0.8, max_tokens=100)
-            title = title.strip('"').strip("'").strip()
-            title = title.replace("Title:", "").replace("Title", "").strip()
-            if '\n' in title:
-                title = title.split('\n')[0].strip()
-            if len(title) > 70:
-                title = title[:67] + "..."
-            return title if title else f"Complete Guide to {topic}"
-        except Exception as e:
-            print(f"Error generating title: {e}")
-            return f"Complete Guide to {topic}"
+        A title too close to a published one is generated again, with a new
+        topic if the topic was drawn, up to DUPLICATE_MAX_REDRAWS times.
+        """
+        drawn = not topic
+        topic = self._choose_topic(topic)
+        rejected = []
+        for _ in range(DUPLICATE_MAX_REDRAWS + 1):
+            title = self.generate_title(topic, avoid=[match for _, _, _, match in rejected])
+            topic, retry = self._review_title(topic, title, drawn, rejected)
+            if not retry:
+                return topic, title
+        return self._accept_least_similar(rejected)
+    
+    async def _generate_unique_title_async(self, topic=None):
+        """Async counterpart of _generate_unique_title"""
+        drawn = not topic
+        topic = self._choose_topic(topic)
+        rejected = []
+        for _ in range(DUPLICATE_MAX_REDRAWS + 1):
+            title = await self.generate_title_async(topic, avoid=[match for _, _, _, match in rejected])
+            topic, retry = self._review_title(topic, title, drawn, rejected)
+            if not retry:
+                return topic, title
+        return self._accept_least_similar(rejected)
     
-    def generate_content(self, title, topic=None):
-        """Generate full blog post content - single request with SEO and authentic tone"""
+    def _choose_topic(self, topic=None):
+        """The given topic, or a drawn one that is not a near-duplicate of a published post"""
+        if topic:
+            return topic
+        candidates = []
+        for _ in range(DUPLICATE_MAX_REDRAWS + 1):
+            candidate = self.research.get_topic_suggestion()
+            duplicate = self.similarity.find_duplicate(candidate)
+            if not duplicate:
+                break
+            print(f"⚠ Topic '{candidate}' is too close to '{duplicate[1]}' ({duplicate[0]:.2f}), drawing another")
+            candidates.append((duplicate[0], candidate))
+        else:
+            candidate = min(candidates)[1]
+        print(f"Selected topic: {candidate}")
+        return candidate
+    
+    def _review_title(self, topic, title, drawn, rejected):
+        """
+        Accept a title that is not a near-duplicate, or record it in rejected.
+        Returns (topic to use, whether to generate another title).
+        """
+        duplicate = self.similarity.find_duplicate(title)
+        if not duplicate:
+            self._reserve(topic, title)
+            return topic, False
+        print(f"⚠ Title '{title}' is too close to '{duplicate[1]}' ({duplicate[0]:.2f}), generating another")
+        rejected.append((duplicate[0], topic, title, duplicate[1]))
+        return (self._choose_topic() if drawn else topic), True
+    
+    def _accept_least_similar(self, rejected):
+        _, topic, title, _ = min(rejected)
+        print(f"⚠ No distinct title after {len(rejected)} attempts, using '{title}'")
+        self._reserve(topic, title)
+        return topic, title
+    
+    def _reserve(self, topic, title):
+        """Index an accepted post right away, so posts generated concurrently don't duplicate it"""
+        self.similarity.add(title)
+        self.similarity.add(topic)
+        reserved = _post_reservations.get()
+        if reserved is not None:
+            reserved.append((topic, title))
+    
+    def _release(self, reserved):
+        """Take back the reservations of a post that failed, so its retry isn't its own near-duplicate"""
+        for topic, title in reserved:
+            self.similarity.remove(title)
+            self.similarity.remove(topic)
+    
+    def _plan_post(self, topic=None):
+        """
+        Pick the topic and title of the next post. Returns (topic, title, plan).
+        
+        With METADATA_ENGINE=json one structured call also plans tags,
+        category, excerpt and outline; the plan only holds the fields that
+        passed validation, the others are produced by their own methods.
+        """
+        if not self.metadata_planner:
+            topic, title = self._generate_unique_title(topic)
+            return topic, title, {}
+        topic = self._choose_topic(topic)
+        plan = self.metadata_planner.plan(topic)
+        title = self._pick_planned_title(topic, plan)
+        if title is None:
+            topic, title = self._generate_unique_title(topic)
+        return topic, title, plan
+    
+    async def _plan_post_async(self, topic=None):
+        """Async counterpart of _plan_post"""
+        if not self.metadata_planner:
+            topic, title = await self._generate_unique_title_async(topic)
+            return topic, title, {}
+        topic = self._choose_topic(topic)
+        plan = await self.metadata_planner.plan_async(topic)
+        title = self._pick_planned_title(topic, plan)
+        if title is None:
+            topic, title = await self._generate_unique_title_async(topic)
+        return topic, title, plan
+    
+    def _pick_planned_title(self, topic, plan):
+        """The first planned title (or alternative) that is not a near-duplicate, or None"""
+        titles = plan.pop('titles', [])
+        for title in titles:
+            duplicate = self.similarity.find_duplicate(title)
+            if not duplicate:
+                self._reserve(topic, title)
+                return title
+            print(f"⚠ Title '{title}' is too close to '{duplicate[1]}' ({duplicate[0]:.2f})")
+        return None
+    
+    def _clean_title(self, title, topic):
+        """Strip quotes, labels and extra lines from a generated title"""
+        title = title.strip('"').strip("'").strip()
+        title = title.replace("Title:", "").replace("Title", "").strip()
+        if '\n' in title:
+            title = title.split('\n')[0].strip()
+        if len(title) > 70:
+            title = title[:67] + "..."
+        return title if title else f"Complete Guide to {topic}"
+    
+    @traced("generate.content")
+    def generate_content(self, title, topic=None, with_stats=False, outline=None):
+        """
+        Generate full blog post content - single request or outline + parallel sections, with SEO and authentic tone
+        
+        A planned outline (list of dicts with h2 and h3) replaces the outline
+        request of the sections engine and is followed by the single request.
+        Returns the content, or (content, ContentStats) with with_stats
+        """
         if not topic:
             topic = self.research.get_topic_suggestion()
         
         keywords = self.research.get_keywords_for_topic(topic)
-        research_data = self._get_research_data()
-        language_guidelines = research_data['language_guidelines']
         
         # Get relevant posts for internal linking
-        relevant_posts = self.post_tracker.get_relevant_posts(topic, title, max_posts=4)
-        relevant_posts = [p for p in relevant_posts if p.get('id') and p.get('url') and p.get('title')]
+        relevant_posts = self._get_internal_link_posts(topic, title)
+        internal_links_info = self._build_internal_links_info(relevant_posts)
+        system_prompt = self._content_system_prompt
         
-        internal_links_info = ""
-        if relevant_posts:
-            internal_links_info = "\n\nINTERNAL LINKS (add 2-4 natural links to these posts):\n"
-            for post in relevant_posts:
-                internal_links_info += f"- {post.get('title')} - {post.get('url')}\n"
-        else:
-            internal_links_info = "\n\nNO INTERNAL LINKS: Do NOT create any links or 'Related Posts' sections.\n"
+        try:
+            if CONTENT_ENGINE == "sections":
+                content = self.section_engine.generate(title, topic, keywords, system_prompt, relevant_posts, outline)
+            else:
+                content_prompt = self._build_content_prompt(title, topic, keywords, internal_links_info, outline)
+                monitor = StreamMonitor() if OLLAMA_STREAM else None
+                try:
+                    content = self._generate_text(system_prompt, content_prompt, temperature=0.7, max_tokens=12000, monitor=monitor, model=self.model_for("content"))
+                except requests.exceptions.RequestException as e:
+                    content = self._salvage(monitor, e)
+                content = strip_code_fences(content)
+            
+            if self.repairer.budget > 0:
+                content = self.repairer.repair(content, title, topic, keywords, system_prompt)
+            content, stats = self._finalize_content(content, relevant_posts, keywords, topic)
+            return (content, stats) if with_stats else content
+            
+        except Exception as e:
+            print(f"Error generating content: {e}")
+            raise
+    
+    @traced("generate.content")
+    async def generate_content_async(self, title, topic=None, preview=None, with_stats=False, outline=None):
+        """
+        Async counterpart of generate_content
         
-        system_prompt = f"""You are a veteran looksmaxer writing for the looksmax.org community. You write with the authentic, edgy, direct tone of the best-of-the-best subforum. This is NOT a generic self-help blog - this is looksmaxing content for the community.
-
-CRITICAL TERMINOLOGY (MUST use naturally throughout - this is non-negotiable):
-{', '.join(research_data['terminology'][:15])}
-
-COMMON PHRASES (use these naturally):
-{', '.join(research_data['common_phrases'][:8])}
-
-AUTHENTIC TONE (MANDATORY - NO NORMIE LANGUAGE):
-- Edgy, direct, no-bullshit approach
-- Use community slang naturally: mog, chad, based, cope, ascend, maxxing, blackpill
-- Call out normie advice and generic self-help BS
-- Be brutally honest about what works vs what doesn't
-- Use "-maxxing" suffix liberally (skincaremaxxing, fitnessmaxxing, sleepmaxxing, etc.)
-- Write like you're on looksmax.org, not a corporate blog
-- Use specific numbers and timeframes: "30-60 days", "3-6 months", "mogged 80% of guys"
-- Before/after focus, transformation mindset
-- Acknowledge genetic reality but focus on what CAN be changed
-- Use phrases like "real talk", "let's be honest", "most guys don't know this"
-
-AVOID NORMIE LANGUAGE (DO NOT USE):
-- Generic self-help phrases: "self-improvement journey", "personal growth", "be your best self"
-- Corporate speak: "optimize your potential", "unlock your best version"
-- Soft language: "feel good about yourself", "build confidence"
-- Generic fitness terms without looksmaxing context
-- Academic or overly formal tone
-
-USE AUTHENTIC LOOKSMAXING LANGUAGE:
-- "If you're serious about looksmaxing..."
-- "Most guys are doing this wrong..."
-- "Real talk: this is what actually works..."
-- "You'll mog most guys who aren't maxxing..."
-- "The chad aesthetic requires..."
-- "Softmaxxing vs hardmaxxing - here's the real difference..."
-- "This is based, that's cope..." """
+        The single-request engine always streams here so that preview (an
+        asyncio.Future) resolves with the opening of the article while the
+        rest is still generating; the monitor only enforces its word limit and
+        early checks when OLLAMA_STREAM is on.
+        """
+        if not topic:
+            topic = self.research.get_topic_suggestion()
+        
+        keywords = self.research.get_keywords_for_topic(topic)
+        relevant_posts = self._get_internal_link_posts(topic, title)
+        internal_links_info = self._build_internal_links_info(relevant_posts)
+        system_prompt = self._content_system_prompt
         
-        content_prompt = f"""Write a complete, SEO-optimized looksmaxing blog post in proper WordPress HTML format.
+        try:
+            if CONTENT_ENGINE == "sections":
+                content = await self.section_engine.generate_async(title, topic, keywords, system_prompt, relevant_posts, outline)
+            else:
+                content_prompt = self._build_content_prompt(title, topic, keywords, internal_links_info, outline)
+                monitor = StreamMonitor() if OLLAMA_STREAM else StreamMonitor(max_words=float('inf'), check_words=float('inf'))
+                try:
+                    content = await self._generate_text_async(system_prompt, content_prompt, temperature=0.7, max_tokens=12000, monitor=monitor, preview=preview, model=self.model_for("content"))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    content = self._salvage(monitor, e)
+                content = strip_code_fences(content)
+            
+            if self.repairer.budget > 0:
+                content = await self.repairer.repair_async(content, title, topic, keywords, system_prompt)
+            content, stats = self._finalize_content(content, relevant_posts, keywords, topic)
+            return (content, stats) if with_stats else content
+            
+        except Exception as e:
+            print(f"Error generating content: {e!r}")
+            raise
+    
+    def _salvage(self, monitor, error):
+        """Keep what a broken stream produced so the repair pass can continue it, or re-raise"""
+        if monitor is None or not self.repairer.salvageable(monitor.text):
+            raise error
+        print(f"⚠ Generation interrupted after {monitor.word_count} words ({error}), keeping the partial article")
+        return monitor.text
+    
+    def _build_content_prompt(self, title, topic, keywords, internal_links_info, outline=None):
+        """Build the single-request prompt for the whole article: static guidelines first, post-specific details last"""
+        outline_info = ""
+        if outline:
+            outline_info = "ARTICLE OUTLINE (use these H2/H3 headings in this order):\n" + "\n".join(
+                f"{i + 1}. {section['h2']}" + "".join(f"\n   - {h3}" for h3 in section['h3'])
+                for i, section in enumerate(outline)
+            ) + "\n"
+        return f"""{self._content_guidelines}
+
+THIS POST:
 
 TITLE: {title}
 TOPIC: {topic}
-{internal_links_info}
+{outline_info}{internal_links_info}
+SEO KEYWORDS:
+   - Primary keyword: {keywords[0] if keywords else topic}
+   - Secondary keywords: {', '.join(keywords[1:8])}
+
+Now write the complete blog post. Write 2500-3000 words in proper WordPress HTML format with SEO optimization and AUTHENTIC looksmaxing tone (NOT normie language):"""
+    
+    def _build_content_guidelines(self):
+        """
+        Build the static part of the single-request article prompt
+        
+        Nothing post-specific goes in here: it is sent as the start of every
+        article prompt so Ollama can reuse the evaluated prefix between posts.
+        """
+        return """Write a complete, SEO-optimized looksmaxing blog post in proper WordPress HTML format. The title, topic, keywords and internal links for this post are given at the end.
 
 CRITICAL REQUIREMENTS:
 
 1. WORD COUNT: Write exactly 2500-3000 words total (comprehensive, detailed content)
 
 2. SEO OPTIMIZATION (CRUCIAL):
-   - Primary keyword: {keywords[0] if keywords else topic}
-   - Secondary keywords: {', '.join(keywords[1:8])}
    - Use primary keyword in first paragraph, H2 headings, and naturally throughout
    - Include long-tail keywords naturally
    - Optimize heading structure (H1 in title, H2 for main sections, H3 for subsections)
@@ -207,8 +903,6 @@ CRITICAL REQUIREMENTS:
    - Include comparison tables where relevant
    - Strong conclusion summarizing key points
 
-6. INTERNAL LINKS: {internal_links_info.split(chr(10))[1] if internal_links_info and 'INTERNAL LINKS' in internal_links_info else "No internal links needed"}
-
 EXAMPLES OF AUTHENTIC TONE (USE THIS STYLE):
 
 ❌ NORMIE (DON'T WRITE LIKE THIS):
@@ -230,7 +924,7 @@ EXAMPLES OF AUTHENTIC TONE (USE THIS STYLE):
 "A defined jawline is essential for that chad aesthetic. Mewing combined with proper softmaxxing can mog most guys who aren't maxxing. Let's be honest - most normies don't even know what mewing is. Here's the real talk on what actually works."
 
 HTML STRUCTURE EXAMPLE:
-<h2>What Is {keywords[0] if keywords else topic}?</h2>
+<h2>What Is [Primary Keyword]?</h2>
 <p>Opening paragraph with primary keyword naturally integrated. This is where you hook the reader and establish the topic's importance in looksmaxing.</p>
 
 <h3>Understanding the Basics</h3>
@@ -273,145 +967,154 @@ CRITICAL: This is NOT a generic self-help blog. This is looksmaxing content for
 - Write like you're on looksmax.org, not a corporate blog
 
 If the content sounds generic, bland, or like a normie self-help article, it's WRONG. 
-It should sound like authentic looksmaxing community content.
+It should sound like authentic looksmaxing community content."""
+    
+    def _build_content_system_prompt(self):
+        """Build the system prompt that sets the authentic community tone for article writing"""
+        research_data = self._get_research_data()
+        
+        return f"""You are a veteran looksmaxer writing for the looksmax.org community. You write with the authentic, edgy, direct tone of the best-of-the-best subforum. This is NOT a generic self-help blog - this is looksmaxing content for the community.
 
-Now write the complete blog post. Write 2500-3000 words in proper WordPress HTML format with SEO optimization and AUTHENTIC looksmaxing tone (NOT normie language):"""
+CRITICAL TERMINOLOGY (MUST use naturally throughout - this is non-negotiable):
+{', '.join(research_data['terminology'][:15])}
+
+COMMON PHRASES (use these naturally):
+{', '.join(research_data['common_phrases'][:8])}
+
+AUTHENTIC TONE (MANDATORY - NO NORMIE LANGUAGE):
+- Edgy, direct, no-bullshit approach
+- Use community slang naturally: mog, chad, based, cope, ascend, maxxing, blackpill
+- Call out normie advice and generic self-help BS
+- Be brutally honest about what works vs what doesn't
+- Use "-maxxing" suffix liberally (skincaremaxxing, fitnessmaxxing, sleepmaxxing, etc.)
+- Write like you're on looksmax.org, not a corporate blog
+- Use specific numbers and timeframes: "30-60 days", "3-6 months", "mogged 80% of guys"
+- Before/after focus, transformation mindset
+- Acknowledge genetic reality but focus on what CAN be changed
+- Use phrases like "real talk", "let's be honest", "most guys don't know this"
+
+AVOID NORMIE LANGUAGE (DO NOT USE):
+- Generic self-help phrases: "self-improvement journey", "personal growth", "be your best self"
+- Corporate speak: "optimize your potential", "unlock your best version"
+- Soft language: "feel good about yourself", "build confidence"
+- Generic fitness terms without looksmaxing context
+- Academic or overly formal tone
+
+USE AUTHENTIC LOOKSMAXING LANGUAGE:
+- "If you're serious about looksmaxing..."
+- "Most guys are doing this wrong..."
+- "Real talk: this is what actually works..."
+- "You'll mog most guys who aren't maxxing..."
+- "The chad aesthetic requires..."
+- "Softmaxxing vs hardmaxxing - here's the real difference..."
+- "This is based, that's cope..." """
+    
+    def _get_internal_link_posts(self, topic, title):
+        """Get previously published posts that are relevant enough to link to"""
+        relevant_posts = self.post_tracker.get_relevant_posts(topic, title, max_posts=4)
+        return [p for p in relevant_posts if p.get('id') and p.get('url') and p.get('title')]
+    
+    def _build_internal_links_info(self, relevant_posts):
+        """Describe the allowed internal links for the prompt"""
+        internal_links_info = ""
+        if relevant_posts:
+            internal_links_info = "\n\nINTERNAL LINKS (add 2-4 natural links to these posts):\n"
+            for post in relevant_posts:
+                internal_links_info += f"- {post.get('title')} - {post.get('url')}\n"
+        else:
+            internal_links_info = "\n\nNO INTERNAL LINKS: Do NOT create any links or 'Related Posts' sections.\n"
+        return internal_links_info
+    
+    def _finalize_content(self, content, relevant_posts, keywords, topic):
+        """Clean generated HTML, validate it and append the disclaimer. Returns (content, ContentStats)."""
+        if not content or len(content.strip()) < 500:
+            raise ValueError("Generated content is too short")
+        
+        # Clean content and collect its stats in one pass
+        processor = HTMLPostProcessor(
+            valid_urls=[post.get('url') for post in relevant_posts],
+            internal_host=INTERNAL_HOST
+        )
+        content, stats = processor.process(content)
+        
+        # Final validation
+        word_count = stats.word_count
+        print(f"✓ Content generated: {stats.summary()}")
+        
+        # Validate word count
+        if word_count < 2500:
+            print(f"⚠ Warning: Content is {word_count} words (target: 2500-3000)")
+        elif word_count > 3000:
+            print(f"⚠ Warning: Content is {word_count} words (target: 2500-3000)")
+        
+        # Validate terminology and check for normie language - one scan counts every term
+        scanner = self.research.term_scanner()
+        content_lower = stats.text.lower()
+        term_counts = scanner.counts(content_lower)
+        found_terms = [term for term in self.research.REQUIRED_TERMS if term_counts[term]]
+        
+        # Check for normie language patterns
+        found_normie = [pattern for pattern in self.research.NORMIE_PATTERNS if term_counts[pattern]]
+        
+        if len(found_terms) < 4:
+            print(f"⚠ Warning: May lack looksmaxing terminology. Found: {found_terms}")
+            print(f"  Content should use more looksmaxing terms: mog, chad, maxxing, based, cope, etc.")
+        
+        if found_normie:
+            print(f"⚠ Warning: Found normie language patterns: {found_normie}")
+            print(f"  Content should use authentic looksmaxing language, not generic self-help terms")
+        
+        # Validate SEO - check primary keyword usage
+        primary_keyword = keywords[0].lower() if keywords else topic.lower()
+        keyword_count = term_counts[primary_keyword] if primary_keyword in scanner else content_lower.count(primary_keyword)
+        if keyword_count < MIN_KEYWORD_USES:
+            print(f"⚠ Warning: Primary keyword '{primary_keyword}' appears only {keyword_count} times (should be {MIN_KEYWORD_USES}-10 times)")
+        
+        # Add disclaimer
+        disclaimer = '\n\n<hr />\n\n<p><em>Disclaimer: This article is for informational purposes only and does not constitute medical advice. Always consult with qualified healthcare professionals before making significant changes to your health, fitness, or appearance routines. Individual results may vary.</em></p>'
+        
+        return content + disclaimer, stats
+    
+    def generate_excerpt(self, content, max_length=160, stats=None, title=""):
+        """Generate a short excerpt - from the stats of _finalize_content when given, saving a re-scan"""
+        if stats is None:
+            stats = HTMLPostProcessor().process(content)[1]
+        if self.metadata_extractor:
+            return self.metadata_extractor.excerpt(title, stats, max_length)
+        return stats.excerpt(max_length)
+    
+    @traced("generate.tags")
+    def generate_tags(self, title, content, stats=None):
+        """Generate relevant tags - with METADATA_ENGINE=local extracted from the article (stats saves a re-scan)"""
+        topic_keywords = self.research.get_keywords_for_topic(title)
+        if self.metadata_extractor:
+            if stats is None:
+                stats = HTMLPostProcessor().process(content)[1]
+            return self.metadata_extractor.tags(title, stats, fallback=topic_keywords)
+        system_prompt, tag_prompt = self._build_tag_prompt(title, content)
         
         try:
-            content = self._generate_text(system_prompt, content_prompt, temperature=0.7, max_tokens=12000)
-            
-            if not content or len(content.strip()) < 500:
-                raise ValueError("Generated content is too short")
-            
-            # Clean content
-            content = self._clean_html_content(content)
-            content = self._remove_related_posts(content)
-            content = self._validate_links(content, relevant_posts)
-            
-            # Final validation
-            text_content = re.sub(r'<[^>]+>', '', content)
-            word_count = len(text_content.split())
-            
-            h2_count = len(re.findall(r'<h2[^>]*>', content, re.IGNORECASE))
-            h3_count = len(re.findall(r'<h3[^>]*>', content, re.IGNORECASE))
-            ul_count = len(re.findall(r'<ul[^>]*>', content, re.IGNORECASE))
-            ol_count = len(re.findall(r'<ol[^>]*>', content, re.IGNORECASE))
-            table_count = len(re.findall(r'<table[^>]*>', content, re.IGNORECASE))
-            p_count = len(re.findall(r'<p[^>]*>', content, re.IGNORECASE))
-            
-            print(f"✓ Content generated: {word_count} words, H2={h2_count}, H3={h3_count}, UL={ul_count}, OL={ol_count}, Tables={table_count}, P={p_count}")
-            
-            # Validate word count
-            if word_count < 2500:
-                print(f"⚠ Warning: Content is {word_count} words (target: 2500-3000)")
-            elif word_count > 3000:
-                print(f"⚠ Warning: Content is {word_count} words (target: 2500-3000)")
-            
-            # Validate terminology and check for normie language
-            content_lower = content.lower()
-            required_terms = ['looksmax', 'softmaxx', 'hardmaxx', 'mewing', 'mog', 'chad', 'maxxing']
-            found_terms = [term for term in required_terms if term in content_lower]
-            
-            # Check for normie language patterns
-            normie_patterns = [
-                'self-improvement journey', 'personal growth', 'be your best self',
-                'unlock your potential', 'optimize your potential', 'feel good about yourself',
-                'build confidence', 'self-care', 'wellness journey'
-            ]
-            found_normie = [pattern for pattern in normie_patterns if pattern in content_lower]
-            
-            if len(found_terms) < 4:
-                print(f"⚠ Warning: May lack looksmaxing terminology. Found: {found_terms}")
-                print(f"  Content should use more looksmaxing terms: mog, chad, maxxing, based, cope, etc.")
-            
-            if found_normie:
-                print(f"⚠ Warning: Found normie language patterns: {found_normie}")
-                print(f"  Content should use authentic looksmaxing language, not generic self-help terms")
-            
-            # Validate SEO - check primary keyword usage
-            primary_keyword = keywords[0].lower() if keywords else topic.lower()
-            keyword_count = content_lower.count(primary_keyword)
-            if keyword_count < 5:
-                print(f"⚠ Warning: Primary keyword '{primary_keyword}' appears only {keyword_count} times (should be 5-10 times)")
-            
-            # Add disclaimer
-            disclaimer = '\n\n<hr />\n\n<p><em>Disclaimer: This article is for informational purposes only and does not constitute medical advice. Always consult with qualified healthcare professionals before making significant changes to your health, fitness, or appearance routines. Individual results may vary.</em></p>'
-            
-            return content + disclaimer
-            
+            tags_str = self._generate_text(system_prompt, tag_prompt, temperature=0.5, max_tokens=100, model=self.model_for("tags"))
+            return self._parse_tags(tags_str, topic_keywords)
         except Exception as e:
-            print(f"Error generating content: {e}")
-            raise
+            print(f"Error generating tags: {e}")
+            return topic_keywords[:10]
     
-    def _clean_html_content(self, content):
-        """Clean HTML content - remove markdown, fix formatting"""
-        if not content:
-            return content
-        
-        # Remove markdown headers if still present
-        content = re.sub(r'^#{1,6}\s+(.+)$', lambda m: f'<h2>{m.group(1)}</h2>', content, flags=re.MULTILINE)
-        content = re.sub(r'^###\s+(.+)$', lambda m: f'<h3>{m.group(1)}</h3>', content, flags=re.MULTILINE)
-        
-        # Convert markdown bold to HTML
-        content = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', content)
-        content = re.sub(r'__([^_]+)__', r'<strong>\1</strong>', content)
-        
-        # Remove markdown code
-        content = re.sub(r'`([^`]+)`', r'\1', content)
-        
-        # Ensure proper spacing
-        content = re.sub(r'\n{3,}', '\n\n', content)
-        
-        return content
-    
-    def _remove_related_posts(self, content):
-        """Remove any 'Related Posts' sections"""
-        if not content:
-            return content
-        patterns = [
-            r'<h[2-6][^>]*>.*?[Rr]elated\s+[Pp]osts?.*?</h[2-6]>.*?</(?:ul|ol|p)>',
-            r'##?\s*[Rr]elated\s+[Pp]osts?.*?\n(?:.*?\n)*?(?=\n##|\Z)',
-        ]
-        for pattern in patterns:
-            content = re.sub(pattern, '', content, flags=re.IGNORECASE | re.DOTALL)
-        return content
-    
-    def _validate_links(self, content, relevant_posts):
-        """Validate and remove links to non-existent posts"""
-        if not relevant_posts:
-            content = self._remove_related_posts(content)
-            def remove_link(match):
-                link_text = re.search(r'>([^<]+)</a>', match.group(0))
-                return link_text.group(1) if link_text else ''
-            content = re.sub(r'<a\s+href="https?://(?:www\.)?lookizm\.com[^"]*"[^>]*>.*?</a>', remove_link, content, flags=re.IGNORECASE | re.DOTALL)
-            return content
-        
-        valid_urls = {post.get('url', '').lower().rstrip('/') for post in relevant_posts if post.get('url')}
-        
-        def replace_invalid_link(match):
-            link_url = match.group(1).lower().rstrip('/')
-            link_text = match.group(2)
-            if 'lookizm.com' in link_url and link_url not in valid_urls:
-                return link_text
-            return match.group(0)
-        
-        content = re.sub(r'<a\s+href="([^"]+)"[^>]*>(.*?)</a>', replace_invalid_link, content, flags=re.IGNORECASE | re.DOTALL)
-        return content
-    
-    def generate_excerpt(self, content, max_length=160):
-        """Generate a short excerpt"""
-        text_content = re.sub(r'<[^>]+>', '', content)
-        sentences = text_content.split('.')
-        excerpt = sentences[0] if sentences else text_content[:max_length]
-        excerpt = excerpt.strip()
-        if len(excerpt) > max_length:
-            excerpt = excerpt[:max_length-3] + "..."
-        return excerpt
-    
-    def generate_tags(self, title, content):
-        """Generate relevant tags"""
+    @traced("generate.tags")
+    async def generate_tags_async(self, title, content):
+        """Async counterpart of generate_tags"""
         topic_keywords = self.research.get_keywords_for_topic(title)
+        system_prompt, tag_prompt = self._build_tag_prompt(title, content)
         
+        try:
+            tags_str = await self._generate_text_async(system_prompt, tag_prompt, temperature=0.5, max_tokens=100, model=self.model_for("tags"))
+            return self._parse_tags(tags_str, topic_keywords)
+        except Exception as e:
+            print(f"Error generating tags: {e!r}")
+            return topic_keywords[:10]
+    
+    def _build_tag_prompt(self, title, content):
+        """Returns (system prompt, user prompt) for tag generation"""
         system_prompt = "You are an SEO expert specializing in looksmaxing content."
         tag_prompt = f"""Generate 8-10 relevant SEO tags for this blog post.
 
@@ -419,15 +1122,13 @@ Title: {title}
 Content preview: {content[:500]}...
 
 Return ONLY the tags, comma-separated. No prefixes or labels."""
-        
-        try:
-            tags_str = self._generate_text(system_prompt, tag_prompt, temperature=0.5, max_tokens=100)
-            tags = [tag.strip().strip('"').strip("'") for tag in tags_str.split(',') if tag.strip()]
-            tags = [tag for tag in tags if len(tag) > 0][:10]
-            return tags if tags else topic_keywords[:10]
-        except Exception as e:
-            print(f"Error generating tags: {e}")
-            return topic_keywords[:10]
+        return system_prompt, tag_prompt
+    
+    def _parse_tags(self, tags_str, fallback):
+        """Parse the comma-separated model output into at most 10 tags"""
+        tags = [tag.strip().strip('"').strip("'") for tag in tags_str.split(',') if tag.strip()]
+        tags = [tag for tag in tags if len(tag) > 0][:10]
+        return tags if tags else fallback[:10]
     
     def determine_category(self, topic, title, content):
         """Determine category based on topic, title, and content"""
@@ -435,30 +1136,35 @@ Return ONLY the tags, comma-separated. No prefixes or labels."""
         title_lower = title.lower()
         content_lower = (content[:500] if content else "").lower()
         
-        category_keywords = {
-            "Facial Aesthetics": ["jawline", "mewing", "facial", "nose", "mouth", "skincare", "teeth", "jaw", "chin"],
-            "Body Aesthetics": ["physique", "posture", "height", "shoulder", "waist", "muscle", "body"],
-            "Lifestyle": ["sleep", "diet", "supplement", "hormone", "stress", "nutrition", "lifestyle"],
-            "Grooming": ["hair", "fashion", "fragrance", "dental", "grooming", "style", "wardrobe"],
-            "Surgery": ["surgery", "orthodontics", "steroids", "peptide", "hair transplant", "filler", "hardmaxxing"]
-        }
+        scanner = self.research.term_scanner()
+        topic_found = scanner.found(topic_lower)
+        title_found = scanner.found(title_lower)
+        content_found = scanner.found(content_lower)
         
         category_scores = {}
-        for category, keywords in category_keywords.items():
+        for category, keywords in self.research.CATEGORY_KEYWORDS.items():
             score = 0
             for kw in keywords:
-                if kw in topic_lower:
+                if kw in topic_found:
                     score += 3
-                if kw in title_lower:
+                if kw in title_found:
                     score += 2
-                if kw in content_lower:
+                if kw in content_found:
                     score += 1
             category_scores[category] = score
         
         return max(category_scores.items(), key=lambda x: x[1])[0] if max(category_scores.values()) > 0 else "Lifestyle"
     
-    def generate_full_post(self, topic=None):
-        """Generate a complete blog post with all components"""
+    @traced("generate")
+    def generate_full_post(self, topic=None, on_title=None):
+        """
+        Generate a complete blog post with all components
+        
+        on_title(title, category, topic) is called as soon as the title is
+        known (category is predicted from topic and title, topic is the one
+        actually used - also when it was auto-selected), so the caller can
+        start work that only needs those while the body generates.
+        """
         print(f"\n{'='*60}")
         print(f"Generating blog post")
         print(f"{'='*60}")
@@ -466,24 +1172,143 @@ Return ONLY the tags, comma-separated. No prefixes or labels."""
         print(f"Model: {self.model_name}")
         print(f"{'='*60}\n")
         
-        title = self.generate_title(topic)
+        cache_keys = []
+        telemetry = CallTotals()
+        reserved = []
+        self.collect_cache_keys(cache_keys)
+        self.telemetry.collect(telemetry)
+        _post_reservations.set(reserved)
+        try:
+            post_data = self._generate_post_parts(topic, on_title)
+        except BaseException:
+            self._release(reserved)
+            raise
+        finally:
+            self.collect_cache_keys(None)
+            self.telemetry.collect(None)
+            _post_reservations.set(None)
+        
+        print(f"Ollama (this post): {telemetry.line()}\n")
+        post_data["cache_keys"] = cache_keys
+        post_data["telemetry"] = telemetry.to_dict()
+        return post_data
+    
+    @traced("generate")
+    async def generate_full_post_async(self, topic=None, on_title=None, on_tags=None):
+        """
+        Async counterpart of generate_full_post
+        
+        Tags are generated from the opening of the article while the body is
+        still streaming. on_title(title, category, topic) is called as soon as
+        the title is known (see generate_full_post) and on_tags(tags) once the
+        tags are ready, so the caller can start the WordPress-side work for
+        them in parallel with the body.
+        """
+        print(f"\n{'='*60}")
+        print(f"Generating blog post (async)")
+        print(f"{'='*60}")
+        print(f"Topic: {topic or 'auto-selected'}")
+        print(f"Model: {self.model_name}")
+        print(f"{'='*60}\n")
+        
+        cache_keys = []
+        telemetry = CallTotals()
+        reserved = []
+        self.collect_cache_keys(cache_keys)  # Tasks created below inherit this context
+        self.telemetry.collect(telemetry)
+        _post_reservations.set(reserved)
+        try:
+            post_data = await self._generate_post_parts_async(topic, on_title, on_tags)
+        except BaseException:
+            self._release(reserved)
+            raise
+        finally:
+            self.collect_cache_keys(None)
+            self.telemetry.collect(None)
+            _post_reservations.set(None)
+        
+        print(f"Ollama (this post): {telemetry.line()}\n")
+        post_data["cache_keys"] = cache_keys
+        post_data["telemetry"] = telemetry.to_dict()
+        return post_data
+    
+    async def _generate_post_parts_async(self, topic, on_title=None, on_tags=None):
+        """Async counterpart of _generate_post_parts"""
+        topic, title, plan = await self._plan_post_async(topic)
+        print(f"Generated title: {title}\n")
+        if on_title:
+            on_title(title, plan.get('category') or self.determine_category(topic, title, ""), topic)
+        
+        preview = asyncio.get_running_loop().create_future()
+        content_task = asyncio.create_task(self.generate_content_async(title, topic, preview, with_stats=True, outline=plan.get('outline')))
+        
+        async def tags_from_preview():
+            if plan.get('tags'):
+                tags = plan['tags']
+            elif self.metadata_extractor:
+                # Local extraction takes no model call, so it waits for the whole article
+                content, stats = await content_task
+                tags = self.generate_tags(title, content, stats)
+            else:
+                await asyncio.wait({preview, content_task}, return_when=asyncio.FIRST_COMPLETED)
+                text = preview.result() if preview.done() else content_task.result()[0]
+                tags = await self.generate_tags_async(title, text)
+            if on_tags:
+                on_tags(tags)
+            return tags
+        
+        tags_task = asyncio.create_task(tags_from_preview())
+        try:
+            content, stats = await content_task
+        except BaseException:
+            # Stop the tag request and collect its outcome, so a failure of its own isn't left unretrieved
+            tags_task.cancel()
+            await asyncio.gather(tags_task, return_exceptions=True)
+            raise
+        tags = await tags_task
+        print(f"\nGenerated content ({len(content)} characters)\n")
+        print(f"Tags: {', '.join(tags[:8])}")
+        
+        excerpt = plan.get('excerpt') or self.generate_excerpt(content, stats=stats, title=title)
+        category = plan.get('category') or self.determine_category(topic, title, content)
+        print(f"Category: {category}")
+        
+        return {
+            "title": title,
+            "content": content,
+            "excerpt": excerpt,
+            "tags": tags,
+            "topic": topic,
+            "category": category
+        }
+    
+    def _generate_post_parts(self, topic, on_title=None):
+        """Generate title, content and metadata for a post"""
+        topic, title, plan = self._plan_post(topic)
         print(f"Generated title: {title}\n")
+        if on_title:
+            on_title(title, plan.get('category') or self.determine_category(topic, title, ""), topic)
         
-        content = self.generate_content(title, topic)
+        content, stats = self.generate_content(title, topic, with_stats=True, outline=plan.get('outline'))
         print(f"\nGenerated content ({len(content)} characters)\n")
         
-        excerpt = self.generate_excerpt(content)
-        tags = self.generate_tags(title, content)
+        excerpt = plan.get('excerpt') or self.generate_excerpt(content, stats=stats, title=title)
+        tags = plan.get('tags') or self.generate_tags(title, content, stats)
         print(f"Tags: {', '.join(tags[:8])}")
         
-        category = self.determine_category(topic, title, content)
-        print(f"Category: {category}\n")
+        category = plan.get('category') or self.determine_category(topic, title, content)
+        print(f"Category: {category}")
+        if self.prompt_cache.calls:
+            print(self.prompt_cache.summary())
+        if self.cache:
+            print(self.cache.summary())
+        print()
         
         return {
             "title": title,
             "content": content,
             "excerpt": excerpt,
             "tags": tags,
-            "topic": topic or "auto-selected",
+            "topic": topic,
             "category": category
         }
@@ -0,0 +1,145 @@
+"""
+Bulk Delete - Deletes every post of the site (optionally with its featured image) as fast as the site allows
+Post IDs are streamed page by page and deleted in concurrent /batch/v1 calls while the next page is fetched
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from rest_batch import succeeded, error_message
+from tracing import traced, annotate
+from config import BULK_DELETE_WORKERS
+
+
+PER_PAGE = 100  # WordPress REST API maximum
+STATUSES = "publish,future,draft,pending,private,trash"  # "any" leaves out the trash
+
+
+class BulkDeleter:
+    """
+    Streams post IDs from /posts and deletes them with bounded concurrency
+
+    Posts are listed by ID ascending and the pages walked from the last one
+    back: deleting a page only shifts the pages after it, so the offsets of
+    the pages still to fetch stay valid while deletions are in flight. Each
+    page becomes RestBatch calls of up to WP_BATCH_MAX_ITEMS deletes, at
+    most BULK_DELETE_WORKERS of them at a time. Posts published meanwhile,
+    or left over by failed deletes, are picked up by another pass. Featured
+    images are deleted along with their posts when delete_media is set
+    (each once, even when several posts share it).
+    """
+    
+    MAX_PASSES = 3  # Passes over the site before giving up on posts that keep failing
+    
+    def __init__(self, publisher, workers=BULK_DELETE_WORKERS, delete_media=False):
+        self.publisher = publisher
+        self.workers = workers
+        self.delete_media = delete_media
+        self.deleted = 0
+        self.failed = 0
+        self.media_deleted = 0
+        self._media_seen = set()
+    
+    def _fetch_page(self, page):
+        """One page of posts: (posts, total posts, total pages)"""
+        response = self.publisher.session.get(
+            f"{self.publisher.api_url}/posts",
+            params={"per_page": PER_PAGE, "page": page, "status": STATUSES, "orderby": "id", "order": "asc",
+                    "_fields": "id,featured_media"},
+            headers=self.publisher.headers,
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json(), int(response.headers.get('X-WP-Total', 0)), int(response.headers.get('X-WP-TotalPages', 1))
+    
+    def count(self):
+        """Dry run: (posts, featured images) that run() would delete - images only counted with delete_media"""
+        posts, total, total_pages = self._fetch_page(1)
+        if not self.delete_media:
+            return total, 0
+        media = {post.get('featured_media') for post in posts}
+        for page in range(2, total_pages + 1):
+            media.update(post.get('featured_media') for post in self._fetch_page(page)[0])
+        media.discard(0)
+        media.discard(None)
+        return total, len(media)
+    
+    def _requests(self, posts):
+        requests = [("DELETE", f"posts/{post['id']}?force=true", None) for post in posts]
+        if self.delete_media:
+            for post in posts:
+                media_id = post.get('featured_media')
+                if media_id and media_id not in self._media_seen:
+                    self._media_seen.add(media_id)
+                    requests.append(("DELETE", f"media/{media_id}?force=true", None))
+        return requests
+    
+    def _delete(self, requests):
+        """Delete one chunk, returns (posts deleted, posts failed, media deleted)"""
+        deleted = failed = media = 0
+        for (_, path, _), result in zip(requests, self.publisher.batch.execute(requests)):
+            # A 404 means it is gone already (deleted elsewhere, or an image shared with an earlier post)
+            gone = succeeded(result) or result[0] == 404
+            if path.startswith("media/"):
+                media += gone
+            elif gone:
+                deleted += 1
+            else:
+                failed += 1
+                print(f"✗ Error deleting {path.split('?')[0]}: {error_message(result)}")
+        return deleted, failed, media
+    
+    def _pass(self, executor, started):
+        """Walk the pages once from the last, returns the number of posts found"""
+        first_page, total, total_pages = self._fetch_page(1)
+        if not total:
+            return 0
+        found, pending = 0, []
+        chunk_size = self.publisher.batch.max_items
+        for page in range(total_pages, 0, -1):
+            posts = first_page if page == 1 else self._fetch_page(page)[0]
+            found += len(posts)
+            requests = self._requests(posts)
+            pending.extend(executor.submit(self._delete, requests[i:i + chunk_size]) for i in range(0, len(requests), chunk_size))
+            pending = self._collect(pending, started, total)
+        self._collect(pending, started, total, block=True)
+        return found
+    
+    def _collect(self, pending, started, total, block=False):
+        """Add up the finished chunks and print progress; returns the unfinished ones"""
+        if block:
+            done, not_done = wait(pending)
+        elif len(pending) > self.workers * 4:
+            # Keep a few rounds of deletes queued at most, so the listing doesn't run far ahead
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+        else:
+            done = {future for future in pending if future.done()}
+            not_done = [future for future in pending if future not in done]
+        if not done:
+            return list(not_done)
+        for future in done:
+            deleted, failed, media = future.result()
+            self.deleted += deleted
+            self.failed += failed
+            self.media_deleted += media
+        elapsed = time.perf_counter() - started
+        media = f", {self.media_deleted} images" if self.delete_media else ""
+        print(f"  Deleted {self.deleted}/{total} posts{media} ({self.deleted / elapsed:.1f} posts/sec)")
+        return list(not_done)
+    
+    @traced("wordpress.bulk_delete")
+    def run(self):
+        """Delete every post, returns the number deleted"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for _ in range(self.MAX_PASSES):
+                self.failed = 0
+                deleted_before = self.deleted
+                if not self._pass(executor, started) or self.deleted == deleted_before:
+                    break
+        elapsed = time.perf_counter() - started
+        annotate(deleted=self.deleted, failed=self.failed, media=self.media_deleted)
+        media = f" and {self.media_deleted} images" if self.delete_media else ""
+        print(f"\n✓ Deleted {self.deleted} posts{media} in {elapsed:.1f}s ({self.deleted / max(elapsed, 1e-9):.1f} posts/sec)")
+        if self.failed:
+            print(f"⚠ {self.failed} posts could not be deleted")
+        return self.deleted
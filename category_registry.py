@@ -0,0 +1,120 @@
+"""
+Category Registry - In-memory name -> ID map of the WordPress categories
+Loaded from disk or paged from the API in the background at startup, refreshed when its TTL runs out
+"""
+
+import os
+import json
+import time
+import threading
+from tag_index import tag_key
+from config import CATEGORY_CACHE_FILE, CATEGORY_CACHE_TTL_HOURS
+
+
+class CategoryRegistry:
+    """
+    Serves category IDs from memory so publishing never waits on /categories
+
+    warm() loads the copy saved in CATEGORY_CACHE_FILE and, when it is
+    missing or older than CATEGORY_CACHE_TTL_HOURS, pages through every
+    category in a background thread - it only reads. An expired copy keeps
+    serving while the refresh runs. Only a lookup before the first warm-up
+    finished waits for it, and only a category the site doesn't have costs
+    a request: it is created when a post first needs it, with its
+    description from required (name -> description).
+    """
+    
+    WARM_TIMEOUT = 30  # Seconds a lookup waits for the first warm-up
+    
+    def __init__(self, publisher, required=None, path=CATEGORY_CACHE_FILE, ttl=CATEGORY_CACHE_TTL_HOURS * 3600):
+        self.publisher = publisher
+        self.required = required or {}
+        self.path = path
+        self.ttl = ttl
+        self.ids = {}
+        self.fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.ready = threading.Event()
+        self._load()
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.ids = {key: int(category_id) for key, category_id in data.get('categories', {}).items()}
+            self.fetched_at = float(data.get('fetched_at', 0.0))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠ Could not load category cache, fetching categories again: {e}")
+            self.ids, self.fetched_at = {}, 0.0
+            return
+        self.ready.set()
+    
+    def _save(self):
+        with self._lock:
+            data = {"fetched_at": self.fetched_at, "categories": dict(self.ids)}
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠ Could not save category cache: {e}")
+    
+    def expired(self):
+        return time.time() - self.fetched_at >= self.ttl
+    
+    def warm(self):
+        """Refresh in the background if the saved copy is missing or expired"""
+        if self.ready.is_set() and not self.expired():
+            return
+        if self._refreshing.locked():
+            return  # Already running
+        threading.Thread(target=self.refresh, name="category-warmup", daemon=True).start()
+    
+    def refresh(self):
+        """Page through every category and save the result"""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            categories = self.publisher.get_categories()
+            if categories:
+                with self._lock:
+                    self.ids = {tag_key(category['name']): category['id'] for category in categories}
+                    self.fetched_at = time.time()
+                self._save()
+                print(f"✓ Categories: {len(self)} loaded")
+        except Exception as e:
+            print(f"⚠ Could not refresh categories: {e}")
+        finally:
+            self._refreshing.release()
+            self.ready.set()
+    
+    def lookup(self, name):
+        """ID of a known category, or None"""
+        with self._lock:
+            return self.ids.get(tag_key(name))
+    
+    def get_id(self, name):
+        """ID of the category, creating it if the site doesn't have it; None if that fails"""
+        if not self.ready.is_set():
+            self.ready.wait(self.WARM_TIMEOUT)
+        elif self.expired():
+            self.warm()
+        category_id = self.lookup(name)
+        if category_id is None:
+            category_id = self._create(name, self.required.get(name, ""))
+        return category_id
+    
+    def _create(self, name, description):
+        category_id = self.publisher.create_category(name, description=description)
+        if category_id:
+            with self._lock:
+                self.ids[tag_key(name)] = category_id
+            self._save()
+        return category_id
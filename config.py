@@ -12,8 +12,14 @@ WORDPRESS_USERNAME = os.getenv("WORDPRESS_USERNAME", "")
 WORDPRESS_APP_PASSWORD = os.getenv("WORDPRESS_APP_PASSWORD", "")
 
 # Ollama (Local)
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")  # Comma-separated for several Ollama servers
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "unclemusclez/thedrummer-smegmma-v1:8b")  # 8B model - better quality
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # How long Ollama keeps the model loaded ("-1" = forever)
+OLLAMA_HEALTH_INTERVAL = int(os.getenv("OLLAMA_HEALTH_INTERVAL", "30"))  # Seconds between endpoint health probes (0 = off)
+
+# Model Tiering (short metadata calls on a small fast model, the article body on OLLAMA_MODEL)
+OLLAMA_SMALL_MODEL = os.getenv("OLLAMA_SMALL_MODEL", "")  # For title, tags, outline and metadata (empty = OLLAMA_MODEL)
+OLLAMA_TASK_MODELS = os.getenv("OLLAMA_TASK_MODELS", "")  # Per-task overrides, e.g. "title=llama3.2:3b,repair=qwen2.5:7b" (tasks: title, tags, outline, metadata, content, repair)
 
 # Blog Settings
 BLOG_CATEGORY_ID = int(os.getenv("BLOG_CATEGORY_ID", "1"))
@@ -23,8 +29,80 @@ POST_STATUS = os.getenv("POST_STATUS", "publish")
 # Content Generation
 MIN_WORD_COUNT = int(os.getenv("MIN_WORD_COUNT", "2500"))
 MAX_WORD_COUNT = int(os.getenv("MAX_WORD_COUNT", "3000"))
+MIN_KEYWORD_USES = int(os.getenv("MIN_KEYWORD_USES", "5"))  # Fewer primary keyword uses are flagged (and repaired when enabled)
 POSTS_PER_DAY = int(os.getenv("POSTS_PER_DAY", "1"))
 POST_TIME = os.getenv("POST_TIME", "10:00")
 
 # Image Services
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY", "N6yGErTimuX5C78O77AiC6SQTT01d6bDmRD1gnAFYbAD1DZOR377HNeI")
+
+# Streaming Generation
+OLLAMA_STREAM = os.getenv("OLLAMA_STREAM", "false").lower() in ("1", "true", "yes")
+STREAM_CHECK_WORDS = int(os.getenv("STREAM_CHECK_WORDS", "200"))  # Early quality check after this many words
+
+# Concurrent Production (--mode loop --workers N)
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "1"))
+PUBLISH_WORKERS = int(os.getenv("PUBLISH_WORKERS", "2"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))  # Generated posts waiting to be published
+
+# Content Engine: "single" (one request for the whole article) or "sections" (outline + parallel sections)
+CONTENT_ENGINE = os.getenv("CONTENT_ENGINE", "single")
+SECTION_WORKERS = int(os.getenv("SECTION_WORKERS", "4"))
+OLLAMA_SECTION_URLS = os.getenv("OLLAMA_SECTION_URLS", "")  # Comma-separated endpoints to pin sections to (default: routed over OLLAMA_BASE_URL)
+
+# LLM Response Cache (on-disk, keyed by model + prompts + options)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+
+# HTTP Connection Pooling (shared by the generator, publisher and image finder)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))  # Connections kept per host
+HTTP_HOST_POOL_SIZES = os.getenv("HTTP_HOST_POOL_SIZES", "")  # Per-host overrides, e.g. "lookizm.com=20,localhost:11434=4"
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))  # Retries for idempotent requests (GET/HEAD/PUT/DELETE)
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+
+# Asyncio Pipeline (--async)
+ASYNC_HTTP_LIMIT = int(os.getenv("ASYNC_HTTP_LIMIT", "100"))  # Max open connections across all hosts
+
+# Tracing (per-stage timing spans, one JSON-lines file per run)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+
+# Content Repair (regenerate only the failed parts of an article instead of the whole post)
+REPAIR_BUDGET = int(os.getenv("REPAIR_BUDGET", "0"))  # Max repair requests per post (each is an extra model call), 0 = off
+
+# Post Spool (generated posts are checkpointed here until they are published and tracked)
+SPOOL_DIR = os.getenv("SPOOL_DIR", "spool")
+SPOOL_RETRY_BACKOFF = int(os.getenv("SPOOL_RETRY_BACKOFF", "30"))  # Seconds before the first publish retry, doubling per failure
+
+# Schedule Mode (posts are generated ahead into the spool and only published at their slot)
+SCHEDULE_LEAD_HOURS = float(os.getenv("SCHEDULE_LEAD_HOURS", "24"))  # How long before its slot a post may be generated
+SCHEDULE_BUFFER_SIZE = int(os.getenv("SCHEDULE_BUFFER_SIZE", str(max(POSTS_PER_DAY, 1))))  # Generated posts waiting for their slot
+SCHEDULE_GENERATE_HOURS = os.getenv("SCHEDULE_GENERATE_HOURS", "")  # Hours to generate ahead in, e.g. "1-6" (empty = any time)
+SCHEDULE_FUTURE_STATUS = os.getenv("SCHEDULE_FUTURE_STATUS", "false").lower() in ("1", "true", "yes")  # Push posts right away as "future" with their date
+SCHEDULE_CHECK_INTERVAL = int(os.getenv("SCHEDULE_CHECK_INTERVAL", "30"))  # Seconds between checks for due posts
+
+# Tag Index (tag name -> ID map of the site, saved locally so known tags cost no request per post)
+TAG_INDEX_FILE = os.getenv("TAG_INDEX_FILE", "tag_index.json")
+TAG_INDEX_FULL_SYNC_HOURS = float(os.getenv("TAG_INDEX_FULL_SYNC_HOURS", "24"))  # Re-read every tag (dropping deleted ones) this often, in between only new tags are fetched
+TAG_INDEX_WORKERS = int(os.getenv("TAG_INDEX_WORKERS", "4"))  # Index pages fetched at once during a full sync
+
+# Category Registry (category name -> ID map of the site, saved locally and warmed in the background)
+CATEGORY_CACHE_FILE = os.getenv("CATEGORY_CACHE_FILE", "category_cache.json")
+CATEGORY_CACHE_TTL_HOURS = float(os.getenv("CATEGORY_CACHE_TTL_HOURS", "24"))  # Categories are re-read after this long (the old copy serves meanwhile)
+
+# WordPress REST Batch (multi-object writes as /batch/v1 calls, WordPress 5.6+; sites without it get single requests)
+WP_BATCH_ENABLED = os.getenv("WP_BATCH_ENABLED", "true").lower() in ("1", "true", "yes")
+WP_BATCH_MAX_ITEMS = int(os.getenv("WP_BATCH_MAX_ITEMS", "25"))  # Sub-requests per batch call (lowered to what the site allows)
+
+# Bulk Delete (delete_all_posts.py: post IDs streamed page by page, deleted in concurrent batch calls)
+BULK_DELETE_WORKERS = int(os.getenv("BULK_DELETE_WORKERS", "4"))  # Batch calls in flight at once
+
+# Near-Duplicate Filter (topics and titles are checked against published posts before the article is generated)
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.6"))  # Similarity (0-1) from which a topic/title counts as a duplicate, above 1 turns the filter off
+DUPLICATE_MAX_REDRAWS = int(os.getenv("DUPLICATE_MAX_REDRAWS", "5"))  # New topics/titles to try before going with the least similar one
+
+# Post Metadata: "llm" (tags from a model call, first sentence as excerpt), "local" (tags and excerpt extracted from the article, no model call)
+# or "json" (title, tags, category, excerpt and outline planned in one structured call, falling back per field)
+METADATA_ENGINE = os.getenv("METADATA_ENGINE", "llm")
@@ -0,0 +1,243 @@
+"""
+Content Repair - Patches a flawed article instead of regenerating the whole post
+A truncated tail, missing sections, a missing table or a missing keyword each cost one small request
+"""
+
+import re
+import math
+from html_processor import HTMLPostProcessor
+from section_engine import strip_code_fences
+from tracing import traced, annotate
+from config import MIN_WORD_COUNT, MIN_KEYWORD_USES, REPAIR_BUDGET
+
+
+# A complete article ends with a closed block element, not mid-sentence or after a heading
+BLOCK_END_PATTERN = re.compile(r'</(?:p|ul|ol|table|blockquote|div)\s*>', re.IGNORECASE)
+H2_PATTERN = re.compile(r'<h2[\s>]', re.IGNORECASE)
+H2_TEXT_PATTERN = re.compile(r'<h2[^>]*>(.*?)</h2>', re.IGNORECASE | re.DOTALL)
+
+
+class ContentRepairer:
+    """Diagnoses a generated article and fixes what failed with targeted follow-up requests"""
+    
+    MIN_SECTIONS = 5
+    MAX_NEW_SECTIONS = 3
+    SECTION_WORDS = 400
+    MIN_SALVAGE_WORDS = 300  # Partial articles shorter than this are not worth continuing
+    
+    DESCRIPTIONS = {
+        "truncated": "truncated tail",
+        "sections": "missing sections",
+        "table": "missing table",
+        "keyword": "missing primary keyword"
+    }
+    
+    def __init__(self, generator, budget=REPAIR_BUDGET):
+        self.generator = generator
+        self.budget = budget
+    
+    def salvageable(self, content):
+        """Whether a partial article (e.g. from a broken stream) is worth repairing"""
+        return self.budget > 0 and self._stats(content).word_count >= self.MIN_SALVAGE_WORDS
+    
+    def diagnose(self, content, primary_keyword):
+        """List the repairable problems of an article, most important first"""
+        stats = self._stats(content)
+        problems = []
+        if not self._is_complete(content):
+            problems.append("truncated")
+        if stats.count('h2') < self.MIN_SECTIONS or stats.word_count < MIN_WORD_COUNT * 0.8:
+            problems.append("sections")
+        if not stats.count('table'):
+            problems.append("table")
+        if stats.text.lower().count(primary_keyword) < MIN_KEYWORD_USES:
+            problems.append("keyword")
+        return problems
+    
+    @traced("generate.repair")
+    def repair(self, content, title, topic, keywords, system_prompt):
+        """Fix the article's problems, one request each and at most budget requests. Returns the content."""
+        primary_keyword = (keywords[0] if keywords else topic).lower()
+        attempted = []
+        while len(attempted) < self.budget:
+            job = self._next_job(content, title, topic, primary_keyword, attempted)
+            if job is None:
+                break
+            problem, prompt, max_tokens, apply = job
+            try:
+                text = self.generator._generate_text(system_prompt, prompt, temperature=0.7, max_tokens=max_tokens, model=self.generator.model_for("repair"))
+                content = apply(strip_code_fences(text))
+            except Exception as e:
+                print(f"  ⚠ Repair of {self.DESCRIPTIONS[problem]} failed: {e}")
+        self._report(attempted)
+        return content
+    
+    @traced("generate.repair")
+    async def repair_async(self, content, title, topic, keywords, system_prompt):
+        """Async counterpart of repair"""
+        primary_keyword = (keywords[0] if keywords else topic).lower()
+        attempted = []
+        while len(attempted) < self.budget:
+            job = self._next_job(content, title, topic, primary_keyword, attempted)
+            if job is None:
+                break
+            problem, prompt, max_tokens, apply = job
+            try:
+                text = await self.generator._generate_text_async(system_prompt, prompt, temperature=0.7, max_tokens=max_tokens, model=self.generator.model_for("repair"))
+                content = apply(strip_code_fences(text))
+            except Exception as e:
+                print(f"  ⚠ Repair of {self.DESCRIPTIONS[problem]} failed: {e!r}")
+        self._report(attempted)
+        return content
+    
+    def _next_job(self, content, title, topic, primary_keyword, attempted):
+        """
+        Plan the fix for the most important problem not attempted yet, or None
+        
+        Returns (problem, prompt, max_tokens, apply) where apply(text) returns
+        the patched content. Each problem is tried once.
+        """
+        problems = [problem for problem in self.diagnose(content, primary_keyword) if problem not in attempted]
+        if not problems:
+            return None
+        problem = problems[0]
+        attempted.append(problem)
+        print(f"  ⚠ Repairing {self.DESCRIPTIONS[problem]}...")
+        prompt, max_tokens, apply = getattr(self, f"_plan_{problem}")(content, title, topic, primary_keyword)
+        return problem, prompt, max_tokens, apply
+    
+    def _report(self, attempted):
+        if attempted:
+            annotate(repairs=len(attempted), problems=attempted)
+            print(f"✓ Repair pass: {len(attempted)} request(s) for {', '.join(self.DESCRIPTIONS[p] for p in attempted)}")
+    
+    def _plan_truncated(self, content, title, topic, primary_keyword):
+        """Cut back to the last complete block and continue the article from there"""
+        ends = list(BLOCK_END_PATTERN.finditer(content))
+        kept = content[:ends[-1].end()] if ends else content
+        missing_words = max(self.SECTION_WORDS, MIN_WORD_COUNT - self._stats(kept).word_count)
+        prompt = f"""This looksmaxing blog post (WordPress HTML) was cut off. Continue it from exactly where it stops.
+
+TITLE: {title}
+TOPIC: {topic}
+Primary keyword: {primary_keyword}
+Sections written so far: {'; '.join(self._headings(kept)) or 'none'}
+
+The article so far ends with:
+{kept[-2000:]}
+
+Requirements:
+- About {missing_words} more words, finishing the current section and adding the remaining ones
+- <h2> for new sections, <p>, <ul>/<ol>, <strong> as in the article so far
+- End with a conclusion section
+- Do NOT repeat anything already written, output only the continuation
+
+Continuation:"""
+        
+        def apply(text):
+            self._require(text, '<')
+            return f"{kept}\n\n{text}"
+        return prompt, missing_words * 2, apply
+    
+    def _plan_sections(self, content, title, topic, primary_keyword):
+        """Write the missing H2 sections and insert them before the conclusion"""
+        stats = self._stats(content)
+        missing_words = MIN_WORD_COUNT - stats.word_count
+        count = max(self.MIN_SECTIONS - stats.count('h2'), math.ceil(missing_words / self.SECTION_WORDS), 1)
+        count = min(count, self.MAX_NEW_SECTIONS)
+        prompt = f"""Write {count} new main section(s) for this looksmaxing blog post in WordPress HTML.
+
+TITLE: {title}
+TOPIC: {topic}
+Primary keyword: {primary_keyword}
+Existing sections (do not repeat them): {'; '.join(self._headings(content)) or 'none'}
+
+Requirements:
+- Each section starts with <h2>, has 2-3 <h3> subsections and about {self.SECTION_WORDS} words
+- <p> for paragraphs, <strong> for key terms, one <ul> list per section
+- Use the primary keyword naturally, authentic looksmaxing tone
+- No introduction, no conclusion, no links
+
+Sections:"""
+        
+        def apply(text):
+            self._require(text, '<h2')
+            return self._insert_section(content, text)
+        return prompt, count * self.SECTION_WORDS * 2, apply
+    
+    def _plan_table(self, content, title, topic, primary_keyword):
+        """Write a comparison table for the middle section and append it to that section"""
+        intro, sections = self._split_sections(content)
+        index = len(sections) // 2
+        heading = (self._headings(sections[index]) or [title])[0] if sections else title
+        prompt = f"""Write one comparison table for the section "{heading}" of the looksmaxing blog post "{title}".
+
+Requirements:
+- One short <p> introducing the table, then <table><thead><tr><th>..</th></tr></thead><tbody><tr><td>..</td></tr></tbody></table>
+- 3-5 columns and 4-6 rows comparing methods, results or timelines
+- Output only the HTML
+
+Table:"""
+        
+        def apply(text):
+            self._require(text, '<table')
+            if not sections:
+                return f"{content}\n\n{text}"
+            patched = list(sections)
+            patched[index] = f"{patched[index].rstrip()}\n\n{text}"
+            return self._join(intro, patched)
+        return prompt, 800, apply
+    
+    def _plan_keyword(self, content, title, topic, primary_keyword):
+        """Rewrite (or write) the introduction so it uses the primary keyword"""
+        intro, sections = self._split_sections(content)
+        task = f"Rewrite this introduction:\n{intro.strip()}" if intro.strip() else "Write a 150-200 word introduction."
+        # The introduction makes up what the rest of the article lacks, so the validator's threshold is met
+        uses = max(2, MIN_KEYWORD_USES - self._stats("".join(sections)).text.lower().count(primary_keyword))
+        prompt = f"""{task}
+
+Blog post: "{title}" (looksmaxing, WordPress HTML)
+
+Requirements:
+- Use the exact phrase "{primary_keyword}" {uses}-{uses + 1} times, naturally
+- Keep the meaning, tone and length; 2-3 <p> paragraphs, <strong> for key terms
+- No headings, output only the introduction HTML
+
+Introduction:"""
+        
+        def apply(text):
+            self._require(text.lower(), primary_keyword)
+            return self._join(text, sections)
+        return prompt, 600, apply
+    
+    def _stats(self, content):
+        return HTMLPostProcessor().process(content or "")[1]
+    
+    def _is_complete(self, content):
+        ends = list(BLOCK_END_PATTERN.finditer(content))
+        return bool(ends) and not content[ends[-1].end():].strip()
+    
+    def _headings(self, content):
+        return [re.sub(r'<[^>]+>', '', heading).strip() for heading in H2_TEXT_PATTERN.findall(content)]
+    
+    def _split_sections(self, content):
+        """Split into (intro, list of sections each starting with its <h2>)"""
+        starts = [match.start() for match in H2_PATTERN.finditer(content)]
+        if not starts:
+            return content, []
+        bounds = starts + [len(content)]
+        return content[:starts[0]], [content[bounds[i]:bounds[i + 1]] for i in range(len(starts))]
+    
+    def _join(self, intro, sections):
+        return "\n\n".join(part.strip() for part in [intro] + sections if part.strip())
+    
+    def _insert_section(self, content, text):
+        """Insert new sections before the last one (the conclusion), or append them"""
+        intro, sections = self._split_sections(content)
+        if len(sections) < 2:
+            return f"{content.rstrip()}\n\n{text}"
+        return self._join(intro, sections[:-1] + [text, sections[-1]])
+    
+    def _require(self, text, marker):
+        if marker not in text:
+            raise ValueError(f"repair output has no {marker!r}")
@@ -2,27 +2,64 @@
 Delete all WordPress posts and clear published_posts.json
 """
 
-import json
+import argparse
 from wordpress_publisher import WordPressPublisher
 from post_tracker import PostTracker
+from bulk_delete import BulkDeleter
+from config import BULK_DELETE_WORKERS
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Delete all WordPress posts and clear published_posts.json')
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only count what would be deleted'
+    )
+    parser.add_argument(
+        '--media',
+        action='store_true',
+        help='Also delete the featured images of the posts'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=BULK_DELETE_WORKERS,
+        help='Delete requests (batch calls) in flight at once'
+    )
+    args = parser.parse_args()
+    
     print("=" * 60)
-    print("Delete All WordPress Posts")
+    print("Delete All WordPress Posts" + (" (dry run)" if args.dry_run else ""))
     print("=" * 60)
     
-    # Initialize publisher
+    # Initialize publisher - without the tag and category caches, nothing here publishes
     try:
-        publisher = WordPressPublisher()
+        publisher = WordPressPublisher(warm_caches=False)
         print("✓ WordPress publisher initialized\n")
     except Exception as e:
         print(f"✗ Failed to initialize WordPress publisher: {e}")
         return
     
+    deleter = BulkDeleter(publisher, workers=args.workers, delete_media=args.media)
+    
+    if args.dry_run:
+        try:
+            posts, images = deleter.count()
+        except Exception as e:
+            print(f"✗ Error counting posts: {e}")
+            return
+        images = f" and {images} featured images" if args.media else ""
+        print(f"Would delete {posts} posts{images} from WordPress and clear published_posts.json")
+        return
+    
     # Delete all posts from WordPress
     print("Deleting all posts from WordPress...")
-    deleted_count = publisher.delete_all_posts()
+    try:
+        deleted_count = deleter.run()
+    except Exception as e:
+        print(f"✗ Error deleting posts: {e}")
+        return
     
     # Clear published_posts.json
     print("\nClearing published_posts.json...")
@@ -39,4 +76,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,268 @@
+"""
+HTML Post-Processor - Cleans generated articles in one linear pass
+Fixes Markdown leftovers, drops related-post blocks and invalid internal links, and collects stats
+"""
+
+import re
+from collections import Counter
+
+
+# '<' followed by anything but another '<' or '>' - can't backtrack, so malformed input stays linear
+TAG_PATTERN = re.compile(r'<[^<>]*>')
+TAG_NAME_PATTERN = re.compile(r'<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)')
+HREF_PATTERN = re.compile(r'''href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+TEXT_MARK_PATTERN = re.compile(r'\n|\*\*|__|`')
+MARKDOWN_HEADING_PATTERN = re.compile(r'(#{1,6})[ \t]+(?=\S)')
+RELATED_POSTS_PATTERN = re.compile(r'related\s+posts?', re.IGNORECASE)
+WORD_PATTERN = re.compile(r'\S+')
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+RELATED_BLOCK_END_TAGS = {"ul", "ol", "p"}
+
+
+class ContentStats:
+    """Structural statistics of a processed article"""
+    
+    def __init__(self):
+        self.word_count = 0
+        self.tag_counts = Counter()  # Opening tags by name
+        self.links_removed = 0
+        self.related_blocks_removed = 0
+        self.markdown_fixes = 0
+        self._text = []
+    
+    @property
+    def text(self):
+        """The article as plain text (tags stripped)"""
+        return "".join(self._text)
+    
+    def count(self, tag):
+        return self.tag_counts.get(tag, 0)
+    
+    def excerpt(self, max_length=160):
+        """First sentence of the article, shortened to max_length"""
+        text = self.text
+        sentences = text.split('.')
+        excerpt = sentences[0] if sentences else text[:max_length]
+        excerpt = excerpt.strip()
+        if len(excerpt) > max_length:
+            excerpt = excerpt[:max_length - 3] + "..."
+        return excerpt
+    
+    def summary(self):
+        return (f"{self.word_count} words, H2={self.count('h2')}, H3={self.count('h3')}, UL={self.count('ul')}, "
+                f"OL={self.count('ol')}, Tables={self.count('table')}, P={self.count('p')}")
+    
+    def _snapshot(self):
+        return self.word_count, self.tag_counts.copy(), len(self._text)
+    
+    def _restore(self, snapshot):
+        self.word_count, self.tag_counts, text_length = snapshot
+        del self._text[text_length:]
+
+
+class HTMLPostProcessor:
+    """
+    Single-pass cleanup of generated article HTML
+
+    The content is split into tags and text with one linear scan and every
+    fix is applied while walking the tokens once:
+    - Markdown headings (# and ## become h2, deeper ones h3), **bold**,
+      __bold__ and `code` in text are converted or unwrapped
+    - a heading mentioning "Related Posts" is dropped with the block after it,
+      up to the first closing </ul>, </ol> or </p> (or the next heading);
+      a Markdown one up to the next heading
+    - links to internal_host that are not in valid_urls are unwrapped to their text
+    - runs of 3+ newlines are collapsed
+    """
+    
+    def __init__(self, valid_urls=(), internal_host="lookizm.com"):
+        self.valid_urls = {url.lower().rstrip('/') for url in valid_urls if url}
+        self.internal_host = internal_host.lower()
+    
+    def process(self, content):
+        """Returns (cleaned html, ContentStats)"""
+        state = _PassState(self)
+        content = content or ""
+        position = 0
+        for match in TAG_PATTERN.finditer(content):
+            if match.start() > position:
+                state.text(content[position:match.start()])
+            state.tag(match.group(0))
+            position = match.end()
+        if position < len(content):
+            state.text(content[position:])
+        return state.finish()
+    
+    def is_invalid_link(self, href):
+        url = href.lower().rstrip('/')
+        return self.internal_host in url and url not in self.valid_urls
+
+
+class _PassState:
+    """Mutable state of one process() call"""
+    
+    def __init__(self, processor):
+        self.processor = processor
+        self.stats = ContentStats()
+        self.out = []
+        self.at_line_start = True
+        self.in_word = False
+        self.newlines = 0  # Consecutive newlines just emitted, for collapsing
+        self.open_marks = {}  # Markdown mark -> index in out of its unmatched opener
+        self.markdown_heading = None  # Tag of the open Markdown heading
+        self.skip = None  # "html" or "markdown" while dropping a related-posts block
+        self.heading = None  # (tag, index in out, stats snapshot) of the open h2-h6
+        self.dropped_anchors = 0  # </a> tags still to drop for unwrapped links
+    
+    def tag(self, token):
+        match = TAG_NAME_PATTERN.match(token)
+        if not match:
+            if not token.startswith("<!") and not self.skip:
+                # '<' without a tag name, e.g. "< 5% body fat >" - it's text
+                self._plain(token)
+            elif not self.skip:
+                self.out.append(token)  # Comment or doctype
+            return
+        closing, name = match.group(1) == '/', match.group(2).lower()
+        
+        if self.skip == "html":
+            if closing and name in RELATED_BLOCK_END_TAGS:
+                self.skip = None
+                return
+            if closing or name not in HEADING_TAGS:
+                return
+            self.skip = None
+        elif self.skip == "markdown":
+            if closing or name not in HEADING_TAGS:
+                return
+            self.skip = None
+        
+        self.at_line_start = False
+        self.newlines = 0
+        if name == "a":
+            if not closing:
+                href = HREF_PATTERN.search(token)
+                href = next((group for group in href.groups() if group is not None), "") if href else ""
+                if self.processor.is_invalid_link(href):
+                    self.stats.links_removed += 1
+                    self.dropped_anchors += 1
+                    return
+            elif self.dropped_anchors:
+                self.dropped_anchors -= 1
+                return
+        
+        if closing:
+            self.out.append(token)
+            if self.heading and name == self.heading[0]:
+                self._close_heading()
+            return
+        
+        if name in HEADING_TAGS and name != "h1" and self.heading is None:
+            self.heading = (name, len(self.out), self.stats._snapshot())
+        self.stats.tag_counts[name] += 1
+        self.out.append(token)
+    
+    def text(self, text):
+        position = self._line_start(text, 0) if self.at_line_start else 0
+        for match in TEXT_MARK_PATTERN.finditer(text, position):
+            self._plain(text[position:match.start()])
+            position = match.end()
+            if match.group(0) == "\n":
+                self._newline()
+                position = self._line_start(text, position)
+            elif not self.skip:
+                self._markdown_mark(match.group(0))
+        self._plain(text[position:])
+    
+    def _plain(self, text):
+        if not text or self.skip:
+            return
+        self.at_line_start = False
+        self.newlines = 0
+        self.out.append(text)
+        self.stats._text.append(text)
+        
+        words = len(WORD_PATTERN.findall(text))
+        # A word split by a tag ("foo<b>bar</b>") is still one word
+        if words and self.in_word and not text[0].isspace():
+            words -= 1
+        self.stats.word_count += words
+        self.in_word = not text[-1].isspace()
+    
+    def _newline(self):
+        self.in_word = False
+        self.at_line_start = True
+        if self.markdown_heading:
+            self.out.append(f"</{self.markdown_heading}>")
+            self.markdown_heading = None
+            self._close_heading()
+        if self.skip:
+            return
+        self.newlines += 1
+        if self.newlines <= 2:
+            self.out.append("\n")
+            self.stats._text.append("\n")
+    
+    def _line_start(self, text, position):
+        """Handle a '#' heading marker at a line start, returns the position after it"""
+        match = MARKDOWN_HEADING_PATTERN.match(text, position)
+        if not match:
+            return position
+        
+        line_end = text.find("\n", match.end())
+        line = text[match.end():line_end if line_end != -1 else len(text)]
+        if RELATED_POSTS_PATTERN.search(line):
+            if self.skip != "markdown":
+                self.stats.related_blocks_removed += 1
+            self._start_skip("markdown")
+            return match.end()
+        if self.skip == "markdown":
+            self.skip = None
+        elif self.skip:
+            return match.end()
+        
+        tag = "h2" if len(match.group(1)) <= 2 else "h3"
+        self.stats.markdown_fixes += 1
+        self.tag(f"<{tag}>")
+        self.markdown_heading = tag
+        return match.end()
+    
+    def _markdown_mark(self, mark):
+        """Pair up **, __ and ` marks; an opener without a closer stays as it was"""
+        if mark in self.open_marks:
+            self.out[self.open_marks.pop(mark)] = "" if mark == "`" else "<strong>"
+            self.out.append("" if mark == "`" else "</strong>")
+            self.stats.markdown_fixes += 1
+        else:
+            self.open_marks[mark] = len(self.out)
+            self.out.append(mark)
+        self.at_line_start = False
+    
+    def _close_heading(self):
+        """Drop a just-closed heading about related posts and start skipping its block"""
+        if self.heading is None:
+            return
+        tag, start, snapshot = self.heading
+        self.heading = None
+        if not RELATED_POSTS_PATTERN.search("".join(self.stats._text[snapshot[2]:])):
+            return
+        del self.out[start:]
+        self.stats._restore(snapshot)
+        self.newlines = 0
+        while self.newlines < len(self.out) and self.out[-1 - self.newlines] == "\n":
+            self.newlines += 1
+        self.stats.related_blocks_removed += 1
+        self.open_marks = {mark: index for mark, index in self.open_marks.items() if index < start}
+        self._start_skip("html")
+    
+    def _start_skip(self, mode):
+        self.skip = mode
+        self.dropped_anchors = 0
+    
+    def finish(self):
+        if self.markdown_heading:
+            self.out.append(f"</{self.markdown_heading}>")
+            self.markdown_heading = None
+            self._close_heading()
+        return "".join(self.out), self.stats
@@ -0,0 +1,93 @@
+"""
+HTTP Client - Shared pooled transport for Ollama, WordPress and Pexels
+One session keeps connections alive across calls instead of a new TCP+TLS handshake per request
+"""
+
+import asyncio
+import threading
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import HTTP_POOL_SIZE, HTTP_HOST_POOL_SIZES, HTTP_RETRIES, HTTP_RETRY_BACKOFF, ASYNC_HTTP_LIMIT
+
+
+_session = None
+_session_lock = threading.Lock()
+_async_sessions = {}  # event loop -> aiohttp session
+
+
+def _make_adapter(pool_size):
+    """Adapter with a keep-alive pool of pool_size connections per host and retries for idempotent calls"""
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset(["HEAD", "GET", "PUT", "DELETE", "OPTIONS"]),  # Never retry POST - it is not idempotent
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    return HTTPAdapter(pool_connections=20, pool_maxsize=pool_size, max_retries=retry)
+
+
+def _parse_host_pool_sizes(value):
+    """Parse "host=N,host=N" into (url prefix, size) pairs; bare hosts apply to http and https"""
+    prefixes = []
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        host, size = item.rsplit('=', 1)
+        host = host.strip().rstrip('/')
+        if not host or not size.strip().isdigit():
+            print(f"⚠ Ignoring invalid HTTP_HOST_POOL_SIZES entry: {item.strip()}")
+            continue
+        if '://' in host:
+            prefixes.append((host, int(size)))
+        else:
+            prefixes.append((f"http://{host}", int(size)))
+            prefixes.append((f"https://{host}", int(size)))
+    return prefixes
+
+
+def create_session(pool_size=HTTP_POOL_SIZE, host_pool_sizes=HTTP_HOST_POOL_SIZES):
+    """Create a session with pooled adapters (per-host pool sizes override the default)"""
+    session = requests.Session()
+    default_adapter = _make_adapter(pool_size)
+    session.mount("http://", default_adapter)
+    session.mount("https://", default_adapter)
+    for prefix, size in _parse_host_pool_sizes(host_pool_sizes):
+        # requests picks the longest matching prefix, so these win over the defaults
+        session.mount(prefix, _make_adapter(size))
+    return session
+
+
+def get_session():
+    """The process-wide shared session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get_async_session():
+    """
+    The shared aiohttp session for the running event loop
+    
+    Must be called from a coroutine. Close it with close_async_session()
+    before the loop ends.
+    """
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=ASYNC_HTTP_LIMIT, limit_per_host=HTTP_POOL_SIZE, keepalive_timeout=30)
+        session = aiohttp.ClientSession(connector=connector)
+        _async_sessions[loop] = session
+    return session
+
+
+async def close_async_session():
+    """Close the aiohttp session of the running event loop"""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -3,16 +3,66 @@ Image Finder - Finds and downloads relevant images for blog posts
 Uses Pexels API first, then Unsplash, then fallback
 """
 
-import requests
 import re
+import asyncio
+import aiohttp
 from urllib.parse import quote
+from collections import defaultdict
+from http_client import get_session, get_async_session
+from tracing import traced, annotate
+from term_scanner import TermScanner
 from config import PEXELS_API_KEY
 
 
 class ImageFinder:
     """Finds relevant images for blog posts"""
     
+    # Context-aware translation mapping: looksmaxing term -> specific, contextual searchable terms
+    # Keep context and make terms more specific to the actual topic
+    TERM_TRANSLATIONS = [
+        # Multi-word looksmaxing terms (check these first) - very specific, contextual
+        ("bonesmashing", ["strong jawline male", "defined jaw", "facial bone structure"]),
+        ("jawline development", ["strong jawline male", "defined jaw", "facial structure development"]),
+        ("facial symmetry", ["symmetric male face", "balanced facial features", "male portrait"]),
+        ("mouth widening", ["wide smile male", "confident smile", "facial expression"]),
+        ("eye area enhancement", ["attractive male eyes", "eye area", "facial features"]),
+        ("nose optimization", ["male nose profile", "nose shape", "facial profile"]),
+        ("physique development", ["athletic male body", "muscular physique", "fitness transformation male"]),
+        ("posture correction", ["good posture male", "standing straight", "confident posture"]),
+        ("height optimization", ["tall athletic male", "height advantage", "tall man"]),
+        ("shoulder width", ["broad shoulders male", "athletic shoulders", "V-shaped physique"]),
+        ("waist-to-hip ratio", ["athletic male body", "fitness physique", "muscular build"]),
+        ("sleep optimization", ["healthy sleep", "sleeping well", "rest recovery"]),
+        ("diet for aesthetics", ["healthy nutrition", "fitness diet", "athletic nutrition"]),
+        ("hormone optimization", ["male health", "fitness wellness", "health optimization"]),
+        ("stress management", ["relaxation techniques", "meditation wellness", "stress relief"]),
+        ("hair styling", ["male hairstyle", "groomed hair", "professional haircut"]),
+        ("skincare routine", ["male skincare", "face care routine", "grooming routine"]),
+        ("fashion sense", ["male fashion style", "professional style", "well-dressed man"]),
+        ("dental care", ["white teeth smile", "dental health", "perfect smile"]),
+        ("cosmetic surgery", ["cosmetic procedure", "plastic surgery", "medical enhancement"]),
+        ("hair transplants", ["hair restoration", "hair transplant procedure", "medical hair"]),
+        ("filler procedures", ["cosmetic fillers", "facial enhancement", "medical aesthetics"]),
+        ("jaw surgery", ["orthognathic surgery", "jaw correction", "facial surgery"]),
+        
+        # Single-word looksmaxing terms - very specific
+        ("mewing", ["jawline exercise", "tongue posture technique", "facial development exercise"]),
+        ("softmaxxing", ["male grooming routine", "skincare fitness", "lifestyle improvement"]),
+        ("hardmaxxing", ["cosmetic surgery", "surgical enhancement", "medical procedure"]),
+        ("mogging", ["attractive confident male", "fitness model", "athletic attractive man"]),
+        ("chad", ["attractive athletic male", "confident portrait", "ideal male physique"]),
+        ("looksmaxing", ["male self improvement", "fitness transformation", "aesthetic enhancement male"]),
+        ("looksmax", ["male improvement", "fitness aesthetics", "self enhancement"]),
+        ("maxxing", ["improvement", "enhancement"]),
+        ("maxxed", ["improved", "enhanced"]),
+        ("supplementation", ["health supplements", "fitness vitamins", "nutrition supplements"]),
+        ("orthodontics", ["dental braces", "teeth alignment", "orthodontic treatment"]),
+    ]
+    _translation_scanner = TermScanner(term for term, _ in TERM_TRANSLATIONS)
+    
     def __init__(self):
+        self.session = get_session()
+        
         # Pexels API
         self.pexels_api_key = PEXELS_API_KEY
         self.pexels_api_url = "https://api.pexels.com/v1"
@@ -37,49 +87,6 @@ class ImageFinder:
         
         text_lower = text.lower()
         translated_terms = []
-        processed_text = text_lower
-        
-        # Context-aware translation mapping: looksmaxing term -> specific, contextual searchable terms
-        # Keep context and make terms more specific to the actual topic
-        translations = [
-            # Multi-word looksmaxing terms (check these first) - very specific, contextual
-            ("bonesmashing", ["strong jawline male", "defined jaw", "facial bone structure"]),
-            ("jawline development", ["strong jawline male", "defined jaw", "facial structure development"]),
-            ("facial symmetry", ["symmetric male face", "balanced facial features", "male portrait"]),
-            ("mouth widening", ["wide smile male", "confident smile", "facial expression"]),
-            ("eye area enhancement", ["attractive male eyes", "eye area", "facial features"]),
-            ("nose optimization", ["male nose profile", "nose shape", "facial profile"]),
-            ("physique development", ["athletic male body", "muscular physique", "fitness transformation male"]),
-            ("posture correction", ["good posture male", "standing straight", "confident posture"]),
-            ("height optimization", ["tall athletic male", "height advantage", "tall man"]),
-            ("shoulder width", ["broad shoulders male", "athletic shoulders", "V-shaped physique"]),
-            ("waist-to-hip ratio", ["athletic male body", "fitness physique", "muscular build"]),
-            ("sleep optimization", ["healthy sleep", "sleeping well", "rest recovery"]),
-            ("diet for aesthetics", ["healthy nutrition", "fitness diet", "athletic nutrition"]),
-            ("hormone optimization", ["male health", "fitness wellness", "health optimization"]),
-            ("stress management", ["relaxation techniques", "meditation wellness", "stress relief"]),
-            ("hair styling", ["male hairstyle", "groomed hair", "professional haircut"]),
-            ("skincare routine", ["male skincare", "face care routine", "grooming routine"]),
-            ("fashion sense", ["male fashion style", "professional style", "well-dressed man"]),
-            ("dental care", ["white teeth smile", "dental health", "perfect smile"]),
-            ("cosmetic surgery", ["cosmetic procedure", "plastic surgery", "medical enhancement"]),
-            ("hair transplants", ["hair restoration", "hair transplant procedure", "medical hair"]),
-            ("filler procedures", ["cosmetic fillers", "facial enhancement", "medical aesthetics"]),
-            ("jaw surgery", ["orthognathic surgery", "jaw correction", "facial surgery"]),
-            
-            # Single-word looksmaxing terms - very specific
-            ("mewing", ["jawline exercise", "tongue posture technique", "facial development exercise"]),
-            ("softmaxxing", ["male grooming routine", "skincare fitness", "lifestyle improvement"]),
-            ("hardmaxxing", ["cosmetic surgery", "surgical enhancement", "medical procedure"]),
-            ("mogging", ["attractive confident male", "fitness model", "athletic attractive man"]),
-            ("chad", ["attractive athletic male", "confident portrait", "ideal male physique"]),
-            ("looksmaxing", ["male self improvement", "fitness transformation", "aesthetic enhancement male"]),
-            ("looksmax", ["male improvement", "fitness aesthetics", "self enhancement"]),
-            ("maxxing", ["improvement", "enhancement"]),
-            ("maxxed", ["improved", "enhanced"]),
-            ("supplementation", ["health supplements", "fitness vitamins", "nutrition supplements"]),
-            ("orthodontics", ["dental braces", "teeth alignment", "orthodontic treatment"]),
-        ]
         
         # Category-specific context to add
         category_context = {
@@ -90,13 +97,30 @@ class ImageFinder:
             "Surgery": ["medical", "surgery", "procedure", "cosmetic"]
         }
         
-        # Process multi-word terms first, then single words
-        for looksmax_term, generic_terms in translations:
-            if looksmax_term in processed_text:
+        # One scan finds every term; then take them multi-word first, then single words
+        occurrences = defaultdict(list)
+        for start, term in self._translation_scanner.matches(text_lower):
+            occurrences[term].append(start)
+        removed = []
+        for looksmax_term, generic_terms in self.TERM_TRANSLATIONS:
+            # Occurrences inside an already translated term don't count, e.g. "maxxing" in "softmaxxing"
+            spans = []
+            for start in occurrences.get(looksmax_term, ()):
+                end = start + len(looksmax_term)
+                if (not spans or start >= spans[-1][1]) and not any(s < end and start < e for s, e in removed):
+                    spans.append((start, end))
+            if spans:
                 # Add specific, contextual terms
                 translated_terms.extend(generic_terms[:2])  # Add first 2 specific terms
-                # Remove the looksmax term from processed text to avoid double matching
-                processed_text = processed_text.replace(looksmax_term, " ")
+                removed.extend(spans)
+        
+        # Remove the translated terms from processed text to avoid double matching
+        position = 0
+        pieces = []
+        for start, end in sorted(removed):
+            pieces.append(text_lower[position:start])
+            position = end
+        processed_text = " ".join(pieces + [text_lower[position:]])
         
         # Extract remaining meaningful words that are already generic and searchable
         common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "your", "you", "how", "what", "when", "where", "why", "this", "that", "these", "those", "proven", "techniques", "appliances", "guide", "complete", "ultimate", "improve", "enhance", "transform", "achieve", "become", "with", "these", "and"}
@@ -199,42 +223,67 @@ class ImageFinder:
     def find_image_url_pexels(self, search_query):
         """Find image URL using Pexels API"""
         try:
-            headers = {
-                "Authorization": self.pexels_api_key
-            }
-            
-            response = requests.get(
+            response = self.session.get(
                 f"{self.pexels_api_url}/search",
-                headers=headers,
-                params={
-                    "query": search_query,
-                    "per_page": 1,
-                    "orientation": "landscape",
-                    "size": "large"
-                },
+                headers=self._pexels_headers(),
+                params=self._pexels_params(search_query),
                 timeout=10
             )
+            annotate(pexels_status=response.status_code)
             response.raise_for_status()
+            return self._pick_pexels_image(response.json())
             
-            data = response.json()
-            photos = data.get('photos', [])
-            
-            if photos and len(photos) > 0:
-                # Get the largest available size
-                photo = photos[0]
-                src = photo.get('src', {})
-                
-                # Prefer original (highest quality), then large, then medium
-                image_url = src.get('original') or src.get('large') or src.get('medium') or src.get('small')
-                if image_url:
-                    return image_url
-            
+        except Exception as e:
+            print(f"  ⚠ Pexels API error: {e}")
             return None
+    
+    async def find_image_url_pexels_async(self, search_query):
+        """Async counterpart of find_image_url_pexels"""
+        try:
+            session = get_async_session()
+            async with session.get(
+                f"{self.pexels_api_url}/search",
+                headers=self._pexels_headers(),
+                params=self._pexels_params(search_query),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                annotate(pexels_status=response.status)
+                response.raise_for_status()
+                return self._pick_pexels_image(await response.json(content_type=None))
             
         except Exception as e:
-            print(f"  ⚠ Pexels API error: {e}")
+            print(f"  ⚠ Pexels API error: {e!r}")
             return None
     
+    def _pexels_headers(self):
+        return {
+            "Authorization": self.pexels_api_key
+        }
+    
+    def _pexels_params(self, search_query):
+        return {
+            "query": search_query,
+            "per_page": 1,
+            "orientation": "landscape",
+            "size": "large"
+        }
+    
+    def _pick_pexels_image(self, data):
+        """Pick the best image URL from a Pexels search response"""
+        photos = data.get('photos', [])
+        
+        if photos and len(photos) > 0:
+            # Get the largest available size
+            photo = photos[0]
+            src = photo.get('src', {})
+            
+            # Prefer original (highest quality), then large, then medium
+            image_url = src.get('original') or src.get('large') or src.get('medium') or src.get('small')
+            if image_url:
+                return image_url
+        
+        return None
+    
     def find_image_url_unsplash(self, search_query):
         """Find image URL using Unsplash Source API (fallback)"""
         try:
@@ -247,17 +296,20 @@ class ImageFinder:
             print(f"  ⚠ Unsplash error: {e}")
             return None
     
+    def _build_search_query(self, title, topic, category):
+        search_terms = self.generate_search_terms(title, topic, category)
+        
+        if not search_terms:
+            # Fallback to generic looksmaxing/self-improvement image
+            return "self improvement male fitness"
+        # Combine search terms
+        return " ".join(search_terms[:3])  # Use top 3 terms
+    
+    @traced("image.search")
     def find_image_url(self, title, topic=None, category="Lifestyle"):
         """Find a relevant image URL - tries Pexels first, then Unsplash, then fallback"""
         try:
-            search_terms = self.generate_search_terms(title, topic, category)
-            
-            if not search_terms:
-                # Fallback to generic looksmaxing/self-improvement image
-                search_query = "self improvement male fitness"
-            else:
-                # Combine search terms
-                search_query = " ".join(search_terms[:3])  # Use top 3 terms
+            search_query = self._build_search_query(title, topic, category)
             
             # Try Pexels first
             print(f"  Trying Pexels API...")
@@ -266,28 +318,55 @@ class ImageFinder:
                 print(f"  ✓ Found image via Pexels")
                 return image_url
             
-            # Fallback to Unsplash
-            print(f"  Trying Unsplash...")
-            image_url = self.find_image_url_unsplash(search_query)
-            if image_url:
-                print(f"  ✓ Found image via Unsplash")
-                return image_url
+            return self._find_image_url_fallback(search_query, category)
             
-            # Final fallback - use category-specific placeholder or default
-            print(f"  Using fallback image")
+        except Exception as e:
+            print(f"⚠ Error finding image: {e}")
+            # Return category-specific fallback or default
             fallback = self.placeholder_fallbacks.get(category, self.default_fallback)
             return fallback
+    
+    @traced("image.search")
+    async def find_image_url_async(self, title, topic=None, category="Lifestyle"):
+        """Async counterpart of find_image_url"""
+        try:
+            search_query = self._build_search_query(title, topic, category)
+            
+            # Try Pexels first
+            print(f"  Trying Pexels API...")
+            image_url = await self.find_image_url_pexels_async(search_query)
+            if image_url:
+                print(f"  ✓ Found image via Pexels")
+                return image_url
+            
+            return self._find_image_url_fallback(search_query, category)
             
         except Exception as e:
-            print(f"⚠ Error finding image: {e}")
+            print(f"⚠ Error finding image: {e!r}")
             # Return category-specific fallback or default
             fallback = self.placeholder_fallbacks.get(category, self.default_fallback)
             return fallback
     
+    def _find_image_url_fallback(self, search_query, category):
+        """Unsplash, then the category placeholder"""
+        # Fallback to Unsplash
+        print(f"  Trying Unsplash...")
+        image_url = self.find_image_url_unsplash(search_query)
+        if image_url:
+            print(f"  ✓ Found image via Unsplash")
+            return image_url
+        
+        # Final fallback - use category-specific placeholder or default
+        print(f"  Using fallback image")
+        fallback = self.placeholder_fallbacks.get(category, self.default_fallback)
+        return fallback
+    
+    @traced("image.download")
     def download_image(self, image_url, filename=None):
         """Download image from URL"""
         try:
-            response = requests.get(image_url, timeout=10, stream=True)
+            response = self.session.get(image_url, timeout=10, stream=True)
+            annotate(status=response.status_code)
             response.raise_for_status()
             
             if filename is None:
@@ -295,9 +374,30 @@ class ImageFinder:
                 filename = f"thumbnail_{hash(image_url) % 10000}.jpg"
             
             image_data = response.content
+            annotate(bytes=len(image_data))
             return image_data, filename
             
         except Exception as e:
             print(f"⚠ Error downloading image: {e}")
             return None, None
-
+    
+    @traced("image.download")
+    async def download_image_async(self, image_url, filename=None):
+        """Async counterpart of download_image"""
+        try:
+            session = get_async_session()
+            async with session.get(image_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                annotate(status=response.status)
+                response.raise_for_status()
+                image_data = await response.read()
+            annotate(bytes=len(image_data))
+            
+            if filename is None:
+                # Generate filename from URL
+                filename = f"thumbnail_{hash(image_url) % 10000}.jpg"
+            
+            return image_data, filename
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠ Error downloading image: {e!r}")
+            return None, None
@@ -0,0 +1,123 @@
+"""
+LLM Response Cache - Persistent content-addressed cache for Ollama responses
+Reruns and retries with identical prompts are served from disk instead of the GPU
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class ResponseCache:
+    """On-disk cache of generation results keyed by model, prompts and options"""
+    
+    def __init__(self, cache_dir=".llm_cache", max_entries=500, ttl=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def make_key(self, model, system_prompt, user_prompt, options):
+        """Content address of a request - any change to model, prompts or options is a different entry"""
+        material = json.dumps(
+            {"model": model, "system": system_prompt, "prompt": user_prompt, "options": options},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key):
+        """Return the cached result for key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        if self.ttl and time.time() - entry.get('created', 0) > self.ttl:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        # The file's mtime is the last access time used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry.get('result')
+    
+    def put(self, key, result):
+        """Store a result and evict the least recently used entries over max_entries"""
+        entry = {"created": time.time(), "result": result}
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠ Could not write LLM cache entry: {e}")
+            self._remove(tmp_path)
+            return
+        self._evict()
+    
+    def _evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        with self._lock:
+            try:
+                entries = [
+                    entry for entry in os.scandir(self.cache_dir)
+                    if entry.is_file() and entry.name.endswith('.json')
+                ]
+            except OSError:
+                return
+            excess = len(entries) - self.max_entries
+            if excess <= 0:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:excess]:
+                self._remove(entry.path)
+    
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def discard(self, keys):
+        """Remove specific entries, e.g. once the post they were generated for is published"""
+        for key in keys:
+            self._remove(self._path(key))
+    
+    def clear(self):
+        """Remove every cached entry"""
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                self._remove(entry.path)
+    
+    def stats(self):
+        """Hit and miss counts since startup"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+    
+    def summary(self):
+        """One-line summary of cache effectiveness"""
+        stats = self.stats()
+        return f"LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)"
@@ -3,6 +3,8 @@ Deep Research Module for Looksmaxing Niche
 Based on analysis of looksmax.org and best-of-the-best subforum
 """
 
+from term_scanner import TermScanner
+
 class LooksmaxingResearch:
     """
     Comprehensive research data for looksmaxing niche including:
@@ -28,6 +30,16 @@ class LooksmaxingResearch:
         "botb": "Best of the Best - highest quality content subforum",
     }
     
+    # Terms an article must use to read as community content (content validation)
+    REQUIRED_TERMS = ['looksmax', 'softmaxx', 'hardmaxx', 'mewing', 'mog', 'chad', 'maxxing']
+    
+    # Generic self-help phrasing that marks an article as normie content
+    NORMIE_PATTERNS = [
+        'self-improvement journey', 'personal growth', 'be your best self',
+        'unlock your potential', 'optimize your potential', 'feel good about yourself',
+        'build confidence', 'self-care', 'wellness journey'
+    ]
+    
     # Maxxing Categories (from forum analysis)
     MAXXING_CATEGORIES = [
         "looksmaxxing", "softmaxxing", "hardmaxxing", "mewing", "skincaremaxxing",
@@ -174,6 +186,15 @@ class LooksmaxingResearch:
         ]
     }
     
+    # WordPress category -> keywords that put a post in it (categorisation)
+    CATEGORY_KEYWORDS = {
+        "Facial Aesthetics": ["jawline", "mewing", "facial", "nose", "mouth", "skincare", "teeth", "jaw", "chin"],
+        "Body Aesthetics": ["physique", "posture", "height", "shoulder", "waist", "muscle", "body"],
+        "Lifestyle": ["sleep", "diet", "supplement", "hormone", "stress", "nutrition", "lifestyle"],
+        "Grooming": ["hair", "fashion", "fragrance", "dental", "grooming", "style", "wardrobe"],
+        "Surgery": ["surgery", "orthodontics", "steroids", "peptide", "hair transplant", "filler", "hardmaxxing"]
+    }
+    
     # Audience Insights
     AUDIENCE_INSIGHTS = {
         "demographics": "Primarily men aged 18-35 interested in self-improvement",
@@ -247,6 +268,27 @@ class LooksmaxingResearch:
         ]
     }
     
+    _term_scanner = None
+    
+    @classmethod
+    def term_scanner(cls):
+        """
+        Scanner over every term in the tables: validation terms, category
+        keywords, SEO keywords and maxxing categories. Built on first use.
+        """
+        if cls._term_scanner is None:
+            terms = cls.REQUIRED_TERMS + cls.NORMIE_PATTERNS + cls.MAXXING_CATEGORIES
+            terms += [keyword for keywords in cls.CATEGORY_KEYWORDS.values() for keyword in keywords]
+            for group, keywords in cls.KEYWORDS.items():
+                if group == "topic_specific":
+                    terms += [keyword for topic_keywords in keywords.values() for keyword in topic_keywords]
+                else:
+                    terms += keywords
+            for keywords in cls.SEO_TERMS.values():
+                terms += keywords
+            cls._term_scanner = TermScanner(terms)
+        return cls._term_scanner
+    
     @classmethod
     def get_topic_suggestion(cls):
         """Generate a creative, varied topic suggestion dynamically"""
@@ -300,31 +342,22 @@ class LooksmaxingResearch:
         base = random.choice(base_topics)
         template = random.choice(topic_templates)
         
-        # Fill template with relevant terms
-        if "{action}" in template:
-            actions = ["improve", "optimize", "enhance", "develop", "maximize", "fix"]
-            goals = ["better results", "maximum gains", "chad aesthetic", "ascension"]
-            topic = template.format(action=random.choice(actions), goal=random.choice(goals))
-        elif "{topic}" in template:
-            topic = template.format(topic=base)
-        elif "{achievement}" in template:
-            achievements = ["improved my jawline", "ascended", "mogged 80% of guys", "got results"]
-            methods = ["mewing", "softmaxxing", "fitnessmaxxing", "looksmaxing"]
-            topic = template.format(achievement=random.choice(achievements), method=random.choice(methods))
-        elif "{alternative}" in template:
-            alternatives = {
-                "softmaxxing": "hardmaxxing",
-                "mewing": "jaw surgery",
-                "natural": "surgical",
-                "skincaremaxxing": "hardmaxxing"
-            }
-            alt = alternatives.get(base, "alternative methods")
-            topic = template.format(topic=base, alternative=alt)
-        elif "{outcome}" in template:
-            outcomes = ["better looks", "chad aesthetic", "maximum results", "ascension"]
-            topic = template.format(topic=base, outcome=random.choice(outcomes))
-        else:
-            topic = template.format(topic=base)
+        # Fill template with relevant terms (format ignores the ones a template doesn't use)
+        alternatives = {
+            "softmaxxing": "hardmaxxing",
+            "mewing": "jaw surgery",
+            "natural": "surgical",
+            "skincaremaxxing": "hardmaxxing"
+        }
+        topic = template.format(
+            topic=base,
+            action=random.choice(["improve", "optimize", "enhance", "develop", "maximize", "fix"]),
+            goal=random.choice(["better results", "maximum gains", "chad aesthetic", "ascension"]),
+            achievement=random.choice(["improved my jawline", "ascended", "mogged 80% of guys", "got results"]),
+            method=random.choice(["mewing", "softmaxxing", "fitnessmaxxing", "looksmaxing"]),
+            alternative=alternatives.get(base, "alternative methods"),
+            outcome=random.choice(["better looks", "chad aesthetic", "maximum results", "ascension"])
+        )
         
         return topic
     
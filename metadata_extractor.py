@@ -0,0 +1,135 @@
+"""
+Metadata Extractor - Picks tags and an excerpt from a generated article without a model call
+Terms are scored by their keyword tier, how often the article uses them and how rare they are among tracked posts
+"""
+
+import re
+import math
+from collections import Counter
+from term_scanner import TermScanner
+
+
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+[.!?]+')
+
+# Weight of a keyword by the tier it is listed in (the highest tier wins)
+TIER_WEIGHTS = (
+    ("SEO_TERMS", "high_volume", 3.0),
+    ("KEYWORDS", "primary", 3.0),
+    ("SEO_TERMS", "long_tail_high_intent", 2.5),
+    ("KEYWORDS", "long_tail", 2.5),
+    ("SEO_TERMS", "medium_volume", 2.0),
+    ("KEYWORDS", "secondary", 2.0),
+    ("KEYWORDS", "topic_specific", 2.0),
+    ("MAXXING_CATEGORIES", None, 2.0),
+    ("SEO_TERMS", "comparison_keywords", 1.5),
+    ("SEO_TERMS", "question_keywords", 1.5),
+)
+
+
+class MetadataExtractor:
+    """
+    Local tag and excerpt extraction (METADATA_ENGINE=local)
+
+    Tag candidates are the keywords of LooksmaxingResearch found as whole
+    words in the article. Each is scored TF-IDF style: tier weight x
+    (1 + log of its uses, the title counting extra) x inverse frequency
+    among the titles, topics and tags of tracked posts - so tags that say
+    what sets this post apart rank above the ones every post has. The
+    excerpt is the opening sentence (or two) that best fits a meta
+    description: 110-160 characters, mentioning the post's focus keywords.
+    """
+    
+    TITLE_WEIGHT = 3  # A term in the title counts as this many uses
+    MIN_TAGS = 8
+    MAX_TAGS = 10
+    EXCERPT_SENTENCES = 8  # Opening sentences considered for the excerpt
+    
+    def __init__(self, research, post_tracker):
+        self.research = research
+        self.post_tracker = post_tracker
+        self.weights = {}
+        for table, group, weight in TIER_WEIGHTS:
+            terms = getattr(research, table)
+            terms = terms[group] if group else terms
+            if isinstance(terms, dict):
+                terms = [term for group_terms in terms.values() for term in group_terms]
+            for term in terms:
+                self.weights.setdefault(term.lower(), weight)
+        self.scanner = TermScanner(self.weights)
+    
+    def tags(self, title, stats, fallback=()):
+        """8-10 tags for the article (stats: its ContentStats), topped up from fallback if it has too few keywords"""
+        counts = self._term_counts(stats.text)
+        for term, count in self._term_counts(title).items():
+            counts[term] += count * self.TITLE_WEIGHT
+        
+        idf = self._inverse_frequencies()
+        scored = sorted(
+            ((self.weights[term] * (1 + math.log(count)) * idf(term), term) for term, count in counts.items()),
+            key=lambda item: (-item[0], item[1])
+        )
+        tags = self._distinct([term for _, term in scored], self.MAX_TAGS)
+        if len(tags) < self.MIN_TAGS:
+            tags = self._distinct(tags + [term.lower() for term in fallback], self.MIN_TAGS)
+        return tags
+    
+    def excerpt(self, title, stats, max_length=160):
+        """A meta description from the opening sentences of the article"""
+        sentences = [match.group(0).strip() for match in SENTENCE_PATTERN.finditer(stats.text)]
+        sentences = [sentence for sentence in sentences if len(sentence.split()) >= 5][:self.EXCERPT_SENTENCES]
+        if not sentences:
+            return stats.excerpt(max_length)
+        focus = set(self._term_counts(title))
+        
+        def score(index):
+            sentence = sentences[index]
+            found = set(self._term_counts(sentence))
+            fit = 1.0 if 110 <= len(sentence) <= max_length else 0.5 if len(sentence) <= max_length else 0.0
+            return 3 * len(found & focus) + len(found) + 2 * fit - 0.5 * index
+        
+        best = max(range(len(sentences)), key=score)
+        excerpt = sentences[best]
+        if len(excerpt) < 110 and best + 1 < len(sentences) and len(excerpt) + 1 + len(sentences[best + 1]) <= max_length:
+            excerpt = f"{excerpt} {sentences[best + 1]}"
+        if len(excerpt) > max_length:
+            excerpt = excerpt[:max_length - 3].rsplit(' ', 1)[0].rstrip(',;:') + "..."
+        return excerpt
+    
+    def _term_counts(self, text):
+        """Uses of each keyword as a whole word (no "jaw" inside "jawline")"""
+        text = text.lower()
+        counts = Counter()
+        next_free = {}
+        for start, term in self.scanner.matches(text):
+            end = start + len(term)
+            if (start and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            if start >= next_free.get(term, 0):
+                counts[term] += 1
+                next_free[term] = end
+        return counts
+    
+    def _inverse_frequencies(self):
+        """idf(term) over the tracked posts, each post being its title, topic and tags"""
+        posts = self.post_tracker.get_all_posts()
+        document_frequency = Counter()
+        for post in posts:
+            document = " | ".join([post.get('title', ''), post.get('topic', '')] + post.get('tags', []))
+            document_frequency.update(self._term_counts(document).keys())
+        return lambda term: math.log((len(posts) + 1) / (document_frequency[term] + 1)) + 1
+    
+    def _distinct(self, terms, limit):
+        """
+        The first limit terms, skipping spelling variants (looksmaxing/looksmaxxing,
+        self-improvement/self improvement) and words of a longer tag already
+        taken ("hair" after "hair styling")
+        """
+        distinct, seen, words = [], set(), set()
+        for term in terms:
+            key = re.sub(r'[\s-]+', '', term).replace('xx', 'x')
+            if key in seen or term in words or len(distinct) >= limit:
+                continue
+            seen.add(key)
+            words.update(term.split())
+            distinct.append(term)
+        return distinct
@@ -0,0 +1,146 @@
+"""
+Metadata Planner - Title, tags, category, excerpt and outline of a post in one structured call
+Ollama's JSON format option constrains the answer to a schema; whatever fails validation falls back to the per-field methods
+"""
+
+import json
+from tracing import traced, annotate
+from section_engine import SectionedContentEngine
+
+
+class MetadataPlanner:
+    """
+    Plans a post with a single schema-constrained request (METADATA_ENGINE=json)
+
+    plan() returns only the fields that passed validation, so a partly bad
+    answer still saves the calls for the good fields; an empty plan means
+    every field is produced the usual way.
+    """
+    
+    MIN_TAGS = 5
+    MAX_TAGS = 10
+    MAX_TITLE_LENGTH = 70
+    MIN_EXCERPT_LENGTH = 70
+    MAX_EXCERPT_LENGTH = 160
+    
+    def __init__(self, generator):
+        self.generator = generator
+        self.categories = list(generator.research.CATEGORY_KEYWORDS)
+        self.schema = {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string"},
+                "alternative_titles": {"type": "array", "items": {"type": "string"}},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "category": {"type": "string", "enum": self.categories},
+                "excerpt": {"type": "string"},
+                "outline": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"h2": {"type": "string"}, "h3": {"type": "array", "items": {"type": "string"}}},
+                        "required": ["h2", "h3"]
+                    }
+                }
+            },
+            "required": ["title", "alternative_titles", "tags", "category", "excerpt", "outline"]
+        }
+    
+    @traced("generate.metadata")
+    def plan(self, topic):
+        """Plan the post about topic. Returns the valid fields (titles - title first, then alternatives - tags, category, excerpt, outline)."""
+        system_prompt, prompt = self._build_prompt(topic)
+        try:
+            text = self.generator._generate_text(system_prompt, prompt, temperature=0.7, max_tokens=1200, json_schema=self.schema, model=self.generator.model_for("metadata"))
+        except Exception as e:
+            print(f"⚠ Metadata request failed ({e}), generating every field separately")
+            return {}
+        return self._validate(text)
+    
+    @traced("generate.metadata")
+    async def plan_async(self, topic):
+        """Async counterpart of plan"""
+        system_prompt, prompt = self._build_prompt(topic)
+        try:
+            text = await self.generator._generate_text_async(system_prompt, prompt, temperature=0.7, max_tokens=1200, json_schema=self.schema, model=self.generator.model_for("metadata"))
+        except Exception as e:
+            print(f"⚠ Metadata request failed ({e!r}), generating every field separately")
+            return {}
+        return self._validate(text)
+    
+    def _build_prompt(self, topic):
+        system_prompt = "You are an expert SEO content creator specializing in looksmaxing and male self-improvement."
+        keywords = self.generator.research.get_keywords_for_topic(topic)
+        prompt = f"""Plan a looksmaxing blog post about: {topic}
+
+Primary keyword: {keywords[0] if keywords else topic}
+Secondary keywords: {', '.join(keywords[1:8])}
+
+Answer in JSON with:
+- title: 60-70 characters, title case, primary keyword included, uses looksmaxing terminology
+- alternative_titles: 3 other titles meeting the same rules
+- tags: 8-10 SEO tags
+- category: one of {', '.join(self.categories)}
+- excerpt: meta description of 120-160 characters with the primary keyword
+- outline: {SectionedContentEngine.MIN_SECTIONS}-{SectionedContentEngine.MAX_SECTIONS} main sections (h2, the last one is the conclusion), each with 2-3 subsections (h3)"""
+        return system_prompt, prompt
+    
+    def _validate(self, text):
+        """Parse the answer and keep the fields that meet the rules"""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            print("⚠ Metadata answer is not valid JSON, generating every field separately")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        try:
+            plan = self._fields(data)
+        except (TypeError, KeyError, ValueError, AttributeError) as e:
+            print(f"⚠ Metadata answer has an unexpected shape ({e!r}), generating every field separately")
+            return {}
+        
+        missing = [field for field in ('titles', 'tags', 'category', 'excerpt', 'outline') if field not in plan]
+        annotate(missing=missing)
+        if missing:
+            print(f"⚠ Metadata fields rejected, generating them separately: {', '.join(missing)}")
+        return plan
+    
+    def _fields(self, data):
+        """The fields of the parsed answer that meet the rules"""
+        plan = {}
+        titles = [data.get('title')] + (data.get('alternative_titles') if isinstance(data.get('alternative_titles'), list) else [])
+        titles = [self._clean(title) for title in titles if isinstance(title, str)]
+        titles = [title for title in dict.fromkeys(titles) if title and len(title) <= self.MAX_TITLE_LENGTH]
+        if titles:
+            plan['titles'] = titles
+        
+        tags = data.get('tags')
+        if isinstance(tags, list):
+            tags = list(dict.fromkeys(self._clean(tag) for tag in tags if isinstance(tag, str) and self._clean(tag)))
+            if len(tags) >= self.MIN_TAGS:
+                plan['tags'] = tags[:self.MAX_TAGS]
+        
+        if data.get('category') in self.categories:
+            plan['category'] = data['category']
+        
+        excerpt = self._clean(data.get('excerpt')) if isinstance(data.get('excerpt'), str) else ""
+        if self.MIN_EXCERPT_LENGTH <= len(excerpt) <= self.MAX_EXCERPT_LENGTH:
+            plan['excerpt'] = excerpt
+        
+        outline = data.get('outline')
+        if isinstance(outline, list):
+            sections = []
+            for section in outline:
+                if not (isinstance(section, dict) and isinstance(section.get('h2'), str) and self._clean(section['h2'])):
+                    continue
+                # Subsections must be a list - null gives none, a string is not split into characters
+                h3 = section.get('h3')
+                h3 = h3 if isinstance(h3, list) else []
+                sections.append({"h2": self._clean(section['h2']), "h3": [self._clean(item) for item in h3 if isinstance(item, str) and self._clean(item)]})
+            if len(sections) >= SectionedContentEngine.MIN_SECTIONS - 2:
+                plan['outline'] = sections[:SectionedContentEngine.MAX_SECTIONS]
+        return plan
+    
+    def _clean(self, text):
+        return " ".join(text.split()).strip('"\'').strip()
@@ -0,0 +1,146 @@
+"""
+Ollama Router - Spreads generations over several Ollama endpoints
+Least-outstanding-requests dispatch with periodic health probes and failover
+"""
+
+import threading
+from http_client import get_session
+
+
+class OllamaEndpoint:
+    """State of one Ollama server as seen by the router"""
+    
+    def __init__(self, url):
+        self.url = url
+        self.healthy = False
+        self.models = set()
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_error = None
+    
+    def serves(self, model):
+        """Whether /api/tags listed the model (a missing tag means :latest)"""
+        return model in self.models or (':' not in model and f"{model}:latest" in self.models)
+
+
+class OllamaRouter:
+    """Picks the least busy healthy endpoint that has the model for every request"""
+    
+    def __init__(self, urls, model, probe_interval=30, session=None):
+        if not urls:
+            raise ValueError("No Ollama endpoints configured")
+        self.model = model
+        self.probe_interval = probe_interval
+        self.session = session or get_session()
+        self.endpoints = [OllamaEndpoint(url) for url in urls]
+        self._lock = threading.Lock()
+        self._next = 0  # Rotates ties between equally loaded endpoints
+        self._stop = threading.Event()
+        self._prober = None
+    
+    def __len__(self):
+        return len(self.endpoints)
+    
+    def probe(self, endpoint):
+        """Check an endpoint with /api/tags and refresh its model list"""
+        try:
+            response = self.session.get(f"{endpoint.url}/api/tags", timeout=5)
+            response.raise_for_status()
+            models = {model.get('name', '') for model in response.json().get('models', [])}
+        except Exception as e:
+            with self._lock:
+                endpoint.healthy = False
+                endpoint.last_error = str(e)
+            return False
+        
+        with self._lock:
+            endpoint.healthy = True
+            endpoint.models = models
+            endpoint.last_error = None
+        return True
+    
+    def probe_all(self):
+        """Probe every endpoint, returns the number of healthy ones"""
+        return sum(self.probe(endpoint) for endpoint in self.endpoints)
+    
+    def start(self):
+        """Probe all endpoints now, then keep probing them in the background"""
+        healthy = self.probe_all()
+        if self.probe_interval > 0 and self._prober is None:
+            self._prober = threading.Thread(target=self._probe_loop, name="ollama-probe", daemon=True)
+            self._prober.start()
+        return healthy
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            for endpoint in self.endpoints:
+                was_healthy = endpoint.healthy
+                if self.probe(endpoint) != was_healthy:
+                    state = "back up" if endpoint.healthy else f"down ({endpoint.last_error})"
+                    print(f"  ⚠ Ollama endpoint {endpoint.url} is {state}")
+    
+    def acquire(self, exclude=(), model=None):
+        """
+        Reserve the endpoint to send the next request to
+
+        Healthy endpoints that serve the model (default: the router's) come first, then healthy ones
+        whose model list may be stale, then any endpoint not in exclude (a
+        probe may just have missed it). Every acquire must be paired with a
+        release.
+        """
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.url not in exclude]
+            if not candidates:
+                raise ValueError("No Ollama endpoint left to try")
+            candidates = (
+                [endpoint for endpoint in candidates if endpoint.healthy and endpoint.serves(model or self.model)]
+                or [endpoint for endpoint in candidates if endpoint.healthy]
+                or candidates
+            )
+            self._next = (self._next + 1) % len(self.endpoints)
+            endpoint = min(
+                candidates,
+                key=lambda endpoint: (endpoint.outstanding, (self.endpoints.index(endpoint) - self._next) % len(self.endpoints))
+            )
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint.url
+    
+    def release(self, url, error=None):
+        """Return an endpoint after a request; an error takes it out of rotation until the next good probe"""
+        with self._lock:
+            endpoint = self._find(url)
+            if endpoint is None:
+                return
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if error is not None:
+                endpoint.failures += 1
+                endpoint.healthy = False
+                endpoint.last_error = str(error)
+    
+    def has_untried(self, tried):
+        """Whether any endpoint is left to fail over to"""
+        return any(endpoint.url not in tried for endpoint in self.endpoints)
+    
+    def _find(self, url):
+        for endpoint in self.endpoints:
+            if endpoint.url == url:
+                return endpoint
+        return None
+    
+    def summary(self):
+        """One line per endpoint with its state and request counts"""
+        lines = ["Ollama endpoints:"]
+        for endpoint in self.endpoints:
+            if not endpoint.healthy:
+                state = "down"
+            elif endpoint.serves(self.model):
+                state = "healthy"
+            else:
+                state = f"healthy, {self.model} not pulled"
+            lines.append(f"  {endpoint.url}: {state}, {endpoint.requests} requests, {endpoint.failures} failures")
+        return "\n".join(lines)
@@ -0,0 +1,148 @@
+"""
+Ollama Telemetry - Prefill/decode speed, model loads and prompt sizes from /api/generate responses
+Every response carries its own timings; they are summed per post, per model and per endpoint
+"""
+
+import threading
+import contextvars
+from collections import deque
+
+
+_post_totals = contextvars.ContextVar("post_totals", default=None)
+
+
+class CallTotals:
+    """Running sums over a set of generation calls"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.max_prompt_tokens = 0
+        self.prompt_seconds = 0.0
+        self.tokens = 0
+        self.eval_seconds = 0.0
+        self.cold_loads = 0
+        self.load_seconds = 0.0
+        self.total_seconds = 0.0
+    
+    def add(self, call):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += call['prompt_tokens']
+            self.max_prompt_tokens = max(self.max_prompt_tokens, call['prompt_tokens'])
+            self.prompt_seconds += call['prompt_seconds']
+            self.tokens += call['tokens']
+            self.eval_seconds += call['eval_seconds']
+            self.cold_loads += call['cold_load']
+            self.load_seconds += call['load_seconds']
+            self.total_seconds += call['total_seconds']
+    
+    def to_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "avg_prompt_tokens": self.prompt_tokens / self.calls if self.calls else 0.0,
+                "max_prompt_tokens": self.max_prompt_tokens,
+                "prefill_tokens_per_sec": self.prompt_tokens / self.prompt_seconds if self.prompt_seconds else None,
+                "tokens": self.tokens,
+                "decode_tokens_per_sec": self.tokens / self.eval_seconds if self.eval_seconds else None,
+                "cold_loads": self.cold_loads,
+                "load_seconds": self.load_seconds,
+                "total_seconds": self.total_seconds,
+            }
+    
+    def line(self):
+        """One-line summary: prompt sizes, prefill and decode speed, model loads"""
+        stats = self.to_dict()
+        prefill = f"{stats['prefill_tokens_per_sec']:.0f}" if stats['prefill_tokens_per_sec'] else "-"
+        decode = f"{stats['decode_tokens_per_sec']:.1f}" if stats['decode_tokens_per_sec'] else "-"
+        return (f"{stats['calls']} calls, prompt avg {stats['avg_prompt_tokens']:.0f}/max {stats['max_prompt_tokens']} tokens, "
+                f"prefill {prefill} tok/s, decode {decode} tok/s, "
+                f"{stats['cold_loads']} cold loads ({stats['load_seconds']:.1f}s)")
+
+
+class OllamaTelemetry:
+    """
+    Collects the timing fields Ollama returns with every generation
+
+    Durations come in nanoseconds: prompt_eval_* is the prefill, eval_* the
+    decode and load_duration the time spent loading the model - near zero
+    while it stays in memory, so a long one is a cold load (a model reload
+    usually means keep_alive ran out or another model pushed it out of
+    VRAM). Calls served from the response cache never reach Ollama and are
+    not counted.
+    """
+    
+    COLD_LOAD_SECONDS = 1.0  # load_duration above this means the model was loaded for the call
+    RECENT_LOADS = 20  # Cold-load events kept for the summary
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = CallTotals()
+        self.models = {}
+        self.endpoints = {}
+        self.recent_loads = deque(maxlen=self.RECENT_LOADS)
+    
+    def record(self, model, endpoint, result):
+        """Record one finished /api/generate result; returns the call's metrics"""
+        call = {
+            "model": model,
+            "endpoint": endpoint,
+            "prompt_tokens": result.get('prompt_eval_count') or 0,
+            "prompt_seconds": (result.get('prompt_eval_duration') or 0) / 1e9,
+            "tokens": result.get('eval_count') or 0,
+            "eval_seconds": (result.get('eval_duration') or 0) / 1e9,
+            "load_seconds": (result.get('load_duration') or 0) / 1e9,
+            "total_seconds": (result.get('total_duration') or 0) / 1e9,
+        }
+        call['cold_load'] = call['load_seconds'] >= self.COLD_LOAD_SECONDS
+        
+        with self._lock:
+            totals = [self.total, self.models.setdefault(model, CallTotals()), self.endpoints.setdefault(endpoint, CallTotals())]
+            if call['cold_load']:
+                self.recent_loads.append((model, endpoint, call['load_seconds']))
+        post = _post_totals.get()
+        if post is not None:
+            totals.append(post)
+        for entry in totals:
+            entry.add(call)
+        
+        if call['cold_load']:
+            print(f"  ⚠ Ollama loaded {model} on {endpoint} for this call ({call['load_seconds']:.1f}s)")
+        return call
+    
+    def collect(self, totals):
+        """Make the current thread or task also add its calls to totals (a CallTotals, or None to stop)"""
+        _post_totals.set(totals)
+    
+    def snapshot(self):
+        """Run totals as a dict: overall, per model and per endpoint, plus the recent cold loads"""
+        with self._lock:
+            models = dict(self.models)
+            endpoints = dict(self.endpoints)
+            loads = list(self.recent_loads)
+        return {
+            "total": self.total.to_dict(),
+            "models": {model: totals.to_dict() for model, totals in models.items()},
+            "endpoints": {endpoint: totals.to_dict() for endpoint, totals in endpoints.items()},
+            "recent_cold_loads": [{"model": model, "endpoint": endpoint, "seconds": seconds} for model, endpoint, seconds in loads],
+        }
+    
+    def summary(self):
+        """Run summary: overall line, then one per model and endpoint when there are several"""
+        if not self.total.calls:
+            return "Ollama: no generation calls"
+        with self._lock:
+            models = sorted(self.models.items())
+            endpoints = sorted(self.endpoints.items())
+            loads = list(self.recent_loads)
+        lines = [f"Ollama: {self.total.line()}"]
+        if len(models) > 1:
+            lines.extend(f"  {model}: {totals.line()}" for model, totals in models)
+        if len(endpoints) > 1:
+            lines.extend(f"  {endpoint}: {totals.line()}" for endpoint, totals in endpoints)
+        if loads:
+            lines.append("  Recent cold loads: " + ", ".join(f"{model} on {endpoint} ({seconds:.1f}s)" for model, endpoint, seconds in loads))
+        return "\n".join(lines)
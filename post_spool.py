@@ -0,0 +1,184 @@
+"""
+Post Spool - Durable checkpoints for generated posts on their way to WordPress
+A post survives crashes and WordPress outages and resumes from its last completed step
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from collections import Counter
+from datetime import datetime
+from config import SPOOL_DIR, SPOOL_RETRY_BACKOFF
+
+
+# Publishing steps in order; an entry only ever moves forward
+STATES = ("generated", "media_uploaded", "published", "tracked")
+
+
+class SpoolEntry:
+    """
+    One generated post and how far its publishing got
+
+    Every change is written through to the entry's file before the next
+    step starts, so a crash loses at most the step in progress. Entries
+    without a path (publishing without a spool) only live in memory.
+    """
+    
+    def __init__(self, record, path=None):
+        self.record = record
+        self.path = path
+    
+    @classmethod
+    def in_memory(cls, post_data):
+        return cls({"id": None, "state": "generated", "post": post_data})
+    
+    @property
+    def id(self):
+        return self.record["id"]
+    
+    @property
+    def post_data(self):
+        return self.record["post"]
+    
+    @property
+    def state(self):
+        return self.record["state"]
+    
+    def get(self, key, default=None):
+        return self.record.get(key, default)
+    
+    def reached(self, state):
+        """Whether the entry has completed state (or a later one)"""
+        return STATES.index(self.state) >= STATES.index(state)
+    
+    def advance(self, state, **fields):
+        """Record a completed step with its results (e.g. media_id, post_id)"""
+        if not self.reached(state):
+            self.record["state"] = state
+        self.update(**fields)
+    
+    def update(self, **fields):
+        self.record.update(fields)
+        self.record["updated"] = time.time()
+        self._write()
+    
+    def _write(self):
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.record, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠ Could not write spool entry {self.id}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+class PostSpool:
+    """
+    Directory of generated posts that are not fully published yet
+
+    Generated posts are added before publishing starts and removed once
+    they are tracked. Failed entries are retried with exponential backoff;
+    entries left over from an earlier run are picked up at startup. Posts
+    generated ahead carry a publish_at time and are not due before it.
+    """
+    
+    def __init__(self, spool_dir=SPOOL_DIR, retry_backoff=SPOOL_RETRY_BACKOFF):
+        self.spool_dir = spool_dir
+        self.retry_backoff = retry_backoff
+        self._entries = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._load()
+    
+    def _load(self):
+        for entry in os.scandir(self.spool_dir):
+            if not entry.is_file() or not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Skipping unreadable spool entry {entry.name}: {e}")
+                continue
+            record["retry_at"] = 0  # Resume right away after a restart
+            self._entries[record["id"]] = SpoolEntry(record, entry.path)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def add(self, post_data, publish_at=None):
+        """
+        Checkpoint a freshly generated post; the returned entry is already claimed by the caller
+        
+        publish_at (a timestamp) keeps the entry from being due before then,
+        see hold.
+        """
+        entry_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        record = {"id": entry_id, "state": "generated", "post": post_data, "attempts": 0, "created": time.time()}
+        if publish_at is not None:
+            record["publish_at"] = publish_at
+        entry = SpoolEntry(record, os.path.join(self.spool_dir, f"{entry_id}.json"))
+        entry.update()
+        with self._lock:
+            self._entries[entry_id] = entry
+            self._in_flight.add(entry_id)
+        return entry
+    
+    def take_due(self):
+        """Claim the oldest entry that is not in flight and due for a retry, or None"""
+        now = time.time()
+        with self._lock:
+            for entry_id in sorted(self._entries):
+                entry = self._entries[entry_id]
+                due = max(entry.get("retry_at", 0), entry.get("publish_at") or 0)
+                if entry_id not in self._in_flight and due <= now:
+                    self._in_flight.add(entry_id)
+                    return entry
+        return None
+    
+    def release(self, entry, error):
+        """Give back a claimed entry whose publishing failed; it is retried after a backoff"""
+        attempts = entry.get("attempts", 0) + 1
+        delay = min(self.retry_backoff * 2 ** (attempts - 1), 3600)
+        entry.update(attempts=attempts, retry_at=time.time() + delay, last_error=str(error))
+        print(f"  Post kept in spool at step '{entry.state}', retrying in {delay:.0f}s")
+        with self._lock:
+            self._in_flight.discard(entry.id)
+    
+    def hold(self, entry):
+        """Give back a claimed entry that waits for its publish_at time"""
+        with self._lock:
+            self._in_flight.discard(entry.id)
+    
+    def scheduled(self):
+        """Number of entries per publish_at time (entries generated ahead)"""
+        with self._lock:
+            return Counter(entry.get("publish_at") for entry in self._entries.values() if entry.get("publish_at"))
+    
+    def finish(self, entry):
+        """Remove an entry that is fully published, or that can never be published"""
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+        with self._lock:
+            self._entries.pop(entry.id, None)
+            self._in_flight.discard(entry.id)
+    
+    def summary(self):
+        with self._lock:
+            states = [entry.state for entry in self._entries.values()]
+        if not states:
+            return "Post spool: empty"
+        return f"Post spool: {len(states)} unpublished post(s) (" + ", ".join(f"{state}={states.count(state)}" for state in STATES if state in states) + ")"
@@ -4,7 +4,10 @@ Post Tracker - Tracks published posts for internal linking
 
 import json
 import os
+import threading
 from datetime import datetime
+from collections import Counter
+from term_scanner import TermScanner
 
 
 class PostTracker:
@@ -13,6 +16,7 @@ class PostTracker:
     def __init__(self, tracker_file="published_posts.json"):
         self.tracker_file = tracker_file
         self.posts = self._load_posts()
+        self._lock = threading.Lock()  # Publish workers may track posts concurrently
     
     def _load_posts(self):
         """Load published posts from file"""
@@ -44,21 +48,22 @@ class PostTracker:
             "published_date": datetime.now().isoformat()
         }
         
-        # Check if post already exists (by ID)
-        existing_index = None
-        for i, post in enumerate(self.posts):
-            if post.get('id') == post_id:
-                existing_index = i
-                break
-        
-        if existing_index is not None:
-            # Update existing post
-            self.posts[existing_index] = post_data
-        else:
-            # Add new post
-            self.posts.append(post_data)
-        
-        self._save_posts()
+        with self._lock:
+            # Check if post already exists (by ID)
+            existing_index = None
+            for i, post in enumerate(self.posts):
+                if post.get('id') == post_id:
+                    existing_index = i
+                    break
+            
+            if existing_index is not None:
+                # Update existing post
+                self.posts[existing_index] = post_data
+            else:
+                # Add new post
+                self.posts.append(post_data)
+            
+            self._save_posts()
         print(f"✓ Post tracked: {title}")
     
     def get_relevant_posts(self, current_topic, current_title, max_posts=3):
@@ -77,6 +82,17 @@ class PostTracker:
         if current_title_lower:
             current_keywords.update(current_title_lower.split())
         
+        # Only meaningful keywords; a scanner finds all of them in a text in one pass
+        current_keywords = {keyword for keyword in current_keywords if len(keyword) > 3}
+        keyword_scanner = TermScanner(current_keywords)
+        
+        # Tags work both ways (keyword in tag or tag in keyword): scan every keyword once for all known tags
+        tag_scanner = TermScanner({tag.lower() for post in self.posts for tag in post.get('tags', [])})
+        keywords_containing = Counter()
+        for keyword in current_keywords:
+            keywords_containing.update(tag_scanner.found(keyword))
+        tag_matches = {}
+        
         # Score posts by relevance
         scored_posts = []
         for post in self.posts:
@@ -96,19 +112,16 @@ class PostTracker:
                 score += 10
             
             # Check keyword matches in title
-            for keyword in current_keywords:
-                if len(keyword) > 3:  # Only meaningful keywords
-                    if keyword in post_title:
-                        score += 5
-                    if keyword in post_topic:
-                        score += 3
+            score += 5 * len(keyword_scanner.found(post_title))
+            score += 3 * len(keyword_scanner.found(post_topic))
             
             # Check tag matches
-            for keyword in current_keywords:
-                if len(keyword) > 3:
-                    for tag in post_tags:
-                        if keyword in tag or tag in keyword:
-                            score += 2
+            for tag in post_tags:
+                if tag not in tag_matches:
+                    # A keyword equal to the tag matches both ways but counts once
+                    tag_matches[tag] = (len(keyword_scanner.found(tag)) + keywords_containing[tag]
+                                        - (tag in current_keywords))
+                score += 2 * tag_matches[tag]
             
             if score > 0:
                 scored_posts.append((score, post))
@@ -0,0 +1,191 @@
+"""
+REST Batch - Groups WordPress REST writes into /batch/v1 calls (WordPress 5.6+)
+Up to 25 sub-requests travel in one HTTP call; sites without the endpoint get the requests one by one
+"""
+
+import json
+import asyncio
+import aiohttp
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http_client import get_async_session
+from tracing import traced, annotate
+from config import WP_BATCH_ENABLED, WP_BATCH_MAX_ITEMS
+
+
+class RestBatch:
+    """
+    Runs a list of wp/v2 write requests, batched when the site supports it
+
+    A request is (method, path, body) with path relative to wp/v2, query
+    string included (e.g. ("DELETE", "posts/12?force=true", None)). Results
+    come back in request order as (status, body) - status None when the
+    request could not be sent at all - whether the request went through a
+    batch or on its own. Batches use the "normal" validation mode, so every
+    sub-request succeeds or fails on its own. Support is detected on first
+    use from the OPTIONS answer of the batch route (which also tells its
+    item limit); sub-requests a route refuses to batch are resent singly.
+    """
+    
+    FALLBACK_WORKERS = 4  # Single requests in flight when batching is not available
+    
+    def __init__(self, publisher, enabled=WP_BATCH_ENABLED, max_items=WP_BATCH_MAX_ITEMS):
+        self.publisher = publisher
+        self.max_items = max_items
+        self.supported = None if enabled else False
+        self._detect_lock = threading.Lock()
+    
+    @property
+    def url(self):
+        # Same base as the wp/v2 API, also in the ?rest_route= form
+        return self.publisher.api_url.replace("/wp/v2", "/batch/v1")
+    
+    def _detect(self):
+        with self._detect_lock:
+            if self.supported is None:
+                self.supported = self._probe()
+    
+    def _probe(self):
+        """Whether the site has the batch route; also lowers max_items to the site's limit"""
+        try:
+            response = self.publisher.session.options(self.url, headers=self.publisher.headers, timeout=10)
+            if response.status_code == 200:
+                limit = response.json()['endpoints'][0]['args']['requests'].get('maxItems')
+                if limit:
+                    self.max_items = min(self.max_items, int(limit))
+                return True
+        except Exception:
+            pass
+        print("⚠ WordPress batch API (/batch/v1) not available, sending writes one by one")
+        return False
+    
+    def _chunks(self, requests):
+        return [requests[i:i + self.max_items] for i in range(0, len(requests), self.max_items)]
+    
+    def _batch_body(self, chunk):
+        return {
+            "validation": "normal",
+            "requests": [
+                dict({"method": method, "path": f"/wp/v2/{path}"}, **({"body": body} if body is not None else {}))
+                for method, path, body in chunk
+            ]
+        }
+    
+    def _unpack(self, data, count):
+        """Per-item (status, body) from a batch answer; None for items to resend singly"""
+        responses = data.get('responses') if isinstance(data, dict) else None
+        if not isinstance(responses, list) or len(responses) != count:
+            raise ValueError(f"Unexpected batch answer: {str(data)[:200]}")
+        results = []
+        for item in responses:
+            body = item.get('body')
+            if isinstance(body, dict) and body.get('code') == 'rest_batch_not_allowed':
+                results.append(None)
+            else:
+                results.append((item.get('status'), body))
+        return results
+    
+    @traced("wordpress.batch")
+    def execute(self, requests):
+        """Run the requests, returns their (status, body) in order"""
+        annotate(count=len(requests))
+        if not requests:
+            return []
+        if self.supported is None:
+            self._detect()
+        if not self.supported or len(requests) == 1:
+            return self._send_each(requests)
+        
+        results = []
+        for chunk in self._chunks(requests):
+            try:
+                response = self.publisher.session.post(self.url, headers=self.publisher.headers, json=self._batch_body(chunk), timeout=60)
+                response.raise_for_status()
+                chunk_results = self._unpack(response.json(), len(chunk))
+            except Exception as e:
+                # The batch may have been partly applied - the items are reported failed, not resent
+                print(f"⚠ WordPress batch request failed: {e}")
+                chunk_results = [(None, {"message": str(e)})] * len(chunk)
+            refused = [request for request, result in zip(chunk, chunk_results) if result is None]
+            resent = iter(self._send_each(refused))
+            results.extend(result if result is not None else next(resent) for result in chunk_results)
+        return results
+    
+    def _send_one(self, request):
+        method, path, body = request
+        try:
+            response = self.publisher.session.request(
+                method, f"{self.publisher.api_url}/{path}", headers=self.publisher.headers, json=body, timeout=30
+            )
+            try:
+                return response.status_code, response.json()
+            except ValueError:
+                return response.status_code, {"message": response.text[:200]}
+        except Exception as e:
+            return None, {"message": str(e)}
+    
+    def _send_each(self, requests):
+        if len(requests) <= 1:
+            return [self._send_one(request) for request in requests]
+        with ThreadPoolExecutor(max_workers=self.FALLBACK_WORKERS) as executor:
+            return list(executor.map(self._send_one, requests))
+    
+    @traced("wordpress.batch")
+    async def execute_async(self, requests):
+        """Async counterpart of execute - the batch calls go out concurrently"""
+        annotate(count=len(requests))
+        if not requests:
+            return []
+        if self.supported is None:
+            await asyncio.to_thread(self._detect)
+        if not self.supported or len(requests) == 1:
+            return await self._send_each_async(requests)
+        
+        async def run_chunk(chunk):
+            try:
+                async with get_async_session().post(self.url, headers=self.publisher.headers, json=self._batch_body(chunk),
+                                                    timeout=aiohttp.ClientTimeout(total=60)) as response:
+                    response.raise_for_status()
+                    chunk_results = self._unpack(await response.json(content_type=None), len(chunk))
+            except Exception as e:
+                print(f"⚠ WordPress batch request failed: {e!r}")
+                chunk_results = [(None, {"message": str(e)})] * len(chunk)
+            refused = [request for request, result in zip(chunk, chunk_results) if result is None]
+            resent = iter(await self._send_each_async(refused))
+            return [result if result is not None else next(resent) for result in chunk_results]
+        
+        chunks = await asyncio.gather(*(run_chunk(chunk) for chunk in self._chunks(requests)))
+        return [result for chunk_results in chunks for result in chunk_results]
+    
+    async def _send_one_async(self, request):
+        method, path, body = request
+        try:
+            async with get_async_session().request(method, f"{self.publisher.api_url}/{path}", headers=self.publisher.headers,
+                                                   json=body, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                text = await response.text()
+                try:
+                    return response.status, json.loads(text)
+                except ValueError:
+                    return response.status, {"message": text[:200]}
+        except Exception as e:
+            return None, {"message": str(e)}
+    
+    async def _send_each_async(self, requests):
+        semaphore = asyncio.Semaphore(self.FALLBACK_WORKERS)
+        
+        async def send(request):
+            async with semaphore:
+                return await self._send_one_async(request)
+        
+        return await asyncio.gather(*(send(request) for request in requests))
+
+
+def succeeded(result):
+    """Whether a (status, body) result is a 2xx answer"""
+    return result[0] is not None and 200 <= result[0] < 300
+
+
+def error_message(result):
+    status, body = result
+    message = body.get('message') if isinstance(body, dict) else None
+    return f"HTTP {status}: {message}" if status else message or "request failed"
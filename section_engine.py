@@ -0,0 +1,276 @@
+"""
+Sectioned Content Engine - Outline first, then sections in parallel
+Wall-clock time per post tracks the slowest section instead of the whole article
+"""
+
+import re
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from tracing import span, traced, annotate
+from config import MIN_WORD_COUNT, MAX_WORD_COUNT, SECTION_WORKERS
+
+
+def strip_code_fences(text):
+    """Remove ```html fences models like to wrap HTML in"""
+    text = re.sub(r'^\s*```[a-zA-Z]*\s*\n', '', text)
+    return re.sub(r'\n\s*```\s*$', '', text).strip()
+
+
+class SectionedContentEngine:
+    """Generates an article as a structured outline followed by concurrently generated sections"""
+    
+    MIN_SECTIONS = 6
+    MAX_SECTIONS = 8
+    
+    def __init__(self, generator, endpoints=None, max_workers=SECTION_WORKERS):
+        self.generator = generator
+        # None lets the generator's router pick the endpoint for every part
+        self.endpoints = endpoints or [None]
+        self.max_workers = max_workers
+    
+    @traced("generate.outline")
+    def generate_outline(self, title, topic, keywords, system_prompt):
+        """
+        Generate the article outline
+        
+        Returns:
+            Tuple of (outline, context): outline is a list of dicts with keys
+            h2, h3 (list of subsection headings); context is Ollama's context
+            for the outline conversation, or None (also when the outline and
+            the sections use different models)
+        """
+        outline_prompt = self._build_outline_prompt(title, topic, keywords)
+        result = self.generator._generate_response(system_prompt, outline_prompt, temperature=0.6, max_tokens=600, model=self.generator.model_for("outline"))
+        return self._check_outline(self._parse_outline(result['text'])), self._shared_context(result)
+    
+    def _shared_context(self, result):
+        """The outline's context for the sections to continue from - only usable with the same model"""
+        if self.generator.model_for("outline") != self.generator.model_for("content"):
+            return None
+        return result.get('context')
+    
+    def _build_outline_prompt(self, title, topic, keywords):
+        """Build the prompt asking for the H2/H3 structure of the article"""
+        primary_keyword = keywords[0] if keywords else topic
+        return f"""Create the outline for a looksmaxing blog post.
+
+TITLE: {title}
+TOPIC: {topic}
+Primary keyword: {primary_keyword}
+Secondary keywords: {', '.join(keywords[1:8])}
+
+Requirements:
+- {self.MIN_SECTIONS}-{self.MAX_SECTIONS} main sections, the last one is the conclusion
+- 2-3 subsections per main section
+- Use the primary keyword in at least 2 main section headings
+- Headings use looksmaxing terminology and title case
+
+Return ONLY the outline in exactly this format, nothing else:
+H2: First Main Section Heading
+H3: First Subsection Heading
+H3: Second Subsection Heading
+H2: Second Main Section Heading
+H3: ..."""
+    
+    def _check_outline(self, outline):
+        """Reject outlines that are too short and cap the number of sections"""
+        if len(outline) < self.MIN_SECTIONS - 2:
+            raise ValueError(f"Outline has only {len(outline)} sections")
+        return outline[:self.MAX_SECTIONS]
+    
+    def _parse_outline(self, text):
+        """Parse 'H2:'/'H3:' lines into an outline, tolerating bullets, numbering and markdown"""
+        outline = []
+        for line in text.splitlines():
+            line = re.sub(r'^[\s\-*#\d.)]+', '', line).strip()
+            match = re.match(r'(?i)h([23])\s*[:\-]\s*(.+)', line)
+            if not match:
+                continue
+            heading = match.group(2).strip().strip('*"\'').strip()
+            if not heading:
+                continue
+            if match.group(1) == '2':
+                outline.append({"h2": heading, "h3": []})
+            elif outline:
+                outline[-1]["h3"].append(heading)
+        return outline
+    
+    def generate(self, title, topic, keywords, system_prompt, relevant_posts, outline=None):
+        """
+        Generate the outline (unless a planned one is given), then the intro
+        and every section concurrently, and assemble them in order
+        """
+        # Every part continues from the outline conversation: the model already knows
+        # the whole plan, and the shared prefix is served from Ollama's prompt cache
+        context = None
+        if outline is None:
+            outline, context = self.generate_outline(title, topic, keywords, system_prompt)
+        print(f"✓ Outline ready: {len(outline)} sections, generating in parallel on {self._endpoint_count()} endpoint(s)")
+        jobs = self._plan_parts(title, topic, keywords, outline, relevant_posts)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Each part runs in a copy of this context so it records into the
+            # post's cache keys and its spans nest under the content span
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._generate_part, name, section, prompt, system_prompt, self.endpoints[i % len(self.endpoints)], context)
+                for i, (name, section, prompt) in enumerate(jobs)
+            ]
+            parts = [future.result() for future in futures]
+        
+        return self._assemble(jobs, parts)
+    
+    async def generate_async(self, title, topic, keywords, system_prompt, relevant_posts, outline=None):
+        """Async counterpart of generate - parts run as concurrent tasks instead of threads"""
+        context = None
+        if outline is None:
+            outline_prompt = self._build_outline_prompt(title, topic, keywords)
+            with span("generate.outline"):
+                result = await self.generator._generate_response_async(system_prompt, outline_prompt, temperature=0.6, max_tokens=600, model=self.generator.model_for("outline"))
+                outline = self._check_outline(self._parse_outline(result['text']))
+            context = self._shared_context(result)
+        print(f"✓ Outline ready: {len(outline)} sections, generating in parallel on {self._endpoint_count()} endpoint(s)")
+        jobs = self._plan_parts(title, topic, keywords, outline, relevant_posts)
+        
+        limit = asyncio.Semaphore(self.max_workers)
+        
+        async def run(i, name, section, prompt):
+            async with limit:
+                return await self._generate_part_async(name, section, prompt, system_prompt, self.endpoints[i % len(self.endpoints)], context)
+        
+        parts = await asyncio.gather(*(run(i, *job) for i, job in enumerate(jobs)))
+        return self._assemble(jobs, parts)
+    
+    def _endpoint_count(self):
+        return len(self.generator.router) if self.endpoints == [None] else len(self.endpoints)
+    
+    def _plan_parts(self, title, topic, keywords, outline, relevant_posts):
+        """Build the (name, section, prompt) jobs for the intro and every section"""
+        section_words = max(200, (MIN_WORD_COUNT + MAX_WORD_COUNT) // 2 // len(outline))
+        outline_text = "\n".join(
+            f"{i + 1}. {section['h2']}" + "".join(f"\n   - {h3}" for h3 in section['h3'])
+            for i, section in enumerate(outline)
+        )
+        
+        # Spread the structural requirements and internal links across sections
+        table_sections = {1, len(outline) // 2 + 1} if len(outline) > 3 else {1}
+        ol_section = 2 if len(outline) > 4 else 0
+        links = {}
+        for i, post in enumerate(relevant_posts):
+            links.setdefault(i % max(1, len(outline) - 1), []).append(post)
+        
+        jobs = [("intro", None, self._build_intro_prompt(title, topic, keywords, outline_text))]
+        for i, section in enumerate(outline):
+            prompt = self._build_section_prompt(
+                title, topic, keywords, outline_text, i, section, section_words,
+                with_table=i in table_sections,
+                list_tag="ol" if i == ol_section else "ul",
+                links=links.get(i, []),
+                is_last=i == len(outline) - 1
+            )
+            jobs.append((f"section {i + 1}", section, prompt))
+        return jobs
+    
+    def _assemble(self, jobs, parts):
+        """Join the generated parts in outline order, dropping failed ones"""
+        failed = [name for (name, _, _), part in zip(jobs, parts) if part is None]
+        if len(failed) > len(jobs) // 2:
+            raise ValueError(f"Too many sections failed: {', '.join(failed)}")
+        if failed:
+            print(f"⚠ Warning: Dropped failed sections: {', '.join(failed)}")
+        
+        return "\n\n".join(part for part in parts if part)
+    
+    @traced("generate.section")
+    def _generate_part(self, name, section, prompt, system_prompt, base_url, context=None):
+        """Generate one part of the article, retrying once. Returns None if it keeps failing."""
+        annotate(part=name)
+        for attempt in range(2):
+            try:
+                text = self.generator._generate_text(system_prompt, prompt, temperature=0.7, max_tokens=2000, base_url=base_url, context=context, fresh=attempt > 0, model=self.generator.model_for("content"))
+                text = self._clean_part(text, section)
+                if text:
+                    return text
+                print(f"  ⚠ {name} too short, retrying...")
+            except Exception as e:
+                print(f"  ⚠ Error generating {name} (attempt {attempt + 1}): {e}")
+        return None
+    
+    @traced("generate.section")
+    async def _generate_part_async(self, name, section, prompt, system_prompt, base_url, context=None):
+        """Async counterpart of _generate_part"""
+        annotate(part=name)
+        for attempt in range(2):
+            try:
+                text = await self.generator._generate_text_async(system_prompt, prompt, temperature=0.7, max_tokens=2000, base_url=base_url, context=context, fresh=attempt > 0, model=self.generator.model_for("content"))
+                text = self._clean_part(text, section)
+                if text:
+                    return text
+                print(f"  ⚠ {name} too short, retrying...")
+            except Exception as e:
+                print(f"  ⚠ Error generating {name} (attempt {attempt + 1}): {e!r}")
+        return None
+    
+    def _clean_part(self, text, section):
+        """Strip code fences and make sure a section starts with its heading. Returns None if too short."""
+        text = strip_code_fences(text)
+        if section and not re.match(r'\s*<h2', text, re.IGNORECASE):
+            text = f"<h2>{section['h2']}</h2>\n{text}"
+        return text if len(text) >= 100 else None
+    
+    def _build_intro_prompt(self, title, topic, keywords, outline_text):
+        """Build the prompt for the introduction above the first H2"""
+        primary_keyword = keywords[0] if keywords else topic
+        return f"""Write ONLY the introduction of this looksmaxing blog post in WordPress HTML.
+
+TITLE: {title}
+TOPIC: {topic}
+ARTICLE OUTLINE:
+{outline_text}
+
+Requirements:
+- 150-250 words in 2-3 <p> paragraphs, no headings
+- Strong hook, primary keyword "{primary_keyword}" in the first paragraph
+- Authentic looksmaxing tone, use <strong> for key terms
+- Do NOT write any of the sections, no links
+
+Introduction:"""
+    
+    def _build_section_prompt(self, title, topic, keywords, outline_text, index, section, section_words, with_table, list_tag, links, is_last):
+        """Build the prompt for one H2 section"""
+        primary_keyword = keywords[0] if keywords else topic
+        subsections = "\n".join(f"<h3>{h3}</h3>" for h3 in section['h3']) or "2-3 <h3> subsections you choose"
+        
+        extras = [f"- Include one <{list_tag}><li> list"]
+        if with_table:
+            extras.append("- Include one comparison table: <table><thead><tr><th>..</th></tr></thead><tbody><tr><td>..</td></tr></tbody></table>")
+        if links:
+            extras.append("- Add a natural link to each of these posts: " + "; ".join(f'<a href="{post.get("url")}">{post.get("title")}</a>' for post in links))
+        else:
+            extras.append("- Do NOT add any links or 'Related Posts' blocks")
+        if is_last:
+            extras.append("- This is the conclusion: summarize the key points and end with a strong call to action")
+        extras = "\n".join(extras)
+        
+        return f"""Write ONLY section {index + 1} of this looksmaxing blog post in WordPress HTML.
+
+TITLE: {title}
+TOPIC: {topic}
+Primary keyword: {primary_keyword}
+Secondary keywords: {', '.join(keywords[1:8])}
+ARTICLE OUTLINE (other sections are written separately - do not repeat their content):
+{outline_text}
+
+Start with exactly: <h2>{section['h2']}</h2>
+Then cover these subsections in order:
+{subsections}
+
+Requirements:
+- {section_words}-{section_words + 100} words
+- <p> for paragraphs, <strong> for key terms
+- Use the primary keyword naturally at least once
+{extras}
+- Authentic looksmaxing tone and terminology, no normie language
+- No introduction to the article and no text outside this section
+
+Section {index + 1}:"""
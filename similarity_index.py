@@ -0,0 +1,118 @@
+"""
+Similarity Index - Finds near-duplicate titles and topics among published posts
+MinHash signatures with LSH banding, so a lookup only compares against a few candidates
+"""
+
+import re
+import random
+import hashlib
+import threading
+
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Words that say nothing about what an article covers
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "to", "of", "in", "on", "with", "vs", "your", "you", "how",
+    "is", "are", "that", "this", "it", "my", "i", "me", "through", "which", "what", "why", "best",
+    "ultimate", "complete", "guide", "tips", "techniques", "methods", "strategies", "work", "actually",
+    "results", "maximum", "truth", "about", "breakdown", "playbook",
+    "looksmaxing", "looksmaxxing", "looksmax"  # In nearly every title
+}
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = (1 << 61) - 1
+
+
+class SimilarityIndex:
+    """
+    Near-duplicate lookup over short texts (titles and topics)
+
+    A text is reduced to the character trigrams of its meaningful words, so
+    word order and spelling variants ("looksmaxing"/"looksmaxxing") barely
+    matter. Candidates come from MinHash signatures split into bands (two
+    texts collide in a band when that part of their signatures is equal);
+    only those candidates are compared exactly, by Jaccard similarity.
+    """
+    
+    def __init__(self, texts=(), threshold=0.6, num_perm=64, bands=16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        generator = random.Random(1)  # Fixed seed - signatures stay comparable across runs
+        self._hash_params = [(generator.randrange(1, _PRIME), generator.randrange(_PRIME)) for _ in range(num_perm)]
+        self._texts = []
+        self._shingles = []
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+        for text in texts:
+            self.add(text)
+    
+    def __len__(self):
+        return sum(text is not None for text in self._texts)
+    
+    def add(self, text):
+        """Index a text; empty or meaningless texts are skipped"""
+        shingles = self._shingle(text)
+        if not shingles:
+            return
+        keys = self._band_keys(shingles)
+        with self._lock:
+            index = len(self._texts)
+            self._texts.append(text)
+            self._shingles.append(shingles)
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(index)
+    
+    def remove(self, text):
+        """Drop the most recently added copy of text, if indexed"""
+        with self._lock:
+            for index in range(len(self._texts) - 1, -1, -1):
+                if self._texts[index] == text and self._shingles[index]:
+                    break
+            else:
+                return
+            for bucket in self._buckets:
+                for key in [key for key, indexes in bucket.items() if index in indexes]:
+                    bucket[key].remove(index)
+                    if not bucket[key]:
+                        del bucket[key]
+            self._texts[index] = None
+            self._shingles[index] = set()  # Keeps the positions of the other texts
+    
+    def most_similar(self, text):
+        """(similarity, indexed text) of the closest indexed text, or (0.0, None)"""
+        shingles = self._shingle(text)
+        if not shingles:
+            return 0.0, None
+        keys = self._band_keys(shingles)
+        with self._lock:
+            candidates = {index for band, key in enumerate(keys) for index in self._buckets[band].get(key, ())}
+            best = (0.0, None)
+            for index in candidates:
+                other = self._shingles[index]
+                similarity = len(shingles & other) / len(shingles | other)
+                if similarity > best[0]:
+                    best = (similarity, self._texts[index])
+        return best
+    
+    def find_duplicate(self, text):
+        """(similarity, indexed text) if text is a near-duplicate of an indexed one, else None"""
+        similarity, match = self.most_similar(text)
+        return (similarity, match) if match is not None and similarity >= self.threshold else None
+    
+    def _shingle(self, text):
+        words = [word for word in WORD_PATTERN.findall((text or "").lower()) if word not in STOPWORDS]
+        shingles = set()
+        for word in words:
+            padded = f" {word} "
+            shingles.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return shingles
+    
+    def _band_keys(self, shingles):
+        """The MinHash signature of the shingles, cut into one hashable key per band"""
+        values = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big') for shingle in shingles]
+        signature = [min((a * value + b) % _PRIME for value in values) for a, b in self._hash_params]
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
@@ -0,0 +1,195 @@
+"""
+Tag Index - Local name -> ID map of the WordPress tags
+Paged through /tags once, then refreshed incrementally, so known tags cost no request at publish time
+"""
+
+import os
+import json
+import html
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import TAG_INDEX_FILE, TAG_INDEX_FULL_SYNC_HOURS, TAG_INDEX_WORKERS
+
+
+PER_PAGE = 100  # WordPress REST API maximum
+
+
+def tag_key(name):
+    """Lookup key of a tag name - WordPress returns names HTML-escaped ("Skin &amp; Hair")"""
+    return " ".join(html.unescape(name or "").split()).lower()
+
+
+class TagIndex:
+    """
+    Resolves tag names to IDs from a local copy of the site's tags
+
+    The index is saved to TAG_INDEX_FILE. A full sync pages through every
+    tag (also dropping deleted ones) when the file is missing or older than
+    TAG_INDEX_FULL_SYNC_HOURS; otherwise only tags with an ID above the
+    highest known one are fetched, newest first. A full sync falling due
+    while publishing runs in the background on the index as it is, and a
+    failed one is retried after SYNC_RETRY_SECONDS. Tags missing from the
+    index are created together (see WordPressPublisher.create_tags); one
+    that exists after all (created elsewhere since the last sync) comes
+    back from WordPress as term_exists with its ID, so a stale index never
+    costs a failed tag.
+    """
+    
+    SYNC_RETRY_SECONDS = 300  # Wait before retrying a failed full sync
+    
+    def __init__(self, publisher, path=TAG_INDEX_FILE):
+        self.publisher = publisher
+        self.path = path
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.ids = {}
+        self.max_id = 0
+        self.full_sync_at = 0.0
+        self.sync_attempt_at = 0.0
+        self._load()
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.ids = {key: int(tag_id) for key, tag_id in data.get('tags', {}).items()}
+            self.max_id = int(data.get('max_id', 0))
+            self.full_sync_at = float(data.get('full_sync_at', 0.0))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠ Could not load tag index, rebuilding it: {e}")
+            self.ids, self.max_id, self.full_sync_at = {}, 0, 0.0
+    
+    def _save(self):
+        with self._lock:
+            data = {"full_sync_at": self.full_sync_at, "max_id": self.max_id, "tags": dict(self.ids)}
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠ Could not save tag index: {e}")
+    
+    def _add(self, tags):
+        """Index tags as returned by the API ({"id", "name"} dicts)"""
+        with self._lock:
+            for tag in tags:
+                self.ids[tag_key(tag['name'])] = tag['id']
+                self.max_id = max(self.max_id, tag['id'])
+    
+    def full_sync_due(self):
+        return not self.full_sync_at or time.time() - self.full_sync_at >= TAG_INDEX_FULL_SYNC_HOURS * 3600
+    
+    def needs_full_sync(self):
+        """Whether publishing should start a full sync - due, and no attempt within SYNC_RETRY_SECONDS"""
+        return self.full_sync_due() and time.time() - self.sync_attempt_at >= self.SYNC_RETRY_SECONDS
+    
+    def sync(self):
+        """Bring the index up to date: a full sync when due, else fetch the tags added since the last one"""
+        with self._sync_lock:
+            full = self.full_sync_due()  # Decided before the attempt is recorded
+            self.sync_attempt_at = time.time()
+            try:
+                if full:
+                    self._full_sync()
+                else:
+                    self._incremental_sync()
+            except Exception as e:
+                print(f"⚠ Could not sync tag index ({e}), using {len(self)} known tags")
+                return
+            self._save()
+    
+    def _fetch_page(self, page, **params):
+        """One page of tags: (tags, total pages)"""
+        response = self.publisher.session.get(
+            f"{self.publisher.api_url}/tags",
+            params=dict(params, per_page=PER_PAGE, page=page, _fields="id,name"),
+            headers=self.publisher.headers,
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json(), int(response.headers.get('X-WP-TotalPages', 1))
+    
+    def _full_sync(self):
+        tags, total_pages = self._fetch_page(1)
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=TAG_INDEX_WORKERS) as executor:
+                for page_tags in executor.map(lambda page: self._fetch_page(page)[0], range(2, total_pages + 1)):
+                    tags.extend(page_tags)
+        listed_max = max((tag['id'] for tag in tags), default=0)
+        with self._lock:
+            # Keep tags created while the pages were fetched (publishing goes on during a background sync)
+            created = {key: tag_id for key, tag_id in self.ids.items() if tag_id > listed_max}
+            self.ids, self.max_id = created, max(created.values(), default=0)
+        self._add(tags)
+        self.full_sync_at = time.time()
+        print(f"✓ Tag index: {len(self)} tags loaded")
+    
+    def _incremental_sync(self):
+        known_max = self.max_id
+        page, total_pages, added = 1, 1, 0
+        while page <= total_pages:
+            tags, total_pages = self._fetch_page(page, orderby="id", order="desc")
+            new = [tag for tag in tags if tag['id'] > known_max]
+            self._add(new)
+            added += len(new)
+            if len(new) < len(tags):
+                break  # Reached the tags the index already has
+            page += 1
+        print(f"✓ Tag index: {len(self)} tags ({added} new since last sync)")
+    
+    def sync_in_background(self):
+        """Start a sync in a background thread unless one is running"""
+        if self._sync_lock.locked():
+            return
+        self.sync_attempt_at = time.time()  # Until the thread records its own attempt
+        threading.Thread(target=self.sync, name="tag-index-sync", daemon=True).start()
+    
+    def lookup(self, tag_name):
+        """ID of a known tag, or None"""
+        with self._lock:
+            return self.ids.get(tag_key(tag_name))
+    
+    def _missing(self, tag_names):
+        """Names not in the index, once each"""
+        return list({tag_key(name): name for name in tag_names if self.lookup(name) is None}.values())
+    
+    def _created(self, tag_name, tag_id):
+        with self._lock:
+            self.ids[tag_key(tag_name)] = tag_id
+            self.max_id = max(self.max_id, tag_id)
+    
+    def resolve(self, tag_names):
+        """IDs of the tags in order, creating the missing ones concurrently; failed tags are skipped"""
+        if self.needs_full_sync():
+            self.sync_in_background()
+        missing = self._missing(tag_names)
+        if missing:
+            for name, tag_id in zip(missing, self.publisher.create_tags(missing)):
+                if tag_id:
+                    self._created(name, tag_id)
+            self._save()
+        return self._ids_in_order(tag_names)
+    
+    async def resolve_async(self, tag_names):
+        """Async counterpart of resolve"""
+        if self.needs_full_sync():
+            self.sync_in_background()
+        missing = self._missing(tag_names)
+        if missing:
+            for name, tag_id in zip(missing, await self.publisher.create_tags_async(missing)):
+                if tag_id:
+                    self._created(name, tag_id)
+            await asyncio.to_thread(self._save)
+        return self._ids_in_order(tag_names)
+    
+    def _ids_in_order(self, tag_names):
+        ids = [self.lookup(name) for name in tag_names]
+        return list(dict.fromkeys(tag_id for tag_id in ids if tag_id))
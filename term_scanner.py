@@ -0,0 +1,85 @@
+"""
+Term Scanner - Finds every occurrence of a fixed set of terms in one pass
+Aho-Corasick automaton, so scanning costs the same however many terms there are
+"""
+
+from collections import Counter, deque
+
+
+class TermScanner:
+    """
+    Compiled multi-term matcher (case-insensitive substring matching)
+
+    The automaton is built once from the terms; every scan then walks the
+    text a single time. Matches follow the semantics of the `in` checks it
+    replaces: "mog" is found inside "mogging".
+    """
+    
+    def __init__(self, terms):
+        self.terms = []
+        self._transitions = [{}]
+        self._outputs = [()]
+        for term in dict.fromkeys(term.lower() for term in terms if term):
+            self._add(term)
+        self._term_set = set(self.terms)
+        self._link()
+    
+    def __len__(self):
+        return len(self.terms)
+    
+    def __contains__(self, term):
+        return term.lower() in self._term_set
+    
+    def _add(self, term):
+        state = 0
+        for char in term:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions[state][char] = next_state
+                self._transitions.append({})
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] = (term,)
+        self.terms.append(term)
+    
+    def _link(self):
+        """Add failure links, turning the trie into a DFA over the terms' characters"""
+        fail = [0] * len(self._transitions)
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            # States are visited in breadth-first order, so the failure state is complete
+            fallback = self._transitions[fail[state]]
+            self._outputs[state] = self._outputs[state] + self._outputs[fail[state]]
+            for char, next_state in list(self._transitions[state].items()):
+                fail[next_state] = fallback.get(char, 0)
+                queue.append(next_state)
+            for char, next_state in fallback.items():
+                self._transitions[state].setdefault(char, next_state)
+    
+    def matches(self, text):
+        """All occurrences as (start, term), overlapping ones included, in order of their end"""
+        transitions, outputs = self._transitions, self._outputs
+        state = 0
+        found = []
+        for i, char in enumerate(text.lower()):
+            # Every state has an edge for each character the root has, anything else restarts
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                found.extend((i - len(term) + 1, term) for term in outputs[state])
+        return found
+    
+    def counts(self, text):
+        """Occurrences per found term, counted like str.count (non-overlapping)"""
+        counts = Counter()
+        next_free = {}
+        for start, term in self.matches(text):
+            if start >= next_free.get(term, 0):
+                counts[term] += 1
+                next_free[term] = start + len(term)
+        return counts
+    
+    def found(self, text):
+        """The set of terms that occur in text"""
+        return {term for _, term in self.matches(text)}
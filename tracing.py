@@ -0,0 +1,158 @@
+"""
+Tracing - Lightweight nested timing spans for every pipeline stage
+Spans go to one JSON-lines trace file per run; a summary table shows where the time goes
+"""
+
+import os
+import json
+import time
+import math
+import inspect
+import functools
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime
+from config import TRACE_ENABLED, TRACE_DIR
+
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """One timed stage; attributes hold things like tokens, bytes and HTTP status"""
+    
+    def __init__(self, name, parent, attrs):
+        self.id = next(_span_ids)
+        self.name = name
+        self.parent_id = parent.id if parent else None
+        self.trace_id = parent.trace_id if parent else self.id
+        self.attrs = attrs
+        self.error = None
+        self.start = time.time()
+        self.duration = None
+        self._started = time.perf_counter()
+    
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+    
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+    
+    def to_dict(self):
+        record = {
+            "trace": self.trace_id,
+            "span": self.id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "thread": threading.current_thread().name,
+            "attrs": self.attrs
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class Tracer:
+    """Records finished spans to a JSON-lines file and keeps per-stage durations for the summary"""
+    
+    def __init__(self, trace_dir=TRACE_DIR, enabled=TRACE_ENABLED):
+        self.enabled = enabled
+        self.path = os.path.join(trace_dir, f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+        self.durations = defaultdict(list)
+        self._file = None
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed block as a child of the current span"""
+        span = Span(name, _current_span.get(), attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            self._record(span)
+    
+    def _record(self, span):
+        with self._lock:
+            self.durations[span.name].append(span.duration)
+            if not self.enabled:
+                return
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+                self._file.flush()
+            except OSError as e:
+                print(f"⚠ Could not write trace file, tracing to file disabled: {e}")
+                self.enabled = False
+    
+    def summary(self):
+        """Table of count, total and p50/p95/max duration per stage, slowest total first"""
+        with self._lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+        if not durations:
+            return "Trace: no spans recorded"
+        
+        def pct(values, p):
+            return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+        
+        lines = [f"{'Stage':<28}{'count':>7}{'total':>10}{'p50':>9}{'p95':>9}{'max':>9}"]
+        for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            lines.append(
+                f"{name:<28}{len(values):>7}{sum(values):>9.1f}s{pct(values, 50):>8.2f}s"
+                f"{pct(values, 95):>8.2f}s{values[-1]:>8.2f}s"
+            )
+        if self.enabled and self._file is not None:
+            lines.append(f"Trace written to {self.path}")
+        return "\n".join(lines)
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+tracer = Tracer()
+
+
+def span(name, **attrs):
+    """Context manager timing a stage on the process-wide tracer"""
+    return tracer.span(name, **attrs)
+
+
+def annotate(**attrs):
+    """Add attributes to the innermost open span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def traced(name):
+    """Decorator that runs a function or coroutine function inside a span"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -4,21 +4,51 @@ WordPress REST API Publisher
 
 import requests
 import base64
+import asyncio
+import aiohttp
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from post_tracker import PostTracker
 from image_finder import ImageFinder
+from post_spool import SpoolEntry
+from tag_index import TagIndex
+from category_registry import CategoryRegistry
+from bulk_delete import BulkDeleter
+from rest_batch import RestBatch, succeeded, error_message
+from http_client import get_session, get_async_session
+from tracing import span, traced, annotate
 from config import WORDPRESS_URL, WORDPRESS_USERNAME, WORDPRESS_APP_PASSWORD, BLOG_CATEGORY_ID, AUTHOR_ID, POST_STATUS
 
 
+# The site's categories and the descriptions they are created with
+CATEGORY_DESCRIPTIONS = {
+    "Facial Aesthetics": "Comprehensive guides on facial enhancement, jawline development, mewing, and facial symmetry optimization.",
+    "Body Aesthetics": "Physique development, posture correction, height optimization, and body composition strategies.",
+    "Lifestyle": "Sleep optimization, diet for aesthetics, supplementation, hormone optimization, and recovery strategies.",
+    "Grooming": "Hair styling, skincare routines, fashion sense, fragrance, dental care, and personal grooming tips.",
+    "Surgery": "Cosmetic surgery, orthodontics, advanced procedures, and surgical enhancement options."
+}
+
+
+def _existing_term_id(status, body):
+    """The term_id WordPress reports when a term to create already exists (HTTP 400 term_exists), else None"""
+    if status == 400 and isinstance(body, dict) and body.get('code') == 'term_exists':
+        return (body.get('data') or {}).get('term_id')
+    return None
+
+
 class WordPressPublisher:
     """Publishes blog posts to WordPress via REST API"""
     
-    def __init__(self):
+    def __init__(self, warm_caches=True):
+        """warm_caches=False skips the tag sync and category warm-up, for scripts that don't publish"""
         if not WORDPRESS_URL:
             raise ValueError("WORDPRESS_URL not set in config")
         if not WORDPRESS_USERNAME or not WORDPRESS_APP_PASSWORD:
             raise ValueError("WordPress credentials not set. Please set WORDPRESS_USERNAME and WORDPRESS_APP_PASSWORD")
         
         self.base_url = WORDPRESS_URL.rstrip('/')
+        self.session = get_session()
         # Try standard REST API path first, fallback to query string format
         self.api_url = f"{self.base_url}/wp-json/wp/v2"
         self.api_url_alt = f"{self.base_url}/?rest_route=/wp/v2"
@@ -36,21 +66,33 @@ class WordPressPublisher:
         # Detect which API URL works
         self._detect_api_url()
         
+        # Multi-object writes go out as /batch/v1 calls where the site supports it
+        self.batch = RestBatch(self)
+        
         # Initialize post tracker
         self.post_tracker = PostTracker()
         
         # Initialize image finder
         self.image_finder = ImageFinder()
         
-        # Cache category IDs
-        self._category_cache = {}
-        self._load_category_ids()
+        # Category IDs served from memory, warmed in the background
+        self.categories = CategoryRegistry(self, required=CATEGORY_DESCRIPTIONS)
+        if warm_caches:
+            self.categories.warm()
+        
+        # Thumbnails searched and downloaded in the background while a post generates
+        self._thumbnail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail")
+        
+        # Tag name -> ID, kept on disk and refreshed incrementally
+        self.tag_index = TagIndex(self)
+        if warm_caches:
+            self.tag_index.sync()
     
     def _detect_api_url(self):
         """Detect which REST API URL format works"""
         # Try standard format first
         try:
-            response = requests.get(f"{self.api_url}/", headers=self.headers, timeout=5)
+            response = self.session.get(f"{self.api_url}/", headers=self.headers, timeout=5)
             if response.status_code == 200:
                 return  # Standard format works
         except:
@@ -58,7 +100,7 @@ class WordPressPublisher:
         
         # Try alternative format
         try:
-            response = requests.get(f"{self.api_url_alt}/", headers=self.headers, timeout=5)
+            response = self.session.get(f"{self.api_url_alt}/", headers=self.headers, timeout=5)
             if response.status_code == 200:
                 self.api_url = self.api_url_alt
                 print(f"Using alternative REST API path: {self.api_url}")
@@ -69,60 +111,14 @@ class WordPressPublisher:
         # If both fail, keep standard and let error handling deal with it
         print(f"Warning: Could not verify REST API endpoint. Using: {self.api_url}")
     
-    def _load_category_ids(self):
-        """Load category IDs for the 5 looksmaxing categories"""
-        category_names = [
-            "Facial Aesthetics",
-            "Body Aesthetics",
-            "Lifestyle",
-            "Grooming",
-            "Surgery"
-        ]
-        
-        try:
-            categories = self.get_categories()
-            for cat in categories:
-                cat_name = cat.get('name', '')
-                if cat_name in category_names:
-                    self._category_cache[cat_name] = cat.get('id')
-        except Exception as e:
-            print(f"Warning: Could not load category IDs: {e}")
-    
     def get_category_id(self, category_name):
         """Get category ID by name, create if doesn't exist"""
-        if category_name in self._category_cache:
-            return self._category_cache[category_name]
-        
-        # Try to find it
-        try:
-            categories = self.get_categories()
-            for cat in categories:
-                if cat.get('name', '').lower() == category_name.lower():
-                    cat_id = cat.get('id')
-                    self._category_cache[category_name] = cat_id
-                    return cat_id
-        except:
-            pass
-        
-        # Create if doesn't exist
-        category_descriptions = {
-            "Facial Aesthetics": "Comprehensive guides on facial enhancement, jawline development, mewing, and facial symmetry optimization.",
-            "Body Aesthetics": "Physique development, posture correction, height optimization, and body composition strategies.",
-            "Lifestyle": "Sleep optimization, diet for aesthetics, supplementation, hormone optimization, and recovery strategies.",
-            "Grooming": "Hair styling, skincare routines, fashion sense, fragrance, dental care, and personal grooming tips.",
-            "Surgery": "Cosmetic surgery, orthodontics, advanced procedures, and surgical enhancement options."
-        }
-        
-        description = category_descriptions.get(category_name, "")
-        cat_id = self.create_category(category_name, description=description)
-        if cat_id:
-            self._category_cache[category_name] = cat_id
-        return cat_id
+        return self.categories.get_id(category_name)
     
     def test_connection(self):
         """Test WordPress API connection"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_url}/users/me",
                 headers=self.headers,
                 timeout=10
@@ -136,15 +132,22 @@ class WordPressPublisher:
             return False
     
     def get_categories(self):
-        """Get available categories"""
+        """Get all categories, page by page"""
+        categories = []
+        page, total_pages = 1, 1
         try:
-            response = requests.get(
-                f"{self.api_url}/categories",
-                headers=self.headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
+            while page <= total_pages:
+                response = self.session.get(
+                    f"{self.api_url}/categories",
+                    params={"per_page": 100, "page": page, "_fields": "id,name"},
+                    headers=self.headers,
+                    timeout=10
+                )
+                response.raise_for_status()
+                categories.extend(response.json())
+                total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+                page += 1
+            return categories
         except Exception as e:
             print(f"Error fetching categories: {e}")
             return []
@@ -156,22 +159,7 @@ class WordPressPublisher:
             if not slug:
                 slug = name.lower().replace(' ', '-').replace('_', '-')
             
-            # Check if category exists
-            response = requests.get(
-                f"{self.api_url}/categories",
-                params={"search": name, "per_page": 1},
-                headers=self.headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            categories = response.json()
-            
-            # Check by name (case-insensitive)
-            for cat in categories:
-                if cat.get('name', '').lower() == name.lower():
-                    return cat['id']
-            
-            # Create new category
+            # Create new category - an existing one is answered with its ID (term_exists)
             category_data = {
                 "name": name,
                 "slug": slug,
@@ -179,12 +167,16 @@ class WordPressPublisher:
             if description:
                 category_data["description"] = description
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/categories",
                 headers=self.headers,
                 json=category_data,
                 timeout=10
             )
+            if response.status_code == 400:
+                existing = _existing_term_id(400, response.json())
+                if existing:
+                    return existing
             response.raise_for_status()
             return response.json()['id']
             
@@ -199,35 +191,33 @@ class WordPressPublisher:
             return None
     
     def create_tag(self, tag_name):
-        """Create a tag if it doesn't exist, return tag ID"""
-        try:
-            # Check if tag exists
-            response = requests.get(
-                f"{self.api_url}/tags",
-                params={"search": tag_name, "per_page": 1},
-                headers=self.headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            tags = response.json()
-            
-            if tags and tags[0].get('name', '').lower() == tag_name.lower():
-                return tags[0]['id']
-            
-            # Create new tag
-            response = requests.post(
-                f"{self.api_url}/tags",
-                headers=self.headers,
-                json={"name": tag_name},
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()['id']
-            
-        except Exception as e:
-            print(f"Error creating tag '{tag_name}': {e}")
-            return None
+        """Create a tag, return its ID (the existing tag's ID if WordPress already has one by that name)"""
+        return self.create_tags([tag_name])[0]
+    
+    @traced("publish.tag")
+    def create_tags(self, tag_names):
+        """Create tags in as few requests as possible, returns their IDs in order (None for failed ones)"""
+        annotate(count=len(tag_names))
+        results = self.batch.execute([("POST", "tags", {"name": name}) for name in tag_names])
+        return [self._created_tag_id(name, result) for name, result in zip(tag_names, results)]
     
+    def _created_tag_id(self, tag_name, result):
+        status, body = result
+        existing = _existing_term_id(status, body)
+        if existing:
+            return existing
+        if succeeded(result) and isinstance(body, dict) and body.get('id'):
+            return body['id']
+        print(f"Error creating tag '{tag_name}': {error_message(result)}")
+        return None
+    
+    @traced("publish.tags")
+    def resolve_tags(self, tag_names):
+        """IDs of the tags - from the tag index, creating the missing ones - skipping failed ones"""
+        annotate(count=len(tag_names))
+        return self.tag_index.resolve(tag_names)
+    
+    @traced("publish.upload_media")
     def upload_media(self, image_data, filename, title=""):
         """Upload image to WordPress media library, return media ID"""
         try:
@@ -246,13 +236,14 @@ class WordPressPublisher:
                 # Don't set Content-Type - let requests set it with boundary
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/media",
                 headers=upload_headers,
                 files=files,
                 data=data,
                 timeout=30
             )
+            annotate(bytes=len(image_data), status=response.status_code)
             response.raise_for_status()
             
             media_data = response.json()
@@ -270,15 +261,17 @@ class WordPressPublisher:
                     print(f"    Response: {e.response.text[:200]}")
             return None
     
+    @traced("publish.featured_image")
     def set_featured_image(self, post_id, media_id):
         """Set featured image for a post"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/posts/{post_id}",
                 headers=self.headers,
                 json={"featured_media": media_id},
                 timeout=10
             )
+            annotate(status=response.status_code)
             response.raise_for_status()
             print(f"  ✓ Set featured image (Media ID: {media_id})")
             return True
@@ -286,136 +279,81 @@ class WordPressPublisher:
             print(f"  ⚠ Error setting featured image: {e}")
             return False
     
-    def publish_post(self, post_data):
+    @traced("publish")
+    def publish_post(self, post_data, checkpoint=None, thumbnail=None):
         """
         Publish a blog post to WordPress
         
+        The thumbnail is uploaded first and the post created with it as its
+        featured image, so the post is written once and never live without it.
+        
         Args:
-            post_data: Dict with keys: title, content, excerpt, tags, topic
+            post_data: Dict with keys: title, content, excerpt, tags, topic and
+                optionally date (ISO local time) to schedule the post
+            checkpoint: SpoolEntry that records every completed step; a spooled
+                post that failed before resumes after its last completed step
+                (e.g. reusing its uploaded media)
+            thumbnail: Future of (image_data, filename) started while the post
+                was generating (see prefetch_thumbnail); searched here if None
         
         Returns:
-            Post ID if successful, None otherwise
+            Dict with success, post_id, url and status, or success False and error
         """
+        checkpoint = checkpoint or SpoolEntry.in_memory(post_data)
         try:
             # Validate content before publishing
-            content = post_data.get('content', '').strip()
+            error = self._validate_post(post_data)
+            if error:
+                return error
             title = post_data.get('title', '').strip()
             
-            if not content or len(content) < 100:
-                error_msg = f"Content is empty or too short ({len(content)} chars). Cannot publish."
-                print(f"✗ {error_msg}")
-                return {
-                    "success": False,
-                    "error": error_msg
-                }
-            
-            if not title:
-                error_msg = "Title is empty. Cannot publish."
-                print(f"✗ {error_msg}")
-                return {
-                    "success": False,
-                    "error": error_msg
-                }
-            
-            # Prepare tags - create/get tag IDs
-            tag_ids = []
-            for tag_name in post_data.get('tags', []):
-                tag_id = self.create_tag(tag_name)
-                if tag_id:
-                    tag_ids.append(tag_id)
-            
-            # Determine category ID
-            category_name = post_data.get('category', 'Lifestyle')  # Default to Lifestyle
-            category_id = self.get_category_id(category_name)
-            
-            if not category_id:
-                print(f"⚠ Warning: Could not find/create category '{category_name}', using default category")
-                category_id = BLOG_CATEGORY_ID
-            
-            # Prepare post payload
-            post_payload = {
-                "title": title,
-                "content": content,
-                "excerpt": post_data.get('excerpt', ''),
-                "status": POST_STATUS,
-                "categories": [category_id],
-                "tags": tag_ids,
-                "author": AUTHOR_ID
-            }
-            
-            print(f"  Category: {category_name} (ID: {category_id})")
-            
-            # Create post
-            print(f"Publishing post: {title}")
-            response = requests.post(
-                f"{self.api_url}/posts",
-                headers=self.headers,
-                json=post_payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            created_post = response.json()
-            post_id = created_post['id']
-            post_url = created_post.get('link', f"{self.base_url}/?p={post_id}")
-            
-            # Find and upload thumbnail
-            print(f"  Finding thumbnail...")
-            category_name = post_data.get('category', 'Lifestyle')
-            topic = post_data.get('topic', '')
-            title = post_data.get('title', '')
-            
-            try:
-                # Find image URL
-                image_url = self.image_finder.find_image_url(
-                    title=title,
-                    topic=topic,
-                    category=category_name
-                )
+            if not checkpoint.reached("published"):
+                # Prepare tags - create/get tag IDs
+                tag_ids = self.resolve_tags(post_data.get('tags', []))
+                
+                # Determine category ID
+                category_name = post_data.get('category', 'Lifestyle')  # Default to Lifestyle
+                with span("publish.category", category=category_name):
+                    category_id = self.get_category_id(category_name)
+                
+                if not category_id:
+                    print(f"⚠ Warning: Could not find/create category '{category_name}', using default category")
+                    category_id = BLOG_CATEGORY_ID
+                
+                print(f"  Category: {category_name} (ID: {category_id})")
                 
-                if image_url:
-                    # Download image
-                    image_data, filename = self.image_finder.download_image(image_url)
-                    
-                    if image_data:
-                        # Upload to WordPress
-                        media_id = self.upload_media(
-                            image_data=image_data,
-                            filename=filename,
-                            title=f"Featured image for: {title}"
+                # The thumbnail goes first, so a retry after a failed create reuses the upload
+                if not checkpoint.reached("media_uploaded"):
+                    media_id = self._upload_thumbnail(post_data, thumbnail)
+                    if media_id:
+                        checkpoint.advance("media_uploaded", media_id=media_id)
+                
+                # Prepare post payload
+                post_payload = self._build_post_payload(post_data, category_id, tag_ids, checkpoint.get('media_id'))
+                
+                # Create post
+                print(f"Publishing post: {title}")
+                created_post = self._find_unrecorded_post(checkpoint)
+                if created_post is None:
+                    checkpoint.update(creating=True)
+                    with span("publish.create_post", bytes=len(post_payload['content'])) as create_span:
+                        response = self.session.post(
+                            f"{self.api_url}/posts",
+                            headers=self.headers,
+                            json=post_payload,
+                            timeout=30
                         )
-                        
-                        if media_id:
-                            # Set as featured image
-                            self.set_featured_image(post_id, media_id)
-                    else:
-                        print(f"  ⚠ Could not download thumbnail from {image_url}")
-                else:
-                    print(f"  ⚠ Could not find thumbnail URL")
-            except Exception as e:
-                print(f"  ⚠ Error processing thumbnail: {e}")
-                # Continue without thumbnail - post is already published
+                        create_span.set(status=response.status_code)
+                        response.raise_for_status()
+                    created_post = response.json()
+                self._checkpoint_created(checkpoint, created_post)
             
-            # Track the published post
-            self.post_tracker.add_post(
-                post_id=post_id,
-                title=post_data['title'],
-                url=post_url,
-                topic=post_data.get('topic', 'auto-selected'),
-                tags=post_data.get('tags', [])
-            )
+            # Only posts created by an older version without their featured image need this write
+            if checkpoint.get('media_id') and not checkpoint.get('featured_set'):
+                if self.set_featured_image(checkpoint.get('post_id'), checkpoint.get('media_id')):
+                    checkpoint.update(featured_set=True)
             
-            print(f"✓ Post published successfully!")
-            print(f"  Post ID: {post_id}")
-            print(f"  URL: {post_url}")
-            print(f"  Status: {created_post.get('status', 'unknown')}")
-            
-            return {
-                "success": True,
-                "post_id": post_id,
-                "url": post_url,
-                "status": created_post.get('status')
-            }
+            return self._record_published(post_data, checkpoint)
             
         except requests.exceptions.RequestException as e:
             print(f"✗ Error publishing post: {e}")
@@ -430,55 +368,356 @@ class WordPressPublisher:
                 "error": str(e)
             }
     
-    def delete_post(self, post_id, force=True):
-        """Delete a WordPress post"""
+    @traced("publish.thumbnail")
+    def prepare_thumbnail(self, title, topic, category_name):
+        """Find and download a thumbnail. Returns (image_data, filename) or (None, None)"""
+        print(f"  Finding thumbnail...")
+        image_url = self.image_finder.find_image_url(title=title, topic=topic, category=category_name)
+        if not image_url:
+            print(f"  ⚠ Could not find thumbnail URL")
+            return None, None
+        
+        image_data, filename = self.image_finder.download_image(image_url)
+        if not image_data:
+            print(f"  ⚠ Could not download thumbnail from {image_url}")
+        return image_data, filename
+    
+    def prefetch_thumbnail(self, title, topic, category_name):
+        """Start prepare_thumbnail in the background, returns its Future (for publish_post)"""
+        return self._thumbnail_executor.submit(contextvars.copy_context().run, self.prepare_thumbnail, title, topic, category_name)
+    
+    def _upload_thumbnail(self, post_data, thumbnail=None):
+        """Upload the prefetched thumbnail, or find and download one first. Returns the media ID or None."""
+        title = post_data.get('title', '')
         try:
-            response = requests.delete(
-                f"{self.api_url}/posts/{post_id}",
-                headers=self.headers,
-                params={"force": force},
-                timeout=10
+            if thumbnail is not None:
+                image_data, filename = thumbnail.result()
+            else:
+                image_data, filename = self.prepare_thumbnail(title, post_data.get('topic', ''), post_data.get('category', 'Lifestyle'))
+            if not image_data:
+                return None
+            
+            # Upload to WordPress
+            return self.upload_media(
+                image_data=image_data,
+                filename=filename,
+                title=f"Featured image for: {title}"
             )
-            response.raise_for_status()
-            print(f"✓ Post {post_id} deleted successfully")
-            return True
         except Exception as e:
-            print(f"✗ Error deleting post {post_id}: {e}")
-            return False
+            print(f"  ⚠ Error processing thumbnail: {e}")
+            return None
+    
+    def find_post_by_title(self, title):
+        """Find a post (any status) with exactly this title, or None"""
+        response = self.session.get(
+            f"{self.api_url}/posts",
+            headers=self.headers,
+            params={"search": title, "status": "publish,future,draft,pending,private", "context": "edit", "per_page": 10},
+            timeout=10
+        )
+        response.raise_for_status()
+        for post in response.json():
+            post_title = post.get('title', {})
+            if (post_title.get('raw') or post_title.get('rendered', '')).strip() == title.strip():
+                return post
+        return None
+    
+    def _find_unrecorded_post(self, checkpoint):
+        """
+        After an interrupted create the post may exist without its ID having
+        been recorded; look it up instead of creating a duplicate
+        """
+        if not checkpoint.get('creating'):
+            return None
+        post = self.find_post_by_title(checkpoint.post_data.get('title', ''))
+        if post:
+            print(f"  ✓ Found the post created by an earlier attempt (ID: {post['id']})")
+        return post
+    
+    def _checkpoint_created(self, checkpoint, created_post):
+        post_id = created_post['id']
+        checkpoint.advance(
+            "published",
+            post_id=post_id,
+            url=created_post.get('link', f"{self.base_url}/?p={post_id}"),
+            status=created_post.get('status'),
+            featured_set=bool(checkpoint.get('media_id'))  # Created with its featured image
+        )
+    
+    def _validate_post(self, post_data):
+        """Return a failure result if the post cannot be published, None if it is fine"""
+        content = post_data.get('content', '').strip()
+        title = post_data.get('title', '').strip()
+        
+        if not content or len(content) < 100:
+            error_msg = f"Content is empty or too short ({len(content)} chars). Cannot publish."
+            print(f"✗ {error_msg}")
+            return {
+                "success": False,
+                "error": error_msg,
+                "retryable": False
+            }
+        
+        if not title:
+            error_msg = "Title is empty. Cannot publish."
+            print(f"✗ {error_msg}")
+            return {
+                "success": False,
+                "error": error_msg,
+                "retryable": False
+            }
+        return None
+    
+    def _build_post_payload(self, post_data, category_id, tag_ids, media_id=None):
+        payload = {
+            "title": post_data.get('title', '').strip(),
+            "content": post_data.get('content', '').strip(),
+            "excerpt": post_data.get('excerpt', ''),
+            "status": POST_STATUS,
+            "categories": [category_id],
+            "tags": tag_ids,
+            "author": AUTHOR_ID
+        }
+        if media_id:
+            payload["featured_media"] = media_id
+        if post_data.get('date'):
+            # Scheduled post (site-local time) - WordPress publishes it itself at that date
+            payload.update(status="future", date=post_data['date'])
+        return payload
+    
+    def _record_published(self, post_data, checkpoint):
+        """Track a created post and build the success result"""
+        post_id = checkpoint.get('post_id')
+        post_url = checkpoint.get('url')
+        
+        # Track the published post
+        if not checkpoint.reached("tracked"):
+            with span("publish.track"):
+                self.post_tracker.add_post(
+                    post_id=post_id,
+                    title=post_data['title'],
+                    url=post_url,
+                    topic=post_data.get('topic', 'auto-selected'),
+                    tags=post_data.get('tags', [])
+                )
+            checkpoint.advance("tracked")
+        
+        print(f"✓ Post published successfully!")
+        print(f"  Post ID: {post_id}")
+        print(f"  URL: {post_url}")
+        print(f"  Status: {checkpoint.get('status') or 'unknown'}")
+        
+        return {
+            "success": True,
+            "post_id": post_id,
+            "url": post_url,
+            "status": checkpoint.get('status')
+        }
+    
+    async def _request_async(self, method, path, **kwargs):
+        """Make a REST API call on the async session and return the decoded JSON"""
+        session = get_async_session()
+        kwargs.setdefault('headers', self.headers)
+        timeout = aiohttp.ClientTimeout(total=kwargs.pop('timeout', 10))
+        async with session.request(method, f"{self.api_url}/{path}", timeout=timeout, **kwargs) as response:
+            annotate(status=response.status)
+            if response.status >= 400:
+                body = await response.text()
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status,
+                    message=f"{response.reason}: {body[:200]}"
+                )
+            return await response.json(content_type=None)
+    
+    async def create_tag_async(self, tag_name):
+        """Async counterpart of create_tag"""
+        return (await self.create_tags_async([tag_name]))[0]
+    
+    @traced("publish.tag")
+    async def create_tags_async(self, tag_names):
+        """Async counterpart of create_tags"""
+        annotate(count=len(tag_names))
+        results = await self.batch.execute_async([("POST", "tags", {"name": name}) for name in tag_names])
+        return [self._created_tag_id(name, result) for name, result in zip(tag_names, results)]
     
-    def delete_all_posts(self):
-        """Delete all posts from WordPress"""
+    @traced("publish.tags")
+    async def resolve_tags_async(self, tag_names):
+        """Async counterpart of resolve_tags"""
+        annotate(count=len(tag_names))
+        return await self.tag_index.resolve_async(tag_names)
+    
+    @traced("publish.category")
+    async def get_category_id_async(self, category_name):
+        """Async counterpart of get_category_id"""
+        annotate(category=category_name)
+        category_id = self.categories.lookup(category_name)
+        if category_id is not None:
+            if self.categories.expired():
+                self.categories.warm()
+            return category_id
+        # Rare path - the registry is still warming up or lacks the category
+        return await asyncio.to_thread(self.get_category_id, category_name)
+    
+    @traced("publish.thumbnail")
+    async def prepare_thumbnail_async(self, title, topic, category_name):
+        """Async counterpart of prepare_thumbnail"""
+        print(f"  Finding thumbnail...")
+        image_url = await self.image_finder.find_image_url_async(title=title, topic=topic, category=category_name)
+        if not image_url:
+            print(f"  ⚠ Could not find thumbnail URL")
+            return None, None
+        
+        image_data, filename = await self.image_finder.download_image_async(image_url)
+        if not image_data:
+            print(f"  ⚠ Could not download thumbnail from {image_url}")
+        return image_data, filename
+    
+    @traced("publish.upload_media")
+    async def upload_media_async(self, image_data, filename, title=""):
+        """Async counterpart of upload_media"""
+        annotate(bytes=len(image_data))
         try:
-            # Get all posts
-            response = requests.get(
-                f"{self.api_url}/posts",
-                headers=self.headers,
-                params={"per_page": 100, "status": "any"},
-                timeout=30
-            )
-            response.raise_for_status()
-            posts = response.json()
-            
-            print(f"Found {len(posts)} posts to delete")
+            form = aiohttp.FormData()
+            form.add_field('file', image_data, filename=filename, content_type='image/jpeg')
+            if title:
+                form.add_field('title', title)
             
-            deleted_count = 0
-            for post in posts:
-                post_id = post.get('id')
-                post_title = post.get('title', {}).get('rendered', 'Unknown')
-                if self.delete_post(post_id):
-                    deleted_count += 1
-                    print(f"  Deleted: {post_title}")
+            # Don't set Content-Type - let aiohttp set it with boundary
+            upload_headers = {'Authorization': self.headers['Authorization']}
+            media_data = await self._request_async('POST', 'media', headers=upload_headers, data=form, timeout=30)
+            media_id = media_data.get('id')
+            print(f"  ✓ Uploaded thumbnail: {filename} (Media ID: {media_id})")
+            return media_id
             
-            print(f"\n✓ Deleted {deleted_count} out of {len(posts)} posts")
-            return deleted_count
+        except Exception as e:
+            print(f"  ⚠ Error uploading thumbnail: {e!r}")
+            return None
+    
+    @traced("publish.featured_image")
+    async def set_featured_image_async(self, post_id, media_id):
+        """Async counterpart of set_featured_image"""
+        try:
+            await self._request_async('POST', f"posts/{post_id}", json={"featured_media": media_id})
+            print(f"  ✓ Set featured image (Media ID: {media_id})")
+            return True
+        except Exception as e:
+            print(f"  ⚠ Error setting featured image: {e!r}")
+            return False
+    
+    @traced("publish")
+    async def publish_post_async(self, post_data, tag_ids=None, category_id=None, thumbnail=None, checkpoint=None):
+        """
+        Async counterpart of publish_post
+        
+        tag_ids, category_id and thumbnail may be tasks the caller started
+        while the post was still generating (see resolve_tags_async,
+        get_category_id_async and prepare_thumbnail_async); any that are
+        missing are started here, concurrently.
+        """
+        checkpoint = checkpoint or SpoolEntry.in_memory(post_data)
+        error = self._validate_post(post_data)
+        if error:
+            return error
+        
+        if checkpoint.reached("published"):
+            for task in (tag_ids, category_id, thumbnail):
+                if isinstance(task, asyncio.Future):
+                    task.cancel()
+            return await self._finish_published_async(post_data, checkpoint)
+        
+        category_name = post_data.get('category', 'Lifestyle')  # Default to Lifestyle
+        tag_ids = tag_ids or asyncio.ensure_future(self.resolve_tags_async(post_data.get('tags', [])))
+        category_id = category_id or asyncio.ensure_future(self.get_category_id_async(category_name))
+        if checkpoint.reached("media_uploaded") and thumbnail:
+            thumbnail.cancel()
+        elif not thumbnail:
+            thumbnail = asyncio.ensure_future(
+                self.prepare_thumbnail_async(post_data.get('title', ''), post_data.get('topic', ''), category_name)
+            )
+        
+        async def upload_thumbnail():
+            if checkpoint.reached("media_uploaded"):
+                return
+            try:
+                image_data, filename = await thumbnail
+                if image_data:
+                    media_id = await self.upload_media_async(image_data, filename, title=f"Featured image for: {post_data['title']}")
+                    if media_id:
+                        checkpoint.advance("media_uploaded", media_id=media_id)
+            except Exception as e:
+                print(f"  ⚠ Error processing thumbnail: {e!r}")
+        
+        # The upload runs alongside the tag and category lookups; the post is created with it
+        media_task = asyncio.ensure_future(upload_thumbnail())
+        try:
+            tag_ids, category_id, _ = await asyncio.gather(tag_ids, category_id, media_task)
+            if not category_id:
+                print(f"⚠ Warning: Could not find/create category '{category_name}', using default category")
+                category_id = BLOG_CATEGORY_ID
             
+            print(f"  Category: {category_name} (ID: {category_id})")
+            print(f"Publishing post: {post_data['title']}")
+            post_payload = self._build_post_payload(post_data, category_id, tag_ids, checkpoint.get('media_id'))
+            created_post = None
+            if checkpoint.get('creating'):
+                # Rare resume path - see _find_unrecorded_post
+                created_post = await asyncio.to_thread(self._find_unrecorded_post, checkpoint)
+            if created_post is None:
+                checkpoint.update(creating=True)
+                with span("publish.create_post", bytes=len(post_payload['content'])):
+                    created_post = await self._request_async('POST', 'posts', json=post_payload, timeout=30)
+        except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.RequestException) as e:
+            print(f"✗ Error publishing post: {e!r}")
+            # An upload that already started finishes in the background and is checkpointed for the retry
+            if not media_task.done() and not thumbnail.done():
+                media_task.cancel()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        self._checkpoint_created(checkpoint, created_post)
+        return await self._finish_published_async(post_data, checkpoint)
+    
+    async def _finish_published_async(self, post_data, checkpoint):
+        """Set the featured image of a created post if still needed, then track it"""
+        # Only posts created by an older version without their featured image need this write
+        if checkpoint.get('media_id') and not checkpoint.get('featured_set'):
+            if await self.set_featured_image_async(checkpoint.get('post_id'), checkpoint.get('media_id')):
+                checkpoint.update(featured_set=True)
+        return self._record_published(post_data, checkpoint)
+    
+    def delete_post(self, post_id, force=True):
+        """Delete a WordPress post"""
+        return self.delete_posts([post_id], force)[0]
+    
+    def delete_posts(self, post_ids, force=True):
+        """Delete posts in as few requests as possible, returns whether each was deleted"""
+        results = self.batch.execute([("DELETE", f"posts/{post_id}?force={str(force).lower()}", None) for post_id in post_ids])
+        deleted = []
+        for post_id, result in zip(post_ids, results):
+            if succeeded(result):
+                print(f"✓ Post {post_id} deleted successfully")
+            else:
+                print(f"✗ Error deleting post {post_id}: {error_message(result)}")
+            deleted.append(succeeded(result))
+        return deleted
+    
+    def delete_all_posts(self, delete_media=False):
+        """Delete all posts from WordPress (and their featured images with delete_media), returns the number deleted"""
+        try:
+            return BulkDeleter(self, delete_media=delete_media).run()
         except Exception as e:
             print(f"✗ Error deleting posts: {e}")
             return 0
     
     def update_post(self, post_id, post_data):
         """Update an existing post"""
-        try:
+        return self.update_posts([(post_id, post_data)])[0]
+    
+    def update_posts(self, updates):
+        """Update posts ((post_id, post_data) pairs) in as few requests as possible, returns whether each was updated"""
+        writes = []
+        for post_id, post_data in updates:
             post_payload = {
                 "title": post_data.get('title'),
                 "content": post_data.get('content'),
@@ -487,19 +726,14 @@ class WordPressPublisher:
             
             # Remove None values
             post_payload = {k: v for k, v in post_payload.items() if v is not None}
-            
-            response = requests.post(
-                f"{self.api_url}/posts/{post_id}",
-                headers=self.headers,
-                json=post_payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            print(f"✓ Post {post_id} updated successfully")
-            return True
-            
-        except Exception as e:
-            print(f"✗ Error updating post: {e}")
-            return False
+            writes.append(("POST", f"posts/{post_id}", post_payload))
+        
+        updated = []
+        for (post_id, _), result in zip(updates, self.batch.execute(writes)):
+            if succeeded(result):
+                print(f"✓ Post {post_id} updated successfully")
+            else:
+                print(f"✗ Error updating post {post_id}: {error_message(result)}")
+            updated.append(succeeded(result))
+        return updated
 